@@ -0,0 +1,185 @@
+"""
+Rust analyzer benchmark: four regex passes vs. the single-pass scanner.
+
+The four-pass analyzer is RustAnalyzer as it was before rust_lexer: one
+MULTILINE regex each for functions, types, impls and mod/use items, run
+over the whole file. Both analyzers get the same file contents, read
+once up front, so only decoding and analysis are timed. Besides the
+time, the table shows the symbols and dependencies found and how many
+files differ.
+
+Usage:
+    python benchmarks/bench_rust_analyzer.py                     # synthetic, 2000 files
+    python benchmarks/bench_rust_analyzer.py --files 10000
+    python benchmarks/bench_rust_analyzer.py --project ~/.cargo/registry/src
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pirgen.analyzers.rust_analyzer import RustAnalyzer  # noqa: E402
+from pirgen.core.project_model import ProjectModel  # noqa: E402
+from pirgen.core.rust_modules import expand_use_tree  # noqa: E402
+
+
+class FourPassRustAnalyzer(RustAnalyzer):
+    """RustAnalyzer before the single-pass scanner."""
+
+    _fn_pattern = re.compile(
+        r"^\s*(?:pub\s+)?(?:async\s+)?fn\s+(\w+)\s*(?:<[^>]*>)?\s*[^;{]*\{", re.MULTILINE
+    )
+    _type_pattern = re.compile(r"^\s*(?:pub\s+)?(struct|enum|trait)\s+(\w+)", re.MULTILINE)
+    _impl_pattern = re.compile(r"^\s*(?:pub\s+)?impl\s+(?:\w+\s+for\s+)?(\w+)\s*\{", re.MULTILINE)
+    _use_pattern = re.compile(r"^\s*(?:pub(?:\([^)]*\))?\s+)?use\s+([^;]+);", re.MULTILINE)
+    _mod_pattern = re.compile(r"^\s*(?:pub(?:\([^)]*\))?\s+)?mod\s+(\w+)\s*;", re.MULTILINE)
+
+    def analyze(self, file_path, unit_uid, model, content=None):
+        content = self.read_source(file_path, content)
+        found = set()
+        for match in self._fn_pattern.finditer(content):
+            name = match.group(1)
+            if name not in found:
+                found.add(name)
+                attrs = {"entry": "true"} if name == "main" else {}
+                model.add_symbol(name, unit_uid, "func", **attrs)
+        for match in self._type_pattern.finditer(content):
+            kind, name = match.groups()
+            model.add_symbol(name, unit_uid, kind)
+        found = set()
+        for match in self._impl_pattern.finditer(content):
+            name = match.group(1)
+            if name not in found:
+                found.add(name)
+                model.add_symbol(name, unit_uid, "impl")
+        for match in self._mod_pattern.finditer(content):
+            model.add_dependency(unit_uid, "mod", f"[{match.group(1)}]")
+        for match in self._use_pattern.finditer(content):
+            for path in expand_use_tree(match.group(1)):
+                model.add_dependency(unit_uid, "use", f"[{path}]")
+
+
+ANALYZERS = (("four-pass", FourPassRustAnalyzer), ("single-pass", RustAnalyzer))
+
+SYNTHETIC_FILE = '''//! Module {i}: docs mention fn not_an_item() {{ and use nothing;
+use std::collections::{{HashMap, HashSet}};
+use crate::{{
+    model::{{Unit{i}, Symbol}},   // grouped across lines
+    util::*,
+}};
+mod child{i};
+
+/* block /* nested */ fn hidden() {{ */
+#[derive(Debug, Clone)]
+pub(crate) struct Record{i}<'a> {{
+    name: &'a str,
+    table: [u8; 16],
+}}
+
+pub enum State{i} {{ Idle, Busy(u32) }}
+
+pub trait Visit{i} {{
+    fn visit(&self, unit: &Unit{i}) -> bool;
+    fn finish(&mut self) {{}}
+}}
+
+impl<'a> Record{i}<'a> {{
+    pub const fn new(name: &'a str) -> Self {{
+        Record{i} {{ name, table: [0; 16] }}
+    }}
+
+    pub async unsafe fn load(&self, path: &str) -> Result<String, Error> {{
+        let raw = r#"fn raw_string() {{ "quoted" }}"#;
+        let quote = '"';
+        Ok(format!("{{}} {{}}", raw, quote))
+    }}
+}}
+
+impl<T: Visit{i}> fmt::Display for Wrapper<T> where T: Clone {{
+    fn fmt(&self, f: &mut fmt::Formatter<'_>) -> fmt::Result {{
+        write!(f, "wrapper")
+    }}
+}}
+
+pub extern "C" fn exported_{i}(x: i32) -> i32 {{
+    x + 1
+}}
+'''
+
+
+def read_corpus(root: str):
+    """Contents of the .rs files under root, in a stable order."""
+    files = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            if filename.endswith(".rs"):
+                path = os.path.join(dirpath, filename)
+                with open(path, "rb") as f:
+                    files.append((path, f.read()))
+    return files
+
+
+def run(analyzer_class, files, repeat: int):
+    """Best time over repeat runs, plus the records of the last run."""
+    best = None
+    for _ in range(repeat):
+        model = ProjectModel("bench", "/bench", "rust")
+        uids = [model.add_unit(path, "Rust", "src") for path, _ in files]
+        analyzer = analyzer_class()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            for (path, text), uid in zip(files, uids):
+                analyzer.analyze(path, uid, model, text)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    symbols = {}
+    for symbol in model.symbols:
+        symbols.setdefault(symbol.unit_uid, set()).add((symbol.name, symbol.kind))
+    deps = {
+        uid: {(model.dep_verb(k), model.dep_target(k)) for k in keys}
+        for uid, keys in model._unit_dep_keys.items()
+    }
+    records = [(symbols.get(uid, set()), deps.get(uid, set())) for uid in uids]
+    return best, records
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--files", type=int, default=2000)
+    parser.add_argument("--project", help="Analyze the .rs files of a real tree instead")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.project:
+        files = read_corpus(os.path.expanduser(args.project))
+    else:
+        files = [(f"src/mod{i}.rs", SYNTHETIC_FILE.format(i=i).encode()) for i in range(args.files)]
+    size_mb = sum(len(text) for _, text in files) / (1024 * 1024)
+    print(f"{len(files)} files, {size_mb:.1f}MB")
+
+    results = []
+    for label, analyzer_class in ANALYZERS:
+        seconds, records = run(analyzer_class, files, args.repeat)
+        results.append((label, seconds, records))
+
+    print(f"{'analyzer':<12} {'symbols':>10} {'deps':>10} {'time':>8} {'MB/s':>8}")
+    for label, seconds, records in results:
+        n_symbols = sum(len(symbols) for symbols, _ in records)
+        n_deps = sum(len(deps) for _, deps in records)
+        print(f"{label:<12} {n_symbols:>10} {n_deps:>10} {seconds:>7.2f}s {size_mb / seconds:>8.1f}")
+
+    before, after = results[0][2], results[-1][2]
+    differing = [path for (path, _), old, new in zip(files, before, after) if old != new]
+    print(f"{len(differing)} of {len(files)} files differ")
+
+
+if __name__ == "__main__":
+    main()
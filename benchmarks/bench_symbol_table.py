@@ -0,0 +1,116 @@
+"""
+Peak-RSS benchmark: object symbol list vs. columnar symbol table.
+
+Each backend runs in its own child process so peak RSS is not shared.
+The child records ru_maxrss before building the model (interpreter and
+imports only) and after scan/resolve/finalize/write, and prints one JSON
+line that the parent tabulates.
+
+Usage:
+    python benchmarks/bench_symbol_table.py                      # synthetic, 1M symbols
+    python benchmarks/bench_symbol_table.py --symbols 3000000
+    python benchmarks/bench_symbol_table.py --project /path/to/tree
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pirgen.pirgen import scan_project, resolve_dependencies, sync_entry_roles  # noqa: E402
+from pirgen.core.dep_canon import canonicalize_dependencies  # noqa: E402
+from pirgen.core.pir_builder import PIRBuilder  # noqa: E402
+from pirgen.core.project_model import ProjectModel  # noqa: E402
+
+BACKENDS = ("list", "columnar")
+
+
+def peak_rss_mb() -> float:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def build_synthetic(model: ProjectModel, n_symbols: int, per_unit: int) -> None:
+    n_units = max(1, n_symbols // per_unit)
+    for u in range(n_units):
+        uid = model.add_unit(f"src/mod{u // 100}/file{u}.c", "C", module=f"mod{u // 100}")
+        base = u * per_unit
+        for i in range(per_unit):
+            attrs = {"entry": "true"} if i == 0 and u == 0 else {}
+            model.add_symbol(f"fn_{base + i}", uid, "func", **attrs)
+        # a few cross-unit calls per unit
+        for i in range(4):
+            model.add_dependency(uid, "call", f"[fn_{(base + i * 7919) % n_symbols}]")
+        model.add_dependency(uid, "include", "[stdio.h]")
+
+
+def run_child(args) -> None:
+    before = peak_rss_mb()
+    start = time.perf_counter()
+
+    model = ProjectModel("bench", args.project or "/bench", "generic",
+                         columnar=args.backend == "columnar")
+    with contextlib.redirect_stdout(io.StringIO()):
+        if args.project:
+            scan_project(args.project, model, use_cache=False)
+        else:
+            build_synthetic(model, args.symbols, args.per_unit)
+        sync_entry_roles(model)
+        resolve_dependencies(model)
+        canonicalize_dependencies(model)
+        model.finalize_dependencies()
+        with tempfile.TemporaryFile("w+", encoding="utf-8") as f:
+            PIRBuilder(model).write(f)
+            pir_size = f.tell()
+
+    print(json.dumps({
+        "backend": args.backend,
+        "symbols": len(model.symbols),
+        "rss_before_mb": round(before, 1),
+        "rss_after_mb": round(peak_rss_mb(), 1),
+        "seconds": round(time.perf_counter() - start, 2),
+        "pir_bytes": pir_size,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--symbols", type=int, default=1_000_000)
+    parser.add_argument("--per-unit", type=int, default=50)
+    parser.add_argument("--project", help="Scan a real tree instead of synthetic symbols")
+    parser.add_argument("--backend", choices=BACKENDS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.backend:
+        run_child(args)
+        return
+
+    results = []
+    for backend in BACKENDS:
+        cmd = [sys.executable, os.path.abspath(__file__), "--backend", backend,
+               "--symbols", str(args.symbols), "--per-unit", str(args.per_unit)]
+        if args.project:
+            cmd += ["--project", os.path.abspath(args.project)]
+        out = subprocess.run(cmd, check=True, capture_output=True, text=True).stdout
+        results.append(json.loads(out.strip().splitlines()[-1]))
+
+    print(f"{'backend':<10} {'symbols':>10} {'rss before':>12} {'rss after':>12} {'delta':>10} {'time':>8}")
+    for r in results:
+        delta = r["rss_after_mb"] - r["rss_before_mb"]
+        print(f"{r['backend']:<10} {r['symbols']:>10} {r['rss_before_mb']:>10.1f}MB "
+              f"{r['rss_after_mb']:>10.1f}MB {delta:>8.1f}MB {r['seconds']:>7.2f}s")
+    if len({r["pir_bytes"] for r in results}) != 1:
+        print("WARNING: backends produced different PIR sizes")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,19 @@
+import io
 import re
 import os
+from typing import Optional
 from .base import BaseAnalyzer
 from ..core.project_model import ProjectModel
 
 class AsmLdAnalyzer(BaseAnalyzer):
-    def analyze(self, file_path: str, unit_uid: str, model: ProjectModel):
+    def analyze(
+        self, file_path: str, unit_uid: str, model: ProjectModel, content: Optional[bytes] = None
+    ):
         ext = os.path.splitext(file_path)[1].lower()
         if ext in (".ld", ".lds"):
-            self._analyze_ld(file_path, unit_uid, model)
+            self._analyze_ld(file_path, unit_uid, model, content)
         else:
-            self._analyze_asm(file_path, unit_uid, model)
+            self._analyze_asm(file_path, unit_uid, model, content)
 
     # ------------------------
     # ASM
@@ -63,9 +67,11 @@ class AsmLdAnalyzer(BaseAnalyzer):
             s = s[:m.start()].rstrip()
         return s.strip()
 
-    def _analyze_asm(self, file_path: str, unit_uid: str, model: ProjectModel):
+    def _analyze_asm(
+        self, file_path: str, unit_uid: str, model: ProjectModel, content: Optional[bytes] = None
+    ):
         try:
-            with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
+            with io.StringIO(self.read_source(file_path, content)) as f:
                 for raw in f:
                     if not raw.strip():
                         continue
@@ -132,10 +138,11 @@ class AsmLdAnalyzer(BaseAnalyzer):
     # ------------------------
     # LD
     # ------------------------
-    def _analyze_ld(self, file_path: str, unit_uid: str, model: ProjectModel):
+    def _analyze_ld(
+        self, file_path: str, unit_uid: str, model: ProjectModel, content: Optional[bytes] = None
+    ):
         try:
-            with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
-                content = f.read()
+            content = self.read_source(file_path, content)
 
             # 1) ENTRY(symbol)
             entry_match = re.search(r'ENTRY\s*\(\s*([A-Za-z_.$][\w.$]*)\s*\)', content)
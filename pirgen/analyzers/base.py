@@ -1,11 +1,31 @@
 # analyzers/base.py
 from abc import ABC, abstractmethod
+from typing import Optional
 from ..core.project_model import ProjectModel
 
 class BaseAnalyzer(ABC):
     @abstractmethod
-    def analyze(self, file_path: str, unit_uid: str, model: ProjectModel):
+    def analyze(
+        self, file_path: str, unit_uid: str, model: ProjectModel, content: Optional[bytes] = None
+    ):
         """
         分析单个文件，提取符号和依赖，填充到 model 中。
+
+        content 为调用方已读入的文件内容（与缓存哈希共用同一缓冲区）；
+        为 None 时由分析器自行读取 file_path。
+        """
+        pass
+
+    @staticmethod
+    def read_source(file_path: str, content: Optional[bytes] = None) -> str:
+        """
+        返回解码后的源码文本，与 open(..., errors="ignore") 的结果一致
+        （包括通用换行符转换）。
         """
-        pass
\ No newline at end of file
+        if content is None:
+            with open(file_path, "rb") as f:
+                content = f.read()
+        text = content.decode("utf-8", errors="ignore")
+        if "\r" in text:
+            text = text.replace("\r\n", "\n").replace("\r", "\n")
+        return text
@@ -1,6 +1,8 @@
 # analyzers/c_analyzer.py
 import re
+from typing import Optional
 from .base import BaseAnalyzer
+from .c_lexer import find_functions
 from ..core.project_model import ProjectModel
 
 
@@ -20,24 +22,10 @@ class CAnalyzer(BaseAnalyzer):
     - Preserve structure for later dependency factoring
     - Avoid overfitting to full C grammar
     - Support multiline continuation and modern C++ features
+    - Scan in linear time (c_lexer.py): no backtracking regex over the
+      whole file, so large generated sources stay fast
     """
 
-    _func_pattern = re.compile(
-        r'^\s*'
-        r'(?:template\s*<\w[^>]*>\s*)?'
-        r'(?:static\s+|extern\s+|inline\s+|constexpr\s+)?'
-        r'(?:'
-        r'(?:\w+\s+)+?'
-        r'|'
-        r'auto\s+'
-        r')'
-        r'(\w+)\s*'
-        r'\([^)]*\)\s*'
-        r'(?:->[^{]+)?'
-        r'\{',
-        re.MULTILINE
-    )
-
     _include_pattern = re.compile(
         r'^\s*#include\s*(<[^>]+>|"[^"]+")',
         re.MULTILINE
@@ -60,10 +48,11 @@ class CAnalyzer(BaseAnalyzer):
             i += 1
         return '\n'.join(result)
 
-    def analyze(self, file_path: str, unit_uid: str, model: ProjectModel):
+    def analyze(
+        self, file_path: str, unit_uid: str, model: ProjectModel, content: Optional[bytes] = None
+    ):
         try:
-            with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
-                content = f.read()
+            content = self.read_source(file_path, content)
 
             joined_content = self._join_continuation_lines(content)
             self._analyze_functions(joined_content, unit_uid, model)
@@ -77,9 +66,7 @@ class CAnalyzer(BaseAnalyzer):
     # ----------------------------
 
     def _analyze_functions(self, content: str, unit_uid: str, model: ProjectModel):
-        for match in self._func_pattern.finditer(content):
-            func_name = match.group(1)
-
+        for func_name in find_functions(content):
             if func_name in C_KEYWORDS:
                 continue
 
@@ -96,14 +83,8 @@ class CAnalyzer(BaseAnalyzer):
     def _analyze_includes(self, content: str, unit_uid: str, model: ProjectModel):
         for match in self._include_pattern.finditer(content):
             raw = match.group(1)
+            header = raw[1:-1]
 
-            if raw.startswith("<"):
-                header = raw[1:-1]
-                dep_type = "include_sys"
-            else:
-                header = raw[1:-1]
-                dep_type = "include_local"
-
-            # 现在仍然输出为 include，
-            # 但 dep_type 已经可以用于后续归约
-            model.add_dependency(unit_uid, "include", f"[{header}]", kind=dep_type)
+            # <header> 只在 include 路径中查找，"header" 先查找所在目录
+            verb = "include_sys" if raw.startswith("<") else "include"
+            model.add_dependency(unit_uid, verb, f"[{header}]")
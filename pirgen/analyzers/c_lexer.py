@@ -0,0 +1,329 @@
+# analyzers/c_lexer.py
+"""
+Single-pass C/C++ scanner for function definitions.
+
+find_functions() walks the source once, skipping comments, string and
+character literals (including C++ raw strings) and preprocessor lines,
+and tracks brace depth:
+
+- Function bodies, initializers (``= {``) and enum bodies are skipped
+  wholesale; inside them only braces, literals and directives are looked
+  at, so large tables and generated code cost one regex hop per brace.
+- Namespace, class/struct and ``extern "C"`` bodies are scanned like the
+  top level, so inline member functions are still found. A statement
+  there is split into tokens only when a ``{`` ends it; declarations
+  ending with ``;`` are passed over in one hop. Braces inside parentheses
+  (``f(Opts o = {})``) stay part of the statement.
+- Like ctags, each ``#if`` / ``#else`` branch starts from the brace depth
+  at its ``#if``, and the first branch's depth is kept after ``#endif``,
+  so signatures duplicated across branches do not unbalance the scan.
+
+A definition is recognized the way CAnalyzer's former regex did:
+type words starting a line (optionally after ``template<...>``), the
+name, a parameter list without nested ``)``, an optional ``-> type``
+and the opening brace. Everything is linear in the size of the input.
+"""
+
+import re
+from typing import List, Optional, Tuple
+
+# Skip mode: the next character that can change the brace depth, hide
+# braces (quotes, comments) or start a preprocessor line
+_SKIP_RE = re.compile(r"""[{}"'/#]""")
+# Scan mode: the same plus the end of a statement
+_SCAN_RE = re.compile(r"""[{};"'/#]""")
+
+# Statement tokens, split only when a brace ends the statement
+_TOKEN_RE = re.compile(r"(?P<nl>\n)|(?P<word>\w+)|(?P<arrow>->)|(?P<other>\S)")
+
+_STRING_RE = re.compile(r'"(?:[^"\\\n]|\\.)*"?', re.DOTALL)
+_CHAR_RE = re.compile(r"'(?:[^'\\\n]|\\.)*'?", re.DOTALL)
+_RAW_PREFIXES = frozenset(("R", "u8R", "uR", "UR", "LR"))
+_DIRECTIVE_RE = re.compile(r"\#[ \t]*(\w*)")
+_DIRECTIVE_REST_RE = re.compile(r"(?:[^\n/\"']|/(?![*/]))*")
+
+_CONDITIONAL_START = frozenset(("if", "ifdef", "ifndef"))
+_CONDITIONAL_ELSE = frozenset(("else", "elif", "elifdef", "elifndef"))
+
+# Words allowed between a function's ``)`` and its body
+_QUALIFIERS = frozenset(
+    ("const", "volatile", "noexcept", "override", "final", "mutable", "try", "throw")
+)
+
+# Token kinds: (text, is_word, starts_line)
+Token = Tuple[str, bool, bool]
+
+
+def _skip_comment(content: str, pos: int) -> int:
+    """End of the comment starting at pos (which holds ``//`` or ``/*``)."""
+    if content.startswith("//", pos):
+        end = content.find("\n", pos)
+        return len(content) if end == -1 else end
+    end = content.find("*/", pos + 2)
+    return len(content) if end == -1 else end + 2
+
+
+def _skip_quote(content: str, pos: int) -> int:
+    """End of the string or character literal starting at pos."""
+    start = pos
+    while start and (content[start - 1].isalnum() or content[start - 1] == "_"):
+        start -= 1
+    prefix = content[start:pos]
+
+    if content[pos] == '"':
+        if prefix in _RAW_PREFIXES:
+            # R"delim( ... )delim"
+            open_paren = content.find("(", pos + 1, pos + 18)
+            delim = content[pos + 1:open_paren]
+            if open_paren != -1 and not any(c in delim for c in ' )\\\t\n"'):
+                end = content.find(")" + delim + '"', open_paren)
+                return len(content) if end == -1 else end + len(delim) + 2
+        return _STRING_RE.match(content, pos).end()
+
+    # 1'000'000: C++14 digit separators are no literals
+    if prefix and prefix[0].isdigit():
+        return pos + 1
+    return _CHAR_RE.match(content, pos).end()
+
+
+def _skip_directive(content: str, pos: int) -> Tuple[str, int]:
+    """Name and end (the newline) of the preprocessor line at pos."""
+    match = _DIRECTIVE_RE.match(content, pos)
+    pos = _DIRECTIVE_REST_RE.match(content, match.end()).end()
+    while pos < len(content) and content[pos] != "\n":
+        if content[pos] == "/":
+            pos = _skip_comment(content, pos)
+        else:
+            pos = _skip_quote(content, pos)
+        pos = _DIRECTIVE_REST_RE.match(content, pos).end()
+    return match.group(1), pos
+
+
+def _template_prefix_at_line_start(tokens: List[Token], close: int) -> bool:
+    """Whether tokens[close] (a ``>``) ends a line-starting ``template<\\w...>``."""
+    i = close - 1
+    while i >= 1 and tokens[i][0] != ">":
+        if tokens[i][0] == "<" and tokens[i - 1][0] == "template":
+            return tokens[i - 1][2] and i + 1 < close and tokens[i + 1][1]
+        i -= 1
+    return False
+
+
+def _signature_name(tokens: List[Token]) -> Optional[str]:
+    """
+    Name of the function whose body opens after tokens, if they end with
+    a definition signature (see module docstring).
+    """
+    count = len(tokens)
+    for close in range(count):
+        if tokens[close][0] != ")":
+            continue
+        if close + 1 < count and tokens[close + 1][0] != "->":
+            continue
+        # The parameter list: back to the nearest "(" (no ")" inside)
+        open_ = close - 1
+        while open_ >= 0 and tokens[open_][0] not in "()":
+            open_ -= 1
+        if open_ < 1 or tokens[open_][0] != "(" or not tokens[open_ - 1][1]:
+            continue
+        name_at = open_ - 1
+        first = name_at
+        while first >= 1 and tokens[first - 1][1]:
+            first -= 1
+        if first == name_at:
+            continue
+        if any(tokens[i][2] for i in range(first, name_at)) or (
+            first >= 1 and tokens[first - 1][0] == ">"
+            and _template_prefix_at_line_start(tokens, first - 1)
+        ):
+            return tokens[name_at][0]
+    return None
+
+
+def _opens_scope(tokens: List[Token]) -> bool:
+    """
+    Whether tokens start a namespace or class (never a function body);
+    ``class`` in template parameters does not count.
+    """
+    angle = 0
+    for text, _, _ in tokens:
+        if text == "<":
+            angle += 1
+        elif text == ">":
+            angle = max(angle - 1, 0)
+        elif text == "namespace" or (text == "class" and not angle):
+            return True
+    return False
+
+
+def _opens_opaque_block(tokens: List[Token]) -> bool:
+    """
+    Whether a ``{`` after tokens opens a body not to be scanned: a
+    function-like body (after ``)``, qualifiers or a ``-> type``), an
+    initializer or an enum. Namespace and class bodies are scanned.
+    """
+    if not tokens:
+        return False
+    if tokens[-1][0] == "=":
+        return True
+    if _opens_scope(tokens):
+        return False
+    texts = [token[0] for token in tokens]
+    if "enum" in texts:
+        return True
+    if "->" in texts and ")" in texts[: texts.index("->")]:
+        return True
+    i = len(texts) - 1
+    while i >= 0 and (texts[i] in _QUALIFIERS or texts[i] in ("&", "#")):
+        i -= 1
+    return i >= 0 and texts[i] == ")"
+
+
+def _parens(content: str, start: int, end: int) -> int:
+    """Parentheses opened minus closed in content[start:end]."""
+    return content.count("(", start, end) - content.count(")", start, end)
+
+
+def _tokenize(content: str, pieces: list) -> List[Token]:
+    """Tokens of a statement: source ranges and marker tokens, in order."""
+    tokens: List[Token] = []
+    line_started = True
+    for piece in pieces:
+        if isinstance(piece, str):
+            tokens.append((piece, False, not line_started))
+            line_started = True
+            continue
+        if piece[0] == 0 or content[piece[0] - 1] == "\n":
+            line_started = False
+        for match in _TOKEN_RE.finditer(content, *piece):
+            kind = match.lastgroup
+            if kind == "nl":
+                line_started = False
+                continue
+            tokens.append((match.group(), kind == "word", not line_started))
+            line_started = True
+    return tokens
+
+
+def find_functions(content: str) -> List[str]:
+    """
+    Names of the function definitions in C/C++ source, in source order.
+
+    Args:
+        content: Source text, with backslash continuations already joined
+
+    Returns:
+        Function names (duplicates kept, C keywords not filtered)
+    """
+    names: List[str] = []
+    pos = 0
+
+    scope_depth = 0  # open braces whose contents are scanned
+    skip_depth = 0  # open braces of the body being skipped
+    parens = 0  # open parentheses of the statement, up to piece_start
+    # One entry per open #if: [state at #if, state at the end of branch 1]
+    conditionals: List[list] = []
+
+    # The current statement: (start, end) source ranges and marker tokens
+    # for literals ('"') and preprocessor lines ("#"); it is only split
+    # into tokens when a brace ends it
+    pieces: list = []
+    piece_start = 0
+
+    skip_search = _SKIP_RE.search
+    scan_search = _SCAN_RE.search
+
+    while True:
+        found = (skip_search if skip_depth else scan_search)(content, pos)
+        if found is None:
+            break
+        at, pos = found.span()
+        ch = content[at]
+
+        if ch in "{};":
+            if skip_depth:
+                if ch == "{":
+                    skip_depth += 1
+                elif ch == "}":
+                    skip_depth -= 1
+                    if not skip_depth:
+                        pieces, piece_start, parens = [], pos, 0
+                continue
+            if ch == ";":
+                pieces, piece_start, parens = [], pos, 0
+                continue
+            parens += _parens(content, piece_start, at)
+            if parens > 0:
+                # f(int x = {}): the brace stays part of the statement
+                pieces.append((piece_start, pos))
+                piece_start = pos
+                continue
+            if ch == "}":
+                if scope_depth:
+                    scope_depth -= 1
+                pieces, piece_start, parens = [], pos, 0
+                continue
+            pieces.append((piece_start, at))
+            tokens = _tokenize(content, pieces)
+            name = _signature_name(tokens)
+            if name is not None and _opens_scope(tokens):
+                # namespace std _GLIBCXX_VISIBILITY(default) {
+                scope_depth += 1
+            elif name is not None:
+                names.append(name)
+                skip_depth = 1
+            elif _opens_opaque_block(tokens):
+                skip_depth = 1
+            else:
+                scope_depth += 1
+            pieces, piece_start, parens = [], pos, 0
+            continue
+
+        # Comments, literals and preprocessor lines
+        if ch == "/":
+            if not content.startswith(("//", "/*"), at):
+                continue
+            pos = _skip_comment(content, at)
+            marker = None
+        elif ch in "\"'":
+            # A literal is part of the statement (extern "C", '=' 'x')
+            pos = _skip_quote(content, at)
+            marker = '"'
+        else:
+            line = content.rfind("\n", 0, at) + 1
+            if content[line:at].strip(" \t"):
+                continue  # not at the start of a line
+            directive, pos = _skip_directive(content, at)
+            marker = "#"
+            state = _conditional(conditionals, directive, (scope_depth, skip_depth))
+            if state is not None:
+                scope_depth, skip_depth = state
+                pieces, piece_start, parens = [], pos, 0
+                continue
+        if not skip_depth:
+            parens += _parens(content, piece_start, at)
+            pieces.append((piece_start, at))
+            if marker:
+                pieces.append(marker)
+            piece_start = pos
+
+    return names
+
+
+def _conditional(conditionals: List[list], directive: str, state: Tuple[int, int]):
+    """
+    Track #if / #else / #endif; returns the brace state to continue
+    with, or None to keep the current one.
+    """
+    if directive in _CONDITIONAL_START:
+        conditionals.append([state, None])
+    elif directive in _CONDITIONAL_ELSE and conditionals:
+        entry = conditionals[-1]
+        if entry[1] is None:
+            entry[1] = state
+        return entry[0]
+    elif directive == "endif" and conditionals:
+        start, first_branch = conditionals.pop()
+        if first_branch is not None:
+            return first_branch
+    return None
@@ -0,0 +1,223 @@
+# analyzers/py_outline.py
+"""
+Outline of a Python module from its tokens, without building an AST.
+
+outline() reports what PythonAnalyzer's AST pass does: public top-level
+functions and classes, public definitions nested in them and imports at
+any depth (inside ``if TYPE_CHECKING:`` bodies or not). It is meant for
+very large files, where ``ast.parse`` dominates time and memory.
+
+The tokenizer gives exact structure: ``def``, ``class``, ``import`` and
+``from`` are hard keywords, and INDENT / DEDENT tokens delimit blocks.
+Each logical line is split into statements at ``;`` and at the colon of
+a compound statement header, so ``try: import x`` is seen too. Only
+NAME and OP tokens are kept; literals never hold definitions.
+
+A module the outline cannot mirror exactly is left to the AST: tokenizer
+errors, and parenthesized ``TYPE_CHECKING`` tests (``if (TYPE_CHECKING):``
+is one to the AST, but parentheses may also hide a call).
+
+split_regions() cuts a module that does not parse into pieces that may,
+so PythonAnalyzer can salvage the valid parts of a broken file.
+"""
+
+import io
+import tokenize
+from typing import List, Optional, Tuple
+
+# Statements whose header ends with a colon; a same-line body follows it
+_COMPOUND = frozenset(
+    ("def", "class", "if", "elif", "else", "for", "while", "try", "except",
+     "finally", "with", "match", "case")
+)
+_TYPE_CHECKING_TESTS = (["TYPE_CHECKING"], ["typing", ".", "TYPE_CHECKING"])
+_KEPT = frozenset((tokenize.NAME, tokenize.OP))
+# First tokens of the lines split_regions() cuts before
+_REGION_STARTS = frozenset(("def", "class", "async", "import", "from", "@"))
+_OPEN = frozenset("([{")
+_CLOSE = frozenset(")]}")
+
+# (name, kind, nested) and (module, level, type_checking)
+OutlineSymbol = Tuple[str, str, bool]
+OutlineImport = Tuple[str, int, bool]
+
+
+class _Ambiguous(Exception):
+    """The token stream does not determine the AST's result."""
+
+
+def _find(line: List[str], start: int, stop: str) -> int:
+    """Index of ``stop`` at bracket depth 0 from start, or len(line)."""
+    depth = 0
+    for i in range(start, len(line)):
+        text = line[i]
+        if text in _OPEN:
+            depth += 1
+        elif text in _CLOSE:
+            depth -= 1
+        elif text == stop and not depth:
+            return i
+        elif text == ";" and not depth:
+            return len(line) if stop == ":" else i
+    return len(line)
+
+
+def _imports(line: List[str], start: int, end: int, type_checking: bool) -> List[OutlineImport]:
+    """Modules of the import statement line[start:end]."""
+    if line[start] == "from":
+        level = 0
+        i = start + 1
+        while i < end and line[i] in (".", "..."):
+            level += len(line[i])
+            i += 1
+        module = []
+        while i < end and line[i] != "import":
+            module.append(line[i])
+            i += 1
+        return [("".join(module), level, type_checking)]
+
+    found = []
+    name: List[str] = []
+    alias = False
+    for text in line[start + 1:end] + [","]:
+        if text == ",":
+            if name:
+                found.append(("".join(name), 0, type_checking))
+            name, alias = [], False
+        elif text == "as":
+            alias = True
+        elif not alias:
+            name.append(text)
+    return found
+
+
+def outline(text: str) -> Optional[Tuple[List[OutlineSymbol], List[OutlineImport]]]:
+    """
+    Symbols and imports of a module, in source order.
+
+    Args:
+        text: Decoded source text
+
+    Returns:
+        (symbols, imports), or None if the module needs the AST (see the
+        module docstring)
+    """
+    symbols: List[OutlineSymbol] = []
+    imports: List[OutlineImport] = []
+    # (nested, type_checking) of each open indented block: nested marks
+    # the body of a public top-level definition
+    blocks: List[Tuple[bool, bool]] = []
+    opens = (False, False)  # context of the block the last line opens
+    line: List[str] = []
+
+    try:
+        for token in tokenize.generate_tokens(io.StringIO(text).readline):
+            kind = token[0]
+            if kind in _KEPT:
+                line.append(token[1])
+            elif kind == tokenize.NEWLINE:
+                if line:
+                    opens = _statements(line, blocks, symbols, imports)
+                    line = []
+            elif kind == tokenize.INDENT:
+                blocks.append(opens)
+            elif kind == tokenize.DEDENT:
+                blocks.pop()
+    except (tokenize.TokenError, SyntaxError, _Ambiguous):
+        return None
+    return symbols, imports
+
+
+def _statements(
+    line: List[str],
+    blocks: List[Tuple[bool, bool]],
+    symbols: List[OutlineSymbol],
+    imports: List[OutlineImport],
+) -> Tuple[bool, bool]:
+    """
+    Record the statements of one logical line; returns the context of
+    the block it opens, if any.
+    """
+    nested, type_checking = blocks[-1] if blocks else (False, False)
+    opens = (nested, type_checking)
+    i = 0
+    count = len(line)
+    while i < count:
+        first = line[i]
+        if first == "async" and i + 1 < count:
+            i += 1
+            first = line[i]
+
+        if first in ("import", "from"):
+            end = _find(line, i, ";")
+            imports.extend(_imports(line, i, end, type_checking))
+            i = end + 1
+            continue
+
+        if first not in _COMPOUND:
+            i = _find(line, i, ";") + 1
+            continue
+        colon = _find(line, i, ":")
+        if colon == count:
+            # match = ..., a soft keyword used as a name
+            i = _find(line, i, ";") + 1
+            continue
+
+        if first in ("def", "class") and i + 1 < colon:
+            name = line[i + 1]
+            public = not name.startswith("_")
+            kind = "class" if first == "class" else "func"
+            if not blocks:
+                if public:
+                    symbols.append((name, kind, False))
+                opens = (public, type_checking)
+            elif nested and public:
+                symbols.append((name, kind, True))
+        elif first in ("if", "elif"):
+            test = line[i + 1:colon]
+            bare = [text for text in test if text not in "()"]
+            if test in _TYPE_CHECKING_TESTS:
+                type_checking = True
+                opens = (nested, True)
+            elif bare in _TYPE_CHECKING_TESTS:
+                raise _Ambiguous()
+        i = colon + 1
+    return opens
+
+
+def split_regions(text: str) -> List[str]:
+    """
+    Split a module before every top-level ``def``, ``class``, ``import``
+    and ``from`` line, keeping decorators with their definition.
+
+    Lines are found with tokenize, so none inside strings count. Lines in
+    unclosed brackets still do (a keyword at column 0 there is where the
+    code resumes). After a tokenizer error, tokenizing restarts on the
+    line following it.
+
+    Args:
+        text: Decoded source text
+
+    Returns:
+        Consecutive regions covering all of text
+    """
+    lines = text.splitlines(keepends=True)
+    starts = {0}
+    first = 0  # line the tokenizer (re)starts on
+    while first < len(lines):
+        readline = map(lines.__getitem__, range(first, len(lines))).__next__
+        previous = None  # first token of the previous column 0 line
+        try:
+            for kind, string, (row, col), _, _ in tokenize.generate_tokens(readline):
+                if col or kind not in _KEPT:
+                    continue
+                if string in _REGION_STARTS and previous != "@":
+                    starts.add(first + row - 1)
+                previous = string
+            break
+        except (tokenize.TokenError, SyntaxError) as e:
+            position = e.args[1] if isinstance(e, tokenize.TokenError) else (e.lineno or 0,)
+            first += max(position[0], 1)
+
+    bounds = sorted(starts) + [len(lines)]
+    return ["".join(lines[start:end]) for start, end in zip(bounds, bounds[1:]) if start < end]
@@ -1,10 +1,16 @@
 # analyzers/python_analyzer.py
 import ast
 import os
+from typing import Optional, Tuple
 from .base import BaseAnalyzer
+from .py_outline import outline, split_regions
 from ..core.project_model import ProjectModel
 
 
+# Statement lists: definitions and imports never occur inside expressions
+_BLOCK_FIELDS = ("body", "orelse", "finalbody", "handlers", "cases")
+
+
 class PythonAnalyzer(BaseAnalyzer):
     """
     Python analyzer for PIR.
@@ -13,110 +19,92 @@ class PythonAnalyzer(BaseAnalyzer):
     - Export only module-level API symbols
     - Preserve import semantics for dependency factoring
     - Avoid AST noise (methods, locals, tests)
+    - One pass over the statements of a module (see _UnitVisitor)
+    - Files of at least outline_threshold characters are read from their
+      tokens (py_outline.py) instead of an AST, with the same result
+    - Files with syntax errors are parsed region by region; the unit keeps
+      what parses and is marked partial
+
+    Args:
+        outline_threshold: Size from which the token outline is used; None
+            parses every file
     """
 
-    def analyze(self, file_path: str, unit_uid: str, model: ProjectModel):
+    OUTLINE_THRESHOLD = 1 << 20
+
+    def __init__(self, outline_threshold: Optional[int] = OUTLINE_THRESHOLD):
+        self.outline_threshold = outline_threshold
+
+    def analyze(
+        self, file_path: str, unit_uid: str, model: ProjectModel, content: Optional[bytes] = None
+    ):
         try:
-            with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
-                content = f.read()
-
-            tree = ast.parse(content)
-
-            type_checking_nodes = self._find_type_checking_blocks(tree)
-
-            for node in tree.body:
-                if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
-                    if node.name.startswith("_"):
-                        continue
-
-                    attrs = {}
-                    if node.name == "main":
-                        attrs["entry"] = "true"
-
-                    model.add_symbol(node.name, unit_uid, "func", **attrs)
-                    self._process_nested_symbols(node, unit_uid, model)
-
-                elif isinstance(node, ast.ClassDef):
-                    if node.name.startswith("_"):
-                        continue
-
-                    model.add_symbol(node.name, unit_uid, "class")
-                    self._process_nested_symbols(node, unit_uid, model)
-
-            for node in ast.walk(tree):
-                if isinstance(node, ast.Import):
-                    for alias in node.names:
-                        name = alias.name
-                        kind = self._classify_import(name)
-                        if node in type_checking_nodes:
-                            kind = "import_type_checking"
-                        model.add_dependency(
-                            unit_uid,
-                            kind=kind,
-                            target=f"[{name}]",
-                        )
-
-                elif isinstance(node, ast.ImportFrom):
-                    module = node.module or ""
-                    level = node.level or 0
-
-                    if level > 0:
-                        kind = "import_relative"
-                        target = "." * level + (module or "")
-                    else:
-                        kind = self._classify_import(module)
-                        target = module
-
-                    if node in type_checking_nodes:
-                        kind = "import_type_checking"
-
-                    if target:
-                        model.add_dependency(
-                            unit_uid,
-                            kind=kind,
-                            target=f"[{target}]",
-                        )
+            content = self.read_source(file_path, content)
+
+            if self.outline_threshold is not None and len(content) >= self.outline_threshold:
+                if self._analyze_outline(content, unit_uid, model):
+                    return
+
+            try:
+                tree = ast.parse(content)
+            except SyntaxError as e:
+                print(f"Warning: Syntax error in {file_path}: {e}; salvaging what parses")
+                self._analyze_regions(content, unit_uid, model)
+                model.mark_partial(unit_uid)
+                return
+
+            _UnitVisitor(self, unit_uid, model).visit(tree)
 
         except Exception as e:
             print(f"Warning: Failed to analyze {file_path}: {e}")
 
-    def _process_nested_symbols(self, node, unit_uid: str, model: ProjectModel):
-        for child in ast.walk(node):
-            if child is node:
+    def _analyze_regions(self, content: str, unit_uid: str, model: ProjectModel):
+        """Analyze each top-level region of a broken file that parses on its own."""
+        for region in split_regions(content):
+            try:
+                tree = ast.parse(region)
+            except SyntaxError:
                 continue
-            if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef)):
-                if not child.name.startswith("_"):
-                    model.add_symbol(child.name, unit_uid, "func", nested="true")
-            elif isinstance(child, ast.ClassDef):
-                if not child.name.startswith("_"):
-                    model.add_symbol(child.name, unit_uid, "class", nested="true")
-
-    def _find_type_checking_blocks(self, tree: ast.AST) -> set:
-        result = set()
-        for node in ast.walk(tree):
-            if isinstance(node, ast.If):
-                test = node.test
-                if isinstance(test, ast.Name) and test.id == "TYPE_CHECKING":
-                    for child in node.body:
-                        result.add(child)
-                        for subchild in ast.walk(child):
-                            result.add(subchild)
-                elif (
-                    isinstance(test, ast.Attribute)
-                    and test.attr == "TYPE_CHECKING"
-                    and isinstance(test.value, ast.Name)
-                    and test.value.id == "typing"
-                ):
-                    for child in node.body:
-                        result.add(child)
-                        for subchild in ast.walk(child):
-                            result.add(subchild)
-        return result
+            _UnitVisitor(self, unit_uid, model).visit(tree)
+
+    def _analyze_outline(self, content: str, unit_uid: str, model: ProjectModel) -> bool:
+        """Record symbols and imports from tokens; False if the AST is needed."""
+        result = outline(content)
+        if result is None:
+            return False
+        symbols, imports = result
+
+        for name, kind, nested in symbols:
+            if nested:
+                model.add_symbol(name, unit_uid, kind, nested="true")
+            elif kind == "func" and name == "main":
+                model.add_symbol(name, unit_uid, kind, entry="true")
+            else:
+                model.add_symbol(name, unit_uid, kind)
+
+        for module, level, type_checking in imports:
+            kind, target = self._import_dependency(module, level, type_checking)
+            if target:
+                model.add_dependency(unit_uid, kind=kind, target=f"[{target}]")
+        return True
 
     # ----------------------------
     # Import classification
     # ----------------------------
 
+    def _import_dependency(self, module: str, level: int, type_checking: bool) -> Tuple[str, str]:
+        """(kind, target) of an import of module, relative if level > 0."""
+        if level > 0:
+            kind = "import_relative"
+            target = "." * level + module
+        else:
+            kind = self._classify_import(module)
+            target = module
+
+        if type_checking:
+            kind = "import_type_checking"
+        return kind, target
+
     def _classify_import(self, module: str) -> str:
         if not module:
             return "import_unknown"
@@ -130,3 +118,102 @@ class PythonAnalyzer(BaseAnalyzer):
             return "import_private"
 
         return "import_external"
+
+
+class _UnitVisitor(ast.NodeVisitor):
+    """
+    Emits the symbols and imports of one module in a single pass.
+
+    Public top-level functions and classes become symbols, and public
+    definitions anywhere inside them nested symbols. Imports are recorded
+    at any depth; inside ``if TYPE_CHECKING:`` bodies (tracked as a depth
+    while visiting them) they become ``import_type_checking``. Only
+    statement lists are descended into, never expressions.
+    """
+
+    def __init__(self, analyzer: PythonAnalyzer, unit_uid: str, model: ProjectModel):
+        self.analyzer = analyzer
+        self.unit_uid = unit_uid
+        self.model = model
+        self.type_checking = 0  # enclosing TYPE_CHECKING bodies
+        self.nested = False  # inside a public top-level function or class
+
+    def generic_visit(self, node):
+        for field in _BLOCK_FIELDS:
+            for child in getattr(node, field, ()):
+                self.visit(child)
+
+    def visit_Module(self, node: ast.Module):
+        for child in node.body:
+            if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                self._visit_top_level(child)
+            else:
+                self.visit(child)
+
+    def _visit_top_level(self, node):
+        if node.name.startswith("_"):
+            self.generic_visit(node)
+            return
+
+        if isinstance(node, ast.ClassDef):
+            self.model.add_symbol(node.name, self.unit_uid, "class")
+        else:
+            attrs = {}
+            if node.name == "main":
+                attrs["entry"] = "true"
+            self.model.add_symbol(node.name, self.unit_uid, "func", **attrs)
+
+        self.nested = True
+        self.generic_visit(node)
+        self.nested = False
+
+    def _visit_definition(self, node, kind: str):
+        if self.nested and not node.name.startswith("_"):
+            self.model.add_symbol(node.name, self.unit_uid, kind, nested="true")
+        self.generic_visit(node)
+
+    def visit_FunctionDef(self, node: ast.FunctionDef):
+        self._visit_definition(node, "func")
+
+    def visit_AsyncFunctionDef(self, node: ast.AsyncFunctionDef):
+        self._visit_definition(node, "func")
+
+    def visit_ClassDef(self, node: ast.ClassDef):
+        self._visit_definition(node, "class")
+
+    def visit_If(self, node: ast.If):
+        test = node.test
+        if (isinstance(test, ast.Name) and test.id == "TYPE_CHECKING") or (
+            isinstance(test, ast.Attribute)
+            and test.attr == "TYPE_CHECKING"
+            and isinstance(test.value, ast.Name)
+            and test.value.id == "typing"
+        ):
+            self.type_checking += 1
+            for child in node.body:
+                self.visit(child)
+            self.type_checking -= 1
+            for child in node.orelse:
+                self.visit(child)
+        else:
+            self.generic_visit(node)
+
+    def visit_Import(self, node: ast.Import):
+        for alias in node.names:
+            kind, target = self.analyzer._import_dependency(alias.name, 0, bool(self.type_checking))
+            self.model.add_dependency(
+                self.unit_uid,
+                kind=kind,
+                target=f"[{target}]",
+            )
+
+    def visit_ImportFrom(self, node: ast.ImportFrom):
+        kind, target = self.analyzer._import_dependency(
+            node.module or "", node.level or 0, bool(self.type_checking)
+        )
+        if target:
+            self.model.add_dependency(
+                self.unit_uid,
+                kind=kind,
+                target=f"[{target}]",
+            )
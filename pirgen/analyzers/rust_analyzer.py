@@ -1,7 +1,9 @@
 # analyzers/rust_analyzer.py
-import re
+from typing import Optional
 from .base import BaseAnalyzer
+from .rust_lexer import scan_items
 from ..core.project_model import ProjectModel
+from ..core.rust_modules import expand_use_tree
 
 
 class RustAnalyzer(BaseAnalyzer):
@@ -12,96 +14,34 @@ class RustAnalyzer(BaseAnalyzer):
     - Capture only high-confidence definitions
     - Preserve module boundary semantics
     - Enable dependency factoring at PIR build stage
-    """
-
-    # fn 定义（要求有函数体） - 支持 async fn 和泛型函数
-    # 格式: [pub] [async] fn name<T>(...) { 或 [pub] [async] fn name(...) {
-    _fn_pattern = re.compile(
-        r"^\s*(?:pub\s+)?(?:async\s+)?fn\s+(\w+)\s*(?:<[^>]*>)?\s*[^;{]*\{",
-        re.MULTILINE
-    )
-
-    # struct / enum / trait 定义
-    _type_pattern = re.compile(
-        r"^\s*(?:pub\s+)?(struct|enum|trait)\s+(\w+)", re.MULTILINE
-    )
 
-    # impl 定义 - 支持 impl Struct 和 impl Trait for Struct
-    _impl_pattern = re.compile(
-        r"^\s*(?:pub\s+)?impl\s+(?:\w+\s+for\s+)?(\w+)\s*\{", re.MULTILINE
-    )
-
-    # use 路径 - 支持复杂路径和分组导入
-    _use_pattern = re.compile(r"^\s*use\s+([^;]+);", re.MULTILINE)
+    Items come from one pass of rust_lexer.scan_items(), which skips
+    comments and literals.
+    """
 
-    def analyze(self, file_path: str, unit_uid: str, model: ProjectModel):
+    def analyze(
+        self, file_path: str, unit_uid: str, model: ProjectModel, content: Optional[bytes] = None
+    ):
         try:
-            with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
-                content = f.read()
-
-            self._analyze_functions(content, unit_uid, model)
-            self._analyze_types(content, unit_uid, model)
-            self._analyze_impls(content, unit_uid, model)
-            self._analyze_uses(content, unit_uid, model)
+            content = self.read_source(file_path, content)
+
+            items = scan_items(content)
+
+            # 单次扫描，按类别输出：函数、类型、impl，然后 mod 和 use 依赖
+            for name in dict.fromkeys(items.functions):
+                attrs = {"entry": "true"} if name == "main" else {}
+                model.add_symbol(name, unit_uid, "func", **attrs)
+            for kind, name in items.types:
+                model.add_symbol(name, unit_uid, kind)
+            for name in dict.fromkeys(items.impls):
+                model.add_symbol(name, unit_uid, "impl")
+            for name in items.mods:
+                model.add_dependency(unit_uid, "mod", f"[{name}]")
+            for tree in items.uses:
+                # 分组导入展开为逐项路径：a::{b, c} -> a::b, a::c
+                for path in expand_use_tree(tree):
+                    model.add_dependency(unit_uid, "use", f"[{path}]")
 
         except Exception as e:
             print(f"Warning: Rust analysis failed for {file_path}: {e}")
 
-    # ----------------------------
-    # Function analysis
-    # ----------------------------
-
-    def _analyze_functions(self, content: str, unit_uid: str, model: ProjectModel):
-        found = set()
-        for match in self._fn_pattern.finditer(content):
-            name = match.group(1)
-            if name in found:
-                continue
-            found.add(name)
-
-            attrs = {}
-            if name == "main":
-                attrs["entry"] = "true"
-
-            model.add_symbol(name, unit_uid, "func", **attrs)
-
-    # ----------------------------
-    # Type analysis
-    # ----------------------------
-
-    def _analyze_types(self, content: str, unit_uid: str, model: ProjectModel):
-        for match in self._type_pattern.finditer(content):
-            kind, name = match.groups()
-            model.add_symbol(name, unit_uid, kind)
-
-    # ----------------------------
-    # Impl analysis
-    # ----------------------------
-
-    def _analyze_impls(self, content: str, unit_uid: str, model: ProjectModel):
-        found = set()
-        for match in self._impl_pattern.finditer(content):
-            name = match.group(1)
-            if name in found:
-                continue
-            found.add(name)
-            model.add_symbol(name, unit_uid, "impl")
-
-    # ----------------------------
-    # Use dependency analysis
-    # ----------------------------
-
-    def _analyze_uses(self, content: str, unit_uid: str, model: ProjectModel):
-        for match in self._use_pattern.finditer(content):
-            path = match.group(1).strip()
-
-            if path.startswith("std::"):
-                dep_kind = "use_std"
-            elif path.startswith("crate::"):
-                dep_kind = "use_crate"
-            elif path.startswith(("self::", "super::")):
-                dep_kind = "use_relative"
-            else:
-                dep_kind = "use_external"
-
-            model.add_dependency(unit_uid, "use", f"[{path}]", kind=dep_kind)
@@ -0,0 +1,263 @@
+# analyzers/rust_lexer.py
+"""
+Single-pass Rust item scanner.
+
+scan_items() walks the source once with one combined pattern that stops
+at comments, string and character literals and item keywords (``fn``,
+``struct``, ``enum``, ``trait``, ``impl``, ``mod``, ``use``):
+
+- Line and block comments (block comments nest in Rust), strings, byte
+  strings and raw strings (``r#"..."#``) are skipped wholesale, so
+  nothing inside them is taken for an item. A ``'`` is a character
+  literal only if one (possibly escaped) character and a closing quote
+  follow; otherwise it starts a lifetime or a label.
+- A keyword counts as an item only if nothing but attributes and
+  modifiers precedes it on its line: ``pub`` / ``pub(crate)`` /
+  ``pub(in path)``, ``const``, ``async``, ``unsafe``, ``default`` and
+  ``extern "ABI"``. ``impl Trait`` in a signature or ``fn(u8)`` in a
+  type is therefore ignored, as before. Only the first keyword of a
+  line is checked, so the prefix of each line is matched once.
+- Bodies are scanned too, so methods and nested items are found.
+- A ``use`` tree extends to its ``;`` across lines and comments.
+
+Functions count only with a body: a ``{`` before the ``;`` that would end
+a declaration (``;`` inside ``[T; N]`` does not). Scanning resumes after
+an item's header, so no text is searched twice and everything is linear
+in the size of the input.
+"""
+
+import re
+from typing import List, NamedTuple, Optional, Tuple
+
+# The next comment, literal or item keyword
+_SCAN_RE = re.compile(r"""/[/*]|["']|\b(?:fn|struct|enum|trait|impl|mod|use)\b""")
+
+# What may precede an item keyword on its line
+_PREFIX_RE = re.compile(
+    r"""[ \t]*(?:\#!?\[[^\]\n]*\][ \t]*)*"""
+    r"""(?:(?:pub(?:[ \t]*\([^)\n]*\))?|const|async|unsafe|default"""
+    r"""|extern(?:[ \t]*"[^"\n]*")?)[ \t]+)*"""
+)
+
+_NAME_RE = re.compile(r"\s+(?:r\#)?(\w+)")
+_MOD_RE = re.compile(r"\s+(?:r\#)?(\w+)\s*;")
+_STRING_RE = re.compile(r'"(?:[^"\\]|\\.)*"?', re.DOTALL)
+_CHAR_RE = re.compile(r"'(?:[^'\\\n]|\\(?:x[0-9a-fA-F]{2}|u\{[0-9a-fA-F_]*\}|.))'")
+_BLOCK_COMMENT_RE = re.compile(r"/\*|\*/")
+# Characters that end an item header, brackets that hide a ``;`` and
+# the starts of comments and literals
+_HEADER_RE = re.compile(r"""[;{}\[\]"'/]""")
+_USE_END_RE = re.compile(r"[;/]")
+_IMPL_TOKEN_RE = re.compile(r"->|::|\w+|\S")
+
+_TYPE_KEYWORDS = frozenset(("struct", "enum", "trait"))
+
+
+class RustItems(NamedTuple):
+    """Items of a Rust source file, each list in source order."""
+
+    functions: List[str]  # functions with a body, duplicates kept
+    types: List[Tuple[str, str]]  # (struct | enum | trait, name)
+    impls: List[str]  # implemented type names, duplicates kept
+    mods: List[str]  # out-of-line modules: mod foo;
+    uses: List[str]  # use trees, not expanded
+
+
+def _skip_comment(content: str, pos: int) -> int:
+    """End of the comment starting at pos (which holds ``//`` or ``/*``)."""
+    if content.startswith("//", pos):
+        end = content.find("\n", pos)
+        return len(content) if end == -1 else end
+    depth = 0
+    for match in _BLOCK_COMMENT_RE.finditer(content, pos):
+        depth += 1 if match.group() == "/*" else -1
+        if not depth:
+            return match.end()
+    return len(content)
+
+
+def _skip_string(content: str, pos: int) -> int:
+    """End of the string literal whose opening quote is at pos."""
+    start = pos
+    while start and content[start - 1] == "#":
+        start -= 1
+    hashes = pos - start
+    if start and content[start - 1] == "r":
+        # r"..", r#".."#, br"..", cr".." (and no identifier ending in r)
+        word = start - 1
+        if word and content[word - 1] in "bc":
+            word -= 1
+        if not word or not (content[word - 1].isalnum() or content[word - 1] == "_"):
+            end = content.find('"' + "#" * hashes, pos + 1)
+            return len(content) if end == -1 else end + 1 + hashes
+    return _STRING_RE.match(content, pos).end()
+
+
+def _header_end(content: str, pos: int) -> Tuple[str, int]:
+    """
+    The ``{``, ``;`` or ``}`` (a macro invocation's end) ending the item
+    header at pos and its index; comments and literals in the header
+    are skipped.
+    """
+    depth = 0
+    search = _HEADER_RE.search
+    while True:
+        match = search(content, pos)
+        if match is None:
+            return "", len(content)
+        at, pos = match.span()
+        ch = match.group()
+        if ch == "/":
+            if content.startswith(("//", "/*"), at):
+                pos = _skip_comment(content, at)
+        elif ch == '"':
+            pos = _skip_string(content, at)
+        elif ch == "'":
+            char = _CHAR_RE.match(content, at)
+            if char is not None:
+                pos = char.end()
+        elif ch == "[":
+            depth += 1
+        elif ch == "]":
+            depth = max(depth - 1, 0)
+        elif not depth:
+            return ch, at
+
+
+def _use_end(content: str, pos: int) -> int:
+    """Index of the ``;`` ending the use tree at pos (comments skipped)."""
+    while True:
+        match = _USE_END_RE.search(content, pos)
+        if match is None:
+            return len(content)
+        at = match.start()
+        if match.group() == ";":
+            return at
+        pos = _skip_comment(content, at) if content.startswith(("//", "/*"), at) else at + 1
+
+
+def _impl_name(header: str) -> Optional[str]:
+    """
+    Name of the type an impl header (the text between ``impl`` and ``{``)
+    implements: the last path segment of the self type, with generics,
+    references and ``dyn`` dropped. None for tuples, slices, type
+    parameters and the like.
+    """
+    tokens = _IMPL_TOKEN_RE.findall(header)
+    i = 0
+    params = set()
+    # impl<T: Trait<U>, const N: usize> ...
+    if tokens[:1] == ["<"]:
+        depth = 0
+        for i, text in enumerate(tokens):
+            if text == "<":
+                depth += 1
+            elif text == ">":
+                depth -= 1
+                if not depth:
+                    break
+            elif depth == 1 and tokens[i - 1] in ("<", ",", "const"):
+                params.add(text)
+        i += 1
+
+    # The self type follows the last top-level "for", before any "where"
+    start = i
+    depth = 0
+    for j in range(i, len(tokens)):
+        text = tokens[j]
+        if text in "<([":
+            depth += 1
+        elif text in ">)]":
+            depth -= 1
+        elif not depth and text == "where":
+            tokens = tokens[:j]
+            break
+        elif not depth and text == "for":
+            start = j + 1
+
+    i = start
+    while i < len(tokens) and tokens[i] in ("&", "'", "mut", "dyn", "!"):
+        # &'a mut T: a lifetime is "'" and its name
+        i += 2 if tokens[i] == "'" else 1
+    name = None
+    while i < len(tokens) and (tokens[i][0].isalpha() or tokens[i][0] == "_"):
+        name = tokens[i]
+        if tokens[i + 1:i + 2] != ["::"]:
+            break
+        i += 2
+    # impl<T: Display> ToString for T: a blanket impl names no type
+    return None if name in params else name
+
+
+def scan_items(content: str) -> RustItems:
+    """
+    Items defined and modules used by Rust source (see module docstring).
+
+    Args:
+        content: Source text
+
+    Returns:
+        RustItems of the source
+    """
+    items = RustItems([], [], [], [], [])
+    pos = 0
+    last_keyword = -1  # where the previous keyword was checked
+    search = _SCAN_RE.search
+
+    while True:
+        found = search(content, pos)
+        if found is None:
+            break
+        at, pos = found.span()
+        word = found.group()
+
+        if word[0] == "/":
+            pos = _skip_comment(content, at)
+            continue
+        if word == '"':
+            pos = _skip_string(content, at)
+            continue
+        if word == "'":
+            char = _CHAR_RE.match(content, at)
+            if char is not None:
+                pos = char.end()
+            continue
+
+        # A later keyword on the line of a checked one starts no item
+        same_line = last_keyword >= 0 and content.rfind("\n", last_keyword, at) == -1
+        last_keyword = at
+        if same_line:
+            continue
+        line = content.rfind("\n", 0, at) + 1
+        if not _PREFIX_RE.fullmatch(content, line, at):
+            continue
+
+        if word == "use":
+            end = _use_end(content, pos)
+            items.uses.append(content[pos:end])
+            pos = end + 1
+        elif word == "mod":
+            match = _MOD_RE.match(content, pos)
+            if match is not None:
+                items.mods.append(match.group(1))
+                pos = match.end()
+        elif word == "impl":
+            ch, end = _header_end(content, pos)
+            if ch == "{":
+                name = _impl_name(content[pos:end])
+                if name is not None:
+                    items.impls.append(name)
+            pos = end
+        else:
+            match = _NAME_RE.match(content, pos)
+            if match is None:
+                continue
+            pos = match.end()
+            if word in _TYPE_KEYWORDS:
+                items.types.append((word, match.group(1)))
+                continue
+            ch, pos = _header_end(content, pos)
+            if ch == "{":
+                items.functions.append(match.group(1))
+
+    return items
@@ -10,9 +10,15 @@ not the final ProjectModel or PIR output.
 import json
 import hashlib
 import os
-from typing import Dict, List, Optional, Any
+import sqlite3
+import time
+from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime
 
+# Algorithms usable for content hashing (shake_* need an explicit length)
+HASH_ALGORITHMS = sorted(a for a in hashlib.algorithms_guaranteed if not a.startswith("shake"))
+DEFAULT_HASH = "sha256"
+
 
 class AnalysisCache:
     """
@@ -23,111 +29,508 @@ class AnalysisCache:
     - unit metadata
     - symbols
     - dependency keys
-    """
 
-    CACHE_VERSION = "pir-analyzer-v1"
+    A stat manifest maps each relative path to (mtime_ns, size, inode,
+    content hash), so files whose stat tuple is unchanged are served
+    from their entry without being opened or hashed.
+
+    All entries and the manifest live in one SQLite database
+    (.pir-cache/cache.sqlite). The manifest and the entries it points to
+    are read in one query when the cache is opened; new entries are
+    buffered and written in a single transaction by flush(). Caches in
+    the old one-JSON-file-per-entry layout (.pir-cache/v1) are imported
+    the first time the database is created.
+
+    The content hash algorithm is configurable. Digests other than the
+    default SHA-256 are stored as "<algo>:<hex>" so entries produced by
+    different algorithms never collide.
+
+    Directory snapshots record each scanned directory's mtime and raw
+    children, so discovery can replay unchanged directories instead of
+    listing them again (see dir_snapshot()).
+    """
 
-    def __init__(self, root: str):
+    CACHE_VERSION = "pir-analyzer-v8"
+    DB_FILE = "cache.sqlite"
+    LEGACY_MANIFEST_FILE = "manifest.json"
+
+    _SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS meta ("
+        " key TEXT PRIMARY KEY, value TEXT NOT NULL)",
+        "CREATE TABLE IF NOT EXISTS entries ("
+        " lang TEXT NOT NULL, hash TEXT NOT NULL, data TEXT NOT NULL,"
+        " PRIMARY KEY (lang, hash)) WITHOUT ROWID",
+        "CREATE TABLE IF NOT EXISTS manifest ("
+        " path TEXT PRIMARY KEY, lang TEXT NOT NULL, mtime_ns INTEGER NOT NULL,"
+        " size INTEGER NOT NULL, ino INTEGER NOT NULL, hash TEXT NOT NULL)"
+        " WITHOUT ROWID",
+        "CREATE TABLE IF NOT EXISTS dirs ("
+        " path TEXT PRIMARY KEY, mtime_ns INTEGER NOT NULL,"
+        " listed_ns INTEGER NOT NULL, children TEXT NOT NULL) WITHOUT ROWID",
+    )
+
+    def __init__(self, root: str, hash_name: str = DEFAULT_HASH):
         """
         Initialize cache with project root.
 
         Args:
             root: Project root directory
+            hash_name: hashlib algorithm used for content hashes
         """
-        self.root = os.path.join(root, ".pir-cache", "v1")
+        if hash_name not in HASH_ALGORITHMS:
+            raise ValueError(f"Unsupported hash algorithm: {hash_name}")
+        self.hash_name = hash_name
+        self.project_root = root
+        self.cache_dir = os.path.join(root, ".pir-cache")
+        self.root = os.path.join(self.cache_dir, "v1")  # legacy JSON layout
+        self.db_path = os.path.join(self.cache_dir, self.DB_FILE)
+
+        # rel_path -> [mtime_ns, size, ino, hash, lang]
+        self._manifest: Dict[str, List] = {}
+        self._manifest_written_ns = 0
+        self._dirty_paths = set()
+        self._deleted_paths = set()
+
+        # (lang, hash) -> raw JSON text, for entries preloaded or saved this run
+        self._entries: Dict[Tuple[str, str], str] = {}
+        self._new_entries: Dict[Tuple[str, str], str] = {}
+
+        # rel_dir -> (mtime_ns, listed_ns, raw JSON children)
+        self._dirs: Dict[str, Tuple[int, int, str]] = {}
+        self._dirty_dirs = set()
+        self._deleted_dirs = set()
+        self.dir_hits = 0
+        self.dir_misses = 0
+
+        self._conn: Optional[sqlite3.Connection] = None
+        self._open()
+
+    # ------------------------
+    # Store
+    # ------------------------
+    def _open(self) -> None:
+        os.makedirs(self.cache_dir, exist_ok=True)
+        is_new = not os.path.exists(self.db_path)
+        try:
+            self._conn = sqlite3.connect(self.db_path)
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            with self._conn:
+                for stmt in self._SCHEMA:
+                    self._conn.execute(stmt)
+            version = self._get_meta("version")
+            if version != self.CACHE_VERSION:
+                with self._conn:
+                    self._conn.execute("DELETE FROM entries")
+                    self._conn.execute("DELETE FROM manifest")
+                    self._conn.execute("DELETE FROM dirs")
+                    self._set_meta("version", self.CACHE_VERSION)
+            if is_new and os.path.isdir(self.root):
+                self._migrate_legacy()
+            self._preload()
+        except sqlite3.DatabaseError as e:
+            # A corrupt database is just a cold cache
+            print(f"Warning: ignoring unreadable cache {self.db_path}: {e}")
+            if self._conn is not None:
+                self._conn.close()
+            self._conn = None
+            self._manifest = {}
+            self._entries = {}
+            self._dirs = {}
+
+    def _get_meta(self, key: str) -> Optional[str]:
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key: str, value: str) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value)
+        )
+
+    def _preload(self) -> None:
+        """
+        Bulk-load the manifest and the entries it references in one query,
+        plus the directory snapshots.
+        """
+        written = self._get_meta("written_ns")
+        self._manifest_written_ns = int(written) if written else 0
+
+        rows = self._conn.execute(
+            "SELECT m.path, m.mtime_ns, m.size, m.ino, m.hash, m.lang, e.data"
+            " FROM manifest m LEFT JOIN entries e"
+            " ON e.lang = m.lang AND e.hash = m.hash"
+        )
+        for path, mtime_ns, size, ino, h, lang, data in rows:
+            self._manifest[path] = [mtime_ns, size, ino, h, lang]
+            if data is not None:
+                self._entries[(lang, h)] = data
+
+        for path, mtime_ns, listed_ns, children in self._conn.execute(
+            "SELECT path, mtime_ns, listed_ns, children FROM dirs"
+        ):
+            self._dirs[path] = (mtime_ns, listed_ns, children)
+
+    def _migrate_legacy(self) -> None:
+        """
+        Import a v1 cache (one indented JSON file per entry) into the database.
 
-    def file_hash(self, path: str) -> str:
+        The JSON files are left in place; clear() removes them.
+        """
+        rows = []
+        hash_langs = {}
+        for lang_entry in os.scandir(self.root):
+            if not lang_entry.is_dir():
+                continue
+            with os.scandir(lang_entry.path) as cache_entries:
+                for cache_entry in cache_entries:
+                    if not cache_entry.name.endswith(".json"):
+                        continue
+                    try:
+                        with open(cache_entry.path, "r", encoding="utf-8") as f:
+                            data = json.load(f)
+                    except (json.JSONDecodeError, IOError):
+                        continue
+                    if data.get("version") != self.CACHE_VERSION or "hash" not in data:
+                        continue
+                    h = data["hash"]
+                    rows.append((lang_entry.name, h, self._encode(data)))
+                    hash_langs[h] = lang_entry.name
+
+        manifest_rows = []
+        try:
+            with open(os.path.join(self.root, self.LEGACY_MANIFEST_FILE), "r", encoding="utf-8") as f:
+                legacy = json.load(f)
+        except (json.JSONDecodeError, IOError):
+            legacy = {}
+        if legacy.get("version") == self.CACHE_VERSION:
+            for path, (mtime_ns, size, ino, h) in legacy.get("files", {}).items():
+                if h in hash_langs:
+                    manifest_rows.append((path, hash_langs[h], mtime_ns, size, ino, h))
+
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO entries (lang, hash, data) VALUES (?, ?, ?)", rows
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO manifest (path, lang, mtime_ns, size, ino, hash)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                manifest_rows,
+            )
+            if manifest_rows:
+                self._set_meta("written_ns", str(legacy.get("written_ns", 0)))
+
+    @staticmethod
+    def _encode(data: Dict[str, Any]) -> str:
+        return json.dumps(data, separators=(",", ":"), sort_keys=True)
+
+    def _fetch_entry(self, lang: str, h: str) -> Optional[str]:
+        key = (lang, h)
+        raw = self._entries.get(key)
+        if raw is None and self._conn is not None:
+            row = self._conn.execute(
+                "SELECT data FROM entries WHERE lang = ? AND hash = ?", key
+            ).fetchone()
+            if row:
+                raw = row[0]
+        return raw
+
+    def flush(self) -> None:
+        """
+        Write buffered entries and manifest changes in one transaction.
+        """
+        if self._conn is None:
+            return
+        if not (
+            self._new_entries
+            or self._dirty_paths
+            or self._deleted_paths
+            or self._dirty_dirs
+            or self._deleted_dirs
+        ):
+            return
+
+        self._manifest_written_ns = time.time_ns()
+        manifest_rows = []
+        for path in self._dirty_paths:
+            mtime_ns, size, ino, h, lang = self._manifest[path]
+            manifest_rows.append((path, lang, mtime_ns, size, ino, h))
+
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO entries (lang, hash, data) VALUES (?, ?, ?)",
+                [(lang, h, data) for (lang, h), data in self._new_entries.items()],
+            )
+            self._conn.executemany(
+                "DELETE FROM manifest WHERE path = ?",
+                [(path,) for path in self._deleted_paths],
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO manifest (path, lang, mtime_ns, size, ino, hash)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                manifest_rows,
+            )
+            self._conn.executemany(
+                "DELETE FROM dirs WHERE path = ?", [(d,) for d in self._deleted_dirs]
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO dirs (path, mtime_ns, listed_ns, children)"
+                " VALUES (?, ?, ?, ?)",
+                [(d, *self._dirs[d]) for d in self._dirty_dirs],
+            )
+            self._set_meta("written_ns", str(self._manifest_written_ns))
+
+        self._new_entries = {}
+        self._dirty_paths = set()
+        self._deleted_paths = set()
+        self._dirty_dirs = set()
+        self._deleted_dirs = set()
+
+    def close(self) -> None:
+        """
+        Flush pending writes and close the database.
+        """
+        self.flush()
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    # ------------------------
+    # Stat manifest
+    # ------------------------
+    def _stat_key(self, st: os.stat_result) -> List[int]:
+        return [st.st_mtime_ns, st.st_size, st.st_ino]
+
+    def _manifest_hash(self, rel_path: str, st: os.stat_result) -> Optional[str]:
         """
-        Calculate SHA256 hash of file content.
+        Return the recorded content hash if the file's stat tuple is unchanged.
+
+        Entries whose mtime is not older than the manifest itself are
+        "racily clean" (the file may have been rewritten within the same
+        timestamp tick) and are re-hashed instead.
+        """
+        entry = self._manifest.get(rel_path)
+        if not entry or entry[:3] != self._stat_key(st):
+            return None
+        if st.st_mtime_ns >= self._manifest_written_ns:
+            return None
+        return entry[3]
+
+    def _record_manifest(self, rel_path: str, st: os.stat_result, h: str, lang: str) -> None:
+        entry = self._stat_key(st) + [h, lang]
+        if self._manifest.get(rel_path) != entry:
+            self._manifest[rel_path] = entry
+            self._dirty_paths.add(rel_path)
+            self._deleted_paths.discard(rel_path)
+
+    def cached_digest(self, path: str, st: os.stat_result) -> Optional[str]:
+        """
+        Return the manifest's content hash for path if its stat is unchanged.
+
+        Lets callers skip reading a file whose entry can be found by stat alone.
+        """
+        return self._manifest_hash(os.path.relpath(path, self.project_root), st)
+
+    # ------------------------
+    # Directory snapshots
+    # ------------------------
+    def dir_snapshot(self, rel_dir: str, st: os.stat_result) -> Optional[List[Tuple[str, str]]]:
+        """
+        Return a directory's recorded children if its mtime is unchanged.
+
+        Adding, removing or renaming an entry updates the directory's
+        mtime, so an unchanged mtime means the listing is still valid.
+        Snapshots whose mtime is not older than the listing itself are
+        racily clean and count as a miss. Counts go to dir_hits/dir_misses.
 
         Args:
-            path: Path to the file
+            rel_dir: Directory relative to the project root ("" for the root)
+            st: Current stat result of the directory
 
         Returns:
-            Hex digest of SHA256 hash
+            [(name, kind)] with kind "d" (directory) or "f", or None
         """
-        sha256 = hashlib.sha256()
-        with open(path, "rb") as f:
-            # Read in chunks to reduce memory usage for large files
-            for chunk in iter(lambda: f.read(8192), b''):
-                sha256.update(chunk)
-        return sha256.hexdigest()
+        row = self._dirs.get(rel_dir)
+        if row is None or row[0] != st.st_mtime_ns or st.st_mtime_ns >= row[1]:
+            self.dir_misses += 1
+            return None
+        try:
+            children = [(c[1:], c[0]) for c in json.loads(row[2])]
+        except (json.JSONDecodeError, IndexError, TypeError):
+            self.dir_misses += 1
+            return None
+        self.dir_hits += 1
+        return children
+
+    def save_dir_snapshot(
+        self,
+        rel_dir: str,
+        st: os.stat_result,
+        listed_ns: int,
+        children: List[Tuple[str, str]],
+    ) -> None:
+        """
+        Buffer a directory listing; it is written by the next flush().
 
-    def _get_cache_file(self, path: str, lang: str) -> str:
+        Args:
+            rel_dir: Directory relative to the project root ("" for the root)
+            st: Stat result of the directory taken before listing it
+            listed_ns: time.time_ns() taken before listing it
+            children: [(name, kind)] as returned by dir_snapshot()
+        """
+        raw = json.dumps([kind + name for name, kind in children], separators=(",", ":"))
+        row = (st.st_mtime_ns, listed_ns, raw)
+        if self._dirs.get(rel_dir) != row:
+            self._dirs[rel_dir] = row
+            self._dirty_dirs.add(rel_dir)
+            self._deleted_dirs.discard(rel_dir)
+
+    def retain_dir_snapshots(self, rel_dirs) -> None:
         """
-        Get cache file path for a source file.
+        Drop snapshots of directories a complete walk no longer reached.
 
         Args:
-            path: Source file path
-            lang: Language identifier (PY, C, Rust, JAVA)
+            rel_dirs: Directories visited by the walk
+        """
+        for rel_dir in set(self._dirs).difference(rel_dirs):
+            del self._dirs[rel_dir]
+            self._dirty_dirs.discard(rel_dir)
+            self._deleted_dirs.add(rel_dir)
+
+    def _tag(self, hexdigest: str) -> str:
+        if self.hash_name == DEFAULT_HASH:
+            return hexdigest
+        return f"{self.hash_name}:{hexdigest}"
+
+    def digest(self, content: bytes) -> str:
+        """
+        Hash an in-memory file buffer.
+
+        Args:
+            content: File content
 
         Returns:
-            Path to cache file
+            Content hash as stored in cache entries
         """
-        h = self.file_hash(path)
-        lang_dir = lang.lower()
-        return os.path.join(self.root, lang_dir, h + ".json")
+        return self._tag(hashlib.new(self.hash_name, content).hexdigest())
 
-    def load(self, path: str, lang: str) -> Optional[Dict[str, Any]]:
+    def file_hash(self, path: str) -> str:
         """
-        Load cached analysis for a file.
+        Hash file content without holding the whole file in memory.
 
         Args:
-            path: Source file path
-            lang: Language identifier
+            path: Path to the file
 
         Returns:
-            Cached data dict or None if not found/invalid
+            Content hash as stored in cache entries
         """
-        cache_file = self._get_cache_file(path, lang)
+        with open(path, "rb") as f:
+            if hasattr(hashlib, "file_digest"):  # Python 3.11+
+                return self._tag(hashlib.file_digest(f, self.hash_name).hexdigest())
+            h = hashlib.new(self.hash_name)
+            # Read in chunks to reduce memory usage for large files
+            for chunk in iter(lambda: f.read(65536), b''):
+                h.update(chunk)
+        return self._tag(h.hexdigest())
 
-        if not os.path.exists(cache_file):
+    def _read_entry(self, lang: str, h: str) -> Optional[Dict[str, Any]]:
+        raw = self._fetch_entry(lang.lower(), h)
+        if raw is None:
             return None
-
         try:
-            with open(cache_file, "r", encoding="utf-8") as f:
-                data = json.load(f)
+            data = json.loads(raw)
+        except json.JSONDecodeError:
+            return None
+
+        # Verify cache version
+        if data.get("version") != self.CACHE_VERSION:
+            return None
+
+        # Verify the entry belongs to this content
+        if data.get("hash") != h:
+            return None
 
-            # Verify cache version
-            if data.get("version") != self.CACHE_VERSION:
-                return None
+        return data
 
-            # Verify hash matches
-            if data.get("hash") != self.file_hash(path):
-                return None
+    def load(
+        self,
+        path: str,
+        lang: str,
+        st: Optional[os.stat_result] = None,
+        digest: Optional[str] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Load cached analysis for a file.
+
+        Args:
+            path: Source file path
+            lang: Language identifier
+            st: Stat result for path, if the caller already has one
+            digest: Content hash, if the caller already computed it
 
-            return data
-        except (json.JSONDecodeError, IOError, KeyError):
+        Returns:
+            Cached data dict or None if not found/invalid
+        """
+        rel_path = os.path.relpath(path, self.project_root)
+        try:
+            if st is None:
+                st = os.stat(path)
+        except OSError:
             return None
 
-    def save(self, path: str, lang: str, data: Dict[str, Any]) -> None:
+        if digest is None:
+            # Fast path: unchanged stat tuple, no need to read the source
+            h = self._manifest_hash(rel_path, st)
+            if h is not None:
+                data = self._read_entry(lang, h)
+                if data is not None:
+                    return data
+
+        try:
+            h = digest if digest is not None else self.file_hash(path)
+        except IOError:
+            return None
+        data = self._read_entry(lang, h)
+        if data is not None:
+            self._record_manifest(rel_path, st, h, lang.lower())
+        return data
+
+    def save(
+        self,
+        path: str,
+        lang: str,
+        data: Dict[str, Any],
+        st: Optional[os.stat_result] = None,
+        digest: Optional[str] = None,
+    ) -> None:
         """
-        Save analysis result to cache.
+        Buffer an analysis result; it is written by the next flush().
 
         Args:
             path: Source file path
             lang: Language identifier
             data: Analysis result to cache
+            st: Stat result for path, if the caller already has one
+            digest: Content hash, if the caller already computed it
         """
-        cache_file = self._get_cache_file(path, lang)
-        lang_dir = os.path.dirname(cache_file)
-
-        # Create language directory if needed
-        os.makedirs(lang_dir, exist_ok=True)
+        if st is None:
+            st = os.stat(path)
+        h = digest if digest is not None else self.file_hash(path)
+        rel_path = os.path.relpath(path, self.project_root)
+        lang_key = lang.lower()
 
         # Prepare cache entry
         cache_entry = {
             "version": self.CACHE_VERSION,
-            "file": os.path.relpath(path, os.path.dirname(self.root).rstrip(os.sep)),
-            "hash": self.file_hash(path),
+            "file": rel_path,
+            "hash": h,
             "lang": lang,
             "timestamp": datetime.utcnow().isoformat(),
             **data
         }
 
-        # Write cache file
-        with open(cache_file, "w", encoding="utf-8") as f:
-            json.dump(cache_entry, f, indent=2, sort_keys=True)
+        raw = self._encode(cache_entry)
+        self._entries[(lang_key, h)] = raw
+        self._new_entries[(lang_key, h)] = raw
+        self._record_manifest(rel_path, st, h, lang_key)
 
     def invalidate(self, path: str, lang: str) -> None:
         """
@@ -137,17 +540,45 @@ class AnalysisCache:
             path: Source file path
             lang: Language identifier
         """
-        cache_file = self._get_cache_file(path, lang)
-        if os.path.exists(cache_file):
-            os.remove(cache_file)
+        rel_path = os.path.relpath(path, self.project_root)
+        entry = self._manifest.pop(rel_path, None)
+        self._dirty_paths.discard(rel_path)
+        self._deleted_paths.add(rel_path)
+
+        hashes = {entry[3]} if entry else set()
+        if os.path.exists(path):
+            hashes.add(self.file_hash(path))
+        lang_key = lang.lower()
+        for h in hashes:
+            self._entries.pop((lang_key, h), None)
+            self._new_entries.pop((lang_key, h), None)
+            if self._conn is not None:
+                with self._conn:
+                    self._conn.execute(
+                        "DELETE FROM entries WHERE lang = ? AND hash = ?", (lang_key, h)
+                    )
 
     def clear(self) -> None:
         """
         Clear all cache entries.
         """
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
         if os.path.exists(self.root):
             import shutil
             shutil.rmtree(self.root)
+        self._manifest = {}
+        self._entries = {}
+        self._new_entries = {}
+        self._dirty_paths = set()
+        self._deleted_paths = set()
+        self._dirs = {}
+        self._dirty_dirs = set()
+        self._deleted_dirs = set()
+        self._open()
 
     def get_stats(self) -> Dict[str, Any]:
         """
@@ -162,26 +593,19 @@ class AnalysisCache:
             "total_size_bytes": 0
         }
 
-        if not os.path.exists(self.root):
+        if self._conn is None:
             return stats
 
-        for lang_entry in os.scandir(self.root):
-            if not lang_entry.is_dir():
-                continue
-
-            count = 0
-            size = 0
-            with os.scandir(lang_entry.path) as cache_entries:
-                for cache_entry in cache_entries:
-                    if cache_entry.name.endswith(".json"):
-                        count += 1
-                        size += cache_entry.stat().st_size
-
-            stats["by_language"][lang_entry.name] = {
+        self.flush()
+        rows = self._conn.execute(
+            "SELECT lang, COUNT(*), SUM(LENGTH(data)) FROM entries GROUP BY lang"
+        )
+        for lang, count, size in rows:
+            stats["by_language"][lang] = {
                 "entries": count,
-                "size_bytes": size
+                "size_bytes": size or 0
             }
             stats["total_entries"] += count
-            stats["total_size_bytes"] += size
+            stats["total_size_bytes"] += size or 0
 
         return stats
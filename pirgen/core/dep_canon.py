@@ -75,16 +75,20 @@ def canonicalize_dependencies(model):
 
     new_unit_keys = {}
     new_all = set()
+    # 依赖键已驻留为整数：每个不同的键只归一化一次
+    key_memo = {}
 
     for uid, keys in model._unit_dep_keys.items():
-        new_keys_set = set()
+        # 与 ProjectModel 相同的有序集合（dict 保序去重）
+        new_keys = {}
         for k in keys:
-            verb, target = k.split(":", 1)
-            new_target = canonicalize_target(verb, target)
-            new_k = f"{verb}:{new_target}"
-            new_keys_set.add(new_k)
+            new_k = key_memo.get(k)
+            if new_k is None:
+                new_target = canonicalize_target(model.dep_verb(k), model.dep_target(k))
+                new_k = key_memo[k] = model.dep_key(model.dep_verb(k), new_target)
+            new_keys[new_k] = None
             new_all.add(new_k)
-        new_unit_keys[uid] = list(new_keys_set)
+        new_unit_keys[uid] = new_keys
 
     model._unit_dep_keys = new_unit_keys
     model._all_dep_keys = new_all
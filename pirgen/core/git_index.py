@@ -0,0 +1,189 @@
+# core/git_index.py
+"""
+Read the file list of a git checkout straight from .git/index.
+
+Listing tracked files this way is one sequential read of the index
+instead of a walk of the whole tree, which matters when a checkout holds
+large ignored build or vendor directories.
+
+Supports index versions 2, 3 and 4 (prefix-compressed paths) and both
+SHA-1 and SHA-256 repositories. Split indexes ("link" extension) are not
+supported; read_index() returns None for them and callers fall back to
+walking the tree.
+"""
+
+import os
+import re
+import struct
+from typing import List, NamedTuple, Optional, Tuple
+
+INDEX_SIGNATURE = b"DIRC"
+
+# ctime s/ns, mtime s/ns, dev, ino, mode, uid, gid, size
+_STAT_FIELDS = struct.Struct(">10I")
+
+_FLAG_EXTENDED = 0x4000
+_FLAG_STAGE_MASK = 0x3000
+_FLAG_NAME_MASK = 0x0FFF
+_EXT_FLAG_SKIP_WORKTREE = 0x4000
+
+_MODE_TYPE_MASK = 0o170000
+_MODE_GITLINK = 0o160000
+_MODE_DIR = 0o040000  # sparse-index directory entry
+
+_OBJECT_FORMAT_RE = re.compile(rb"^\s*objectformat\s*=\s*sha256\s*$", re.I | re.M)
+
+
+class IndexEntry(NamedTuple):
+    path: str  # relative to the work tree, "/"-separated
+    mode: int
+
+
+def find_git_dir(start: str) -> Optional[Tuple[str, str]]:
+    """
+    Locate the repository containing ``start``.
+
+    Walks up from ``start`` looking for ``.git``, which may be a directory
+    or a file holding ``gitdir: <path>`` (worktrees, submodules).
+
+    Args:
+        start: Directory inside the work tree
+
+    Returns:
+        (git_dir, work_tree) or None when ``start`` is not in a checkout
+    """
+    path = os.path.abspath(start)
+    while True:
+        dot_git = os.path.join(path, ".git")
+        if os.path.isdir(dot_git):
+            return dot_git, path
+        if os.path.isfile(dot_git):
+            try:
+                with open(dot_git, "r", encoding="utf-8") as f:
+                    line = f.readline().strip()
+            except OSError:
+                return None
+            if not line.startswith("gitdir:"):
+                return None
+            git_dir = line[len("gitdir:"):].strip()
+            return os.path.normpath(os.path.join(path, git_dir)), path
+        parent = os.path.dirname(path)
+        if parent == path:
+            return None
+        path = parent
+
+
+def _hash_size(git_dir: str) -> int:
+    """20 for SHA-1 repositories, 32 for SHA-256 ones."""
+    common_dir = git_dir
+    try:
+        with open(os.path.join(git_dir, "commondir"), "r", encoding="utf-8") as f:
+            common_dir = os.path.join(git_dir, f.read().strip())
+    except OSError:
+        pass
+    try:
+        with open(os.path.join(common_dir, "config"), "rb") as f:
+            if _OBJECT_FORMAT_RE.search(f.read()):
+                return 32
+    except OSError:
+        pass
+    return 20
+
+
+def _read_varint(data: bytes, pos: int) -> Tuple[int, int]:
+    """Decode git's offset varint (used by index v4 path compression)."""
+    c = data[pos]
+    pos += 1
+    value = c & 0x7F
+    while c & 0x80:
+        c = data[pos]
+        pos += 1
+        value = ((value + 1) << 7) | (c & 0x7F)
+    return value, pos
+
+
+def read_index(git_dir: str) -> Optional[List[IndexEntry]]:
+    """
+    Parse ``<git_dir>/index``.
+
+    Only entries present in the work tree are returned: unmerged paths
+    are listed once, and submodules (gitlinks), sparse-index directories
+    and skip-worktree entries are left out.
+
+    Args:
+        git_dir: Repository directory, as returned by find_git_dir()
+
+    Returns:
+        Entries in index order, or None if the index is missing,
+        unreadable or uses an unsupported format
+    """
+    try:
+        with open(os.path.join(git_dir, "index"), "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+
+    if len(data) < 12 or data[:4] != INDEX_SIGNATURE:
+        return None
+    version, count = struct.unpack_from(">II", data, 4)
+    if version not in (2, 3, 4):
+        return None
+
+    hash_size = _hash_size(git_dir)
+    fixed = _STAT_FIELDS.size + hash_size  # stat fields + object id
+    entries: List[IndexEntry] = []
+    pos = 12
+    prev_path = b""
+    try:
+        for _ in range(count):
+            start = pos
+            mode = _STAT_FIELDS.unpack_from(data, pos)[6]
+            pos += fixed
+            (flags,) = struct.unpack_from(">H", data, pos)
+            pos += 2
+            ext_flags = 0
+            if flags & _FLAG_EXTENDED:
+                (ext_flags,) = struct.unpack_from(">H", data, pos)
+                pos += 2
+
+            if version == 4:
+                strip, pos = _read_varint(data, pos)
+                end = data.index(b"\0", pos)
+                path = prev_path[: len(prev_path) - strip] + data[pos:end]
+                pos = end + 1
+            else:
+                name_len = flags & _FLAG_NAME_MASK
+                if name_len == _FLAG_NAME_MASK:  # long name, length not stored
+                    end = data.index(b"\0", pos)
+                else:
+                    end = pos + name_len
+                path = data[pos:end]
+                # NUL-padded to a multiple of 8 bytes (at least one NUL)
+                pos = start + ((end - start + 8) & ~7)
+            prev_path = path
+
+            stage = (flags & _FLAG_STAGE_MASK) >> 12
+            kind = mode & _MODE_TYPE_MASK
+            if (
+                kind == _MODE_GITLINK
+                or kind == _MODE_DIR
+                or ext_flags & _EXT_FLAG_SKIP_WORKTREE
+            ):
+                continue
+            decoded = path.decode("utf-8", errors="surrogateescape")
+            if stage > 1 and entries and entries[-1].path == decoded:
+                continue  # same unmerged path at another stage
+            entries.append(IndexEntry(decoded, mode))
+
+        # Extensions: a split index keeps most entries in a shared file
+        end_of_ext = len(data) - hash_size
+        while pos + 8 <= end_of_ext:
+            signature = data[pos:pos + 4]
+            (ext_size,) = struct.unpack_from(">I", data, pos + 4)
+            if signature == b"link":
+                return None
+            pos += 8 + ext_size
+    except (struct.error, ValueError, IndexError):
+        return None
+
+    return entries
@@ -0,0 +1,281 @@
+# core/ignore_rules.py
+"""
+Hierarchical .gitignore / .airignore support.
+
+Rules follow gitignore semantics: blank lines and ``#`` comments are
+skipped, ``!`` re-includes, a trailing ``/`` matches directories only, a
+``/`` at the start or in the middle anchors the pattern to the file's
+directory, ``*``/``?``/``[...]`` never cross ``/``, and ``**`` spans
+directories (``**/x``, ``x/**``, ``a/**/b``). The last matching rule wins
+and rules in deeper directories override shallower ones. ``.airignore``
+is read after ``.gitignore`` of the same directory, so it wins there;
+``.git/info/exclude`` sits below everything else.
+
+Each directory's rules are compiled into one regex (alternatives in
+reverse order, so the first alternative that matches is the last rule),
+which makes the common "no rule matches" case one regex call per level.
+"""
+
+import os
+import re
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from .git_index import find_git_dir
+
+IGNORE_FILES = (".gitignore", ".airignore")
+
+
+class IgnoreRule(NamedTuple):
+    pattern: str
+    regex: str  # matches a path relative to the rule's directory
+    negate: bool
+    dir_only: bool
+
+
+def _translate_glob(pat: str) -> str:
+    """Translate a gitignore glob (without anchoring) to a regex body."""
+    out = []
+    i = 0
+    n = len(pat)
+    while i < n:
+        c = pat[i]
+        if c == "*":
+            if pat.startswith("**", i):
+                j = i + 2
+                at_start = i == 0 or pat[i - 1] == "/"
+                if at_start and j == n:
+                    out.append(".*")  # "x/**" or "**": everything below
+                    i = j
+                    continue
+                if at_start and pat[j] == "/":
+                    out.append("(?:.*/)?")  # "**/": zero or more directories
+                    i = j + 1
+                    continue
+                i = j  # any other "**" is a plain "*"
+            else:
+                i += 1
+            out.append("[^/]*")
+            continue
+        if c == "?":
+            out.append("[^/]")
+        elif c == "[":
+            j = i + 1
+            if j < n and pat[j] in "!^":
+                j += 1
+            if j < n and pat[j] == "]":
+                j += 1
+            j = pat.find("]", j)
+            if j == -1:
+                out.append(re.escape(c))
+            else:
+                body = pat[i + 1:j]
+                negate = body[:1] in ("!", "^")
+                if negate:
+                    body = body[1:]
+                body = body.replace("\\", "\\\\").replace("[", "\\[")
+                out.append(f"[^/{body}]" if negate else f"(?!/)[{body}]")
+                i = j + 1
+                continue
+        elif c == "\\" and i + 1 < n:
+            i += 1
+            out.append(re.escape(pat[i]))
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return "".join(out)
+
+
+def parse_ignore_lines(lines: Iterable[str]) -> List[IgnoreRule]:
+    """
+    Parse the lines of one ignore file.
+
+    Args:
+        lines: Lines of a .gitignore-style file
+
+    Returns:
+        Rules in file order
+    """
+    rules = []
+    for raw in lines:
+        line = raw.rstrip("\r\n")
+        if not line or line.startswith("#"):
+            continue
+        # Trailing spaces are dropped unless escaped
+        while line.endswith(" ") and not line.endswith("\\ "):
+            line = line[:-1]
+        negate = line.startswith("!")
+        if negate:
+            line = line[1:]
+        dir_only = line.endswith("/")
+        if dir_only:
+            line = line[:-1]
+        if not line:
+            continue
+        anchored = "/" in line
+        body = _translate_glob(line.lstrip("/") if anchored else line)
+        if not anchored:
+            body = "(?:.*/)?" + body
+        rules.append(IgnoreRule(raw.strip(), body, negate, dir_only))
+    return rules
+
+
+class IgnoreLevel:
+    """The compiled rules of one directory (its ignore files combined)."""
+
+    __slots__ = ("base", "rules", "_file_rx", "_dir_rx", "_file_negate", "_dir_negate")
+
+    def __init__(self, base: str, rules: List[IgnoreRule]):
+        self.base = base  # directory of the rules, relative with "/" or ""
+        self.rules = rules
+        self._dir_rx, self._dir_negate = self._compile(rules)
+        self._file_rx, self._file_negate = self._compile(
+            [r for r in rules if not r.dir_only]
+        )
+
+    @staticmethod
+    def _compile(rules: List[IgnoreRule]):
+        if not rules:
+            return None, ()
+        ordered = rules[::-1]
+        regex = re.compile(
+            "|".join(f"(?P<r{i}>{r.regex})" for i, r in enumerate(ordered)), re.S
+        )
+        return regex, tuple(r.negate for r in ordered)
+
+    def match(self, rel_path: str, is_dir: bool) -> Optional[bool]:
+        """
+        True (ignored), False (re-included by ``!``) or None (no rule).
+
+        Args:
+            rel_path: Path relative to the tree top, "/"-separated
+            is_dir: Whether the path is a directory
+        """
+        if self.base:
+            if not rel_path.startswith(self.base):
+                return None
+            rel_path = rel_path[len(self.base):]
+        regex = self._dir_rx if is_dir else self._file_rx
+        if regex is None:
+            return None
+        m = regex.fullmatch(rel_path)
+        if m is None:
+            return None
+        negate = (self._dir_negate if is_dir else self._file_negate)[int(m.lastgroup[1:])]
+        return not negate
+
+
+Chain = Tuple[IgnoreLevel, ...]
+
+
+def is_ignored(chain: Chain, rel_path: str, is_dir: bool) -> bool:
+    """Decide one path against a chain of levels (deepest last)."""
+    for level in reversed(chain):
+        result = level.match(rel_path, is_dir)
+        if result is not None:
+            return result
+    return False
+
+
+def _read_rules(path: str) -> List[IgnoreRule]:
+    try:
+        with open(path, "r", encoding="utf-8", errors="ignore") as f:
+            return parse_ignore_lines(f)
+    except OSError:
+        return []
+
+
+class IgnoreRules:
+    """
+    Ignore rules for scanning ``root``.
+
+    Paths are handled relative to the tree top: the git work tree that
+    contains ``root`` (so ignore files above ``root`` still apply), or
+    ``root`` itself outside a checkout.
+    """
+
+    def __init__(self, root: str):
+        root = os.path.abspath(root)
+        found = find_git_dir(root)
+        self.top = found[1] if found else root
+        rel = os.path.relpath(root, self.top).replace(os.sep, "/")
+        self.root_rel = "" if rel == "." else rel + "/"
+
+        chain: List[IgnoreLevel] = []
+        if found:
+            rules = _read_rules(os.path.join(found[0], "info", "exclude"))
+            if rules:
+                chain.append(IgnoreLevel("", rules))
+        # Ignore files between the tree top and root (root itself is
+        # loaded by whoever enters it)
+        parts = self.root_rel.split("/")[:-1]
+        for depth in range(len(parts)):
+            rel_dir = "".join(p + "/" for p in parts[:depth])
+            level = self.load_level(rel_dir)
+            if level is not None:
+                chain.append(level)
+        self.base_chain: Chain = tuple(chain)
+
+        self._dir_chains: Dict[str, Chain] = {}
+        self._dir_ignored: Dict[str, bool] = {}
+
+    def load_level(self, rel_dir: str) -> Optional[IgnoreLevel]:
+        """Read the ignore files of one directory (relative to the top)."""
+        abs_dir = os.path.join(self.top, rel_dir) if rel_dir else self.top
+        rules: List[IgnoreRule] = []
+        for name in IGNORE_FILES:
+            rules.extend(_read_rules(os.path.join(abs_dir, name)))
+        return IgnoreLevel(rel_dir, rules) if rules else None
+
+    def enter(self, chain: Chain, rel_dir: str, names=None) -> Chain:
+        """
+        Chain in effect inside ``rel_dir``.
+
+        Args:
+            chain: Chain of the parent directory
+            rel_dir: Directory relative to the top, with trailing "/" (or "")
+            names: Entry names of the directory if already listed; lets a
+                walker skip looking for ignore files that are not there
+        """
+        if names is not None and not any(n in names for n in IGNORE_FILES):
+            return chain
+        level = self.load_level(rel_dir)
+        return chain + (level,) if level is not None else chain
+
+    # ------------------------
+    # Single-path checks (for file lists that did not come from a walk)
+    # ------------------------
+    def _chain_for(self, rel_dir: str) -> Chain:
+        chain = self._dir_chains.get(rel_dir)
+        if chain is None:
+            if rel_dir == self.root_rel:
+                parent = self.base_chain
+            else:
+                parent = self._chain_for(rel_dir[:rel_dir.rfind("/", 0, -1) + 1])
+            chain = self._dir_chains[rel_dir] = self.enter(parent, rel_dir)
+        return chain
+
+    def _is_dir_ignored(self, rel_dir: str) -> bool:
+        if rel_dir == self.root_rel:
+            return False
+        ignored = self._dir_ignored.get(rel_dir)
+        if ignored is None:
+            parent = rel_dir[:rel_dir.rfind("/", 0, -1) + 1]
+            ignored = self._is_dir_ignored(parent) or is_ignored(
+                self._chain_for(parent), rel_dir[:-1], True
+            )
+            self._dir_ignored[rel_dir] = ignored
+        return ignored
+
+    def is_file_ignored(self, rel_path: str) -> bool:
+        """
+        Whether a file below root is ignored, itself or through one of its
+        directories (as a walk would have pruned it).
+
+        Args:
+            rel_path: Path relative to root, "/"-separated
+        """
+        full = self.root_rel + rel_path
+        rel_dir = full[:full.rfind("/") + 1]
+        if self._is_dir_ignored(rel_dir):
+            return True
+        return is_ignored(self._chain_for(rel_dir), full, False)
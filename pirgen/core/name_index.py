@@ -0,0 +1,109 @@
+# core/name_index.py
+"""
+Persistent symbol-name indexes for incremental dependency resolution.
+
+A ``[name]`` reference resolves to ``<uid>#name`` when exactly one unit
+defines ``name``. NameIndex keeps, across builds, which units define each
+name and which units reference it. When one unit is re-analyzed,
+set_unit() reports the names whose unique owner changed, and
+referencing() gives the units that have to be resolved again; all other
+units keep their earlier resolution.
+"""
+
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
+
+
+class NameIndex:
+    """
+    name -> defining units and name -> referencing units.
+
+    Supports ``get(name)`` like the dict from
+    ProjectModel.unique_symbol_units(), so it can be handed to the
+    resolver directly.
+    """
+
+    def __init__(self):
+        # name -> uid when defined once, list of uids (one per definition,
+        # repeats allowed) when defined several times
+        self._defs: Dict[str, Union[str, List[str]]] = {}
+        self._refs: Dict[str, Set[str]] = {}
+        self._unit_defs: Dict[str, Tuple[str, ...]] = {}
+        self._unit_refs: Dict[str, Set[str]] = {}
+
+    def get(self, name: str, default=None) -> Optional[str]:
+        """The uid defining name, or default unless exactly one definition exists."""
+        owner = self._defs.get(name)
+        return owner if type(owner) is str else default
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._defs
+
+    def _add_def(self, name: str, uid: str) -> None:
+        owner = self._defs.get(name)
+        if owner is None:
+            self._defs[name] = uid
+        elif type(owner) is str:
+            self._defs[name] = [owner, uid]
+        else:
+            owner.append(uid)
+
+    def _remove_def(self, name: str, uid: str) -> None:
+        owner = self._defs[name]
+        if type(owner) is str:
+            del self._defs[name]
+        else:
+            owner.remove(uid)
+            if len(owner) == 1:
+                self._defs[name] = owner[0]
+
+    def set_unit(self, uid: str, defined: Iterable[str], referenced: Iterable[str]) -> Set[str]:
+        """
+        Record (or replace) what one unit defines and references.
+
+        Args:
+            uid: Unit id
+            defined: Names of the unit's symbols (a name defined twice is
+                listed twice)
+            referenced: Names the unit refers to as ``[name]``
+
+        Returns:
+            Names whose unique owner changed
+        """
+        defined = tuple(defined)
+        old_defs = self._unit_defs.get(uid, ())
+        changed: Set[str] = set()
+        if defined != old_defs:
+            touched = set(old_defs)
+            touched.update(defined)
+            before = {name: self.get(name) for name in touched}
+            for name in old_defs:
+                self._remove_def(name, uid)
+            for name in defined:
+                self._add_def(name, uid)
+            changed = {name for name in touched if self.get(name) != before[name]}
+        if defined:
+            self._unit_defs[uid] = defined
+        else:
+            self._unit_defs.pop(uid, None)
+
+        referenced = set(referenced)
+        old_refs = self._unit_refs.get(uid, set())
+        for name in old_refs - referenced:
+            users = self._refs[name]
+            users.discard(uid)
+            if not users:
+                del self._refs[name]
+        for name in referenced - old_refs:
+            self._refs.setdefault(name, set()).add(uid)
+        if referenced:
+            self._unit_refs[uid] = referenced
+        else:
+            self._unit_refs.pop(uid, None)
+        return changed
+
+    def referencing(self, names: Iterable[str]) -> Set[str]:
+        """Units referring to any of names."""
+        users: Set[str] = set()
+        for name in names:
+            users.update(self._refs.get(name, ()))
+        return users
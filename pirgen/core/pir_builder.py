@@ -1,5 +1,7 @@
+import os
 from io import StringIO
-from .project_model import ProjectModel
+from typing import Iterator, TextIO
+from .project_model import ProjectModel, Symbol
 
 
 class PIRBuilder:
@@ -7,29 +9,45 @@ class PIRBuilder:
         self.model = model
 
     def build(self) -> str:
+        """Return the whole PIR as one string (see write() for large models)."""
+        output = StringIO()
+        self.write(output)
+        return output.getvalue()
+
+    def write(self, fp: TextIO) -> None:
+        """
+        Stream the PIR to a text file object, section by section.
+
+        Lines are written as they are produced, so memory use does not grow
+        with the size of the output.
+
+        Args:
+            fp: Writable text stream (an open file, sys.stdout, StringIO...)
+        """
         if not self.model.deps_finalized:
             raise RuntimeError(
                 "Dependencies not finalized. Call model.finalize_dependencies() first."
             )
 
-        output = StringIO()
-        output.write("<pir>\n")
-        output.write(self._build_meta())
-        output.write("\n")
-        output.write(self._build_units())
-        output.write("\n")
-        output.write(self._build_pool())
-        output.write("\n")
-        output.write(self._build_deps())
-        output.write("\n")
-        output.write(self._build_syms())
-        output.write("\n")
-        output.write("</pir>")
-        return output.getvalue()
-
-    def _build_meta(self) -> str:
-        import os
+        fp.write("<pir>\n")
+        for section in (
+            self._build_meta(),
+            self._build_units(),
+            self._build_pool(),
+            self._build_deps(),
+            self._build_syms(),
+        ):
+            # Each section ends with a newline; an empty one leaves a blank line
+            wrote = False
+            for line in section:
+                fp.write(line + "\n")
+                wrote = True
+            if not wrote:
+                fp.write("\n")
+        fp.write("</pir>")
 
+    # Each _build_* yields the lines of one section, without newlines
+    def _build_meta(self) -> Iterator[str]:
         langs = ",".join(sorted(self.model.langs))
         root = self.model.root
         if os.path.isabs(root):
@@ -39,49 +57,60 @@ class PIRBuilder:
                     root = rel
             except ValueError:
                 pass
-        return f"<meta>\n{self.model.name}|{root}|{langs}\n</meta>"
+        yield "<meta>"
+        yield f"{self.model.name}|{root}|{langs}"
+        yield "</meta>"
 
-    def _build_units(self) -> str:
-        lines = ["<units>"]
+    def _build_units(self) -> Iterator[str]:
+        yield "<units>"
         for u in self.model.units:
             if u.role == "lib":
-                lines.append(f"{u.uid}|{u.path}|{u.lang}|{u.module}")
+                yield f"{u.uid}|{u.path}|{u.lang}|{u.module}"
             else:
-                lines.append(f"{u.uid}|{u.path}|{u.lang}|{u.role}|{u.module}")
-        lines.append("</units>")
-        return "\n".join(lines)
+                yield f"{u.uid}|{u.path}|{u.lang}|{u.role}|{u.module}"
+        yield "</units>"
 
-    def _build_pool(self) -> str:
+    def _build_pool(self) -> Iterator[str]:
         if not self.model.dep_pool_items:
-            return ""
-        lines = ["<pool>"]
+            return
+        yield "<pool>"
         for did, verb, target in self.model.dep_pool_items:
-            lines.append(f"{did}|{verb}|{target}")
-        lines.append("</pool>")
-        return "\n".join(lines)
+            yield f"{did}|{verb}|{target}"
+        yield "</pool>"
 
-    def _build_deps(self) -> str:
+    def _build_deps(self) -> Iterator[str]:
         if not self.model.dep_refs:
-            return ""
-        lines = ["<deps>"]
+            return
+        yield "<deps>"
         for uid in sorted(self.model.dep_refs, key=lambda x: int(x[1:])):
             refs = self.model.dep_refs[uid]
             if refs:
-                lines.append(f"{uid}|{' '.join(refs)}")
-        lines.append("</deps>")
-        return "\n".join(lines)
+                yield f"{uid}|{' '.join(refs)}"
+        yield "</deps>"
 
-    def _build_syms(self) -> str:
+    def _build_syms(self) -> Iterator[str]:
         if not self.model.symbols:
-            return ""
-        lines = ["<syms>"]
-        for s in self.model.symbols:
-            if s.attrs:
-                attrs = "|" + "|".join(
-                    f"{k}" for k, v in sorted(s.attrs.items()) if v == "true"
-                )
-                lines.append(f"{s.name}|{s.unit_uid}|{s.kind}{attrs}")
-            else:
-                lines.append(f"{s.name}|{s.unit_uid}|{s.kind}")
-        lines.append("</syms>")
-        return "\n".join(lines)
+            return
+        yield "<syms>"
+        flag_suffixes = {}  # flags -> "|entry|nested" etc.
+        # Grouped by unit through the model's per-unit index; rows are plain
+        # tuples so the columnar backend is read without building Symbols
+        for uid, rows in self.model.iter_unit_symbol_rows():
+            for name, kind, flags, extra in rows:
+                if extra is None:
+                    if flags:
+                        suffix = flag_suffixes.get(flags)
+                        if suffix is None:
+                            suffix = flag_suffixes[flags] = "|" + "|".join(
+                                sorted(Symbol(name, uid, kind, flags=flags).attrs)
+                            )
+                        yield f"{name}|{uid}|{kind}{suffix}"
+                    else:
+                        yield f"{name}|{uid}|{kind}"
+                else:
+                    attrs = Symbol(name, uid, kind, extra, flags).attrs
+                    attrs = "|" + "|".join(
+                        f"{k}" for k, v in sorted(attrs.items()) if v == "true"
+                    )
+                    yield f"{name}|{uid}|{kind}{attrs}"
+        yield "</syms>"
@@ -8,6 +8,8 @@ Language-owned, dominance-aware semantic profile inference.
 from typing import Dict, List, Set, Optional
 from collections import Counter
 
+from .project_model import FLAG_ENTRY
+
 # ============================================================
 # Language Constants
 # ============================================================
@@ -186,6 +188,7 @@ class ProfileCanonicalizer:
             'dominant_lang': None,
             'path_lower_set': None,
             'symbols_by_kind': None,
+            'has_entry_func': None,
             'model_hash': None
         }
 
@@ -214,12 +217,14 @@ class ProfileCanonicalizer:
                 'dominant_lang': None,
                 'path_lower_set': None,
                 'symbols_by_kind': None,
+                'has_entry_func': None,
                 'model_hash': model_hash
             }
             # Pre-compute and cache commonly used data
             self._cache['dominant_lang'] = self._infer_dominant_language(model)
             self._cache['path_lower_set'] = {u.path.lower() for u in model.units}
             self._cache['symbols_by_kind'] = self._group_symbols_by_kind(model)
+            self._cache['has_entry_func'] = self._has_entry_func(model)
 
         dominant_lang = self._cache['dominant_lang']
 
@@ -278,12 +283,27 @@ class ProfileCanonicalizer:
             Dictionary mapping symbol kind to set of lowercase symbol names
         """
         symbols_by_kind = {}
-        for s in model.symbols:
-            if s.kind not in symbols_by_kind:
-                symbols_by_kind[s.kind] = set()
-            symbols_by_kind[s.kind].add(s.name.lower())
+        for name, _, kind, _ in model.iter_symbol_rows():
+            if kind not in symbols_by_kind:
+                symbols_by_kind[kind] = set()
+            symbols_by_kind[kind].add(name.lower())
         return symbols_by_kind
 
+    def _has_entry_func(self, model) -> bool:
+        """
+        Check whether any unit defines an entry-point function.
+
+        Only units listed by the model's entry index are inspected.
+        """
+        entry_uids = model.entry_unit_uids()
+        for uid, rows in model.iter_unit_symbol_rows():
+            if uid not in entry_uids:
+                continue
+            for _, kind, flags, _ in rows:
+                if kind == "func" and flags & FLAG_ENTRY:
+                    return True
+        return False
+
     # ========================================================
     # Core Helpers
     # ========================================================
@@ -589,7 +609,7 @@ class ProfileCanonicalizer:
 
         # Check for RISC-V specific symbols
         riscv_symbols = {"_start", "trap_vector", "trap_entry", "irq_handler"}
-        found_riscv_syms = riscv_symbols & {s.name for s in model.symbols}
+        found_riscv_syms = riscv_symbols & {name for name, _, _, _ in model.iter_symbol_rows()}
         if found_riscv_syms:
             confidence += 0.2
             signals.append(f"riscv-symbols({len(found_riscv_syms)})")
@@ -898,10 +918,9 @@ class ProfileCanonicalizer:
             reasons.append("pure-python")
 
         # 4️⃣ entry point bonus
-        has_entry = any(
-            s.kind == "func" and s.attrs.get("entry") == "true"
-            for s in model.symbols
-        )
+        has_entry = self._cache.get('has_entry_func')
+        if has_entry is None:
+            has_entry = self._has_entry_func(model)
         if has_entry:
             confidence += 0.1
             reasons.append("entry-point")
@@ -949,10 +968,9 @@ class ProfileCanonicalizer:
         confidence = 0.4
         signals = ["small-project"]
 
-        has_entry = any(
-            s.kind == "func" and s.attrs.get("entry") == "true"
-            for s in model.symbols
-        )
+        has_entry = self._cache.get('has_entry_func')
+        if has_entry is None:
+            has_entry = self._has_entry_func(model)
         if has_entry:
             confidence += 0.2
             signals.append("entry-point")
@@ -1,6 +1,8 @@
 # core/project_model.py
-from dataclasses import dataclass, field
-from typing import List, Dict, Optional, Set, Tuple
+import sys
+from collections.abc import Mapping
+from dataclasses import dataclass
+from typing import List, Dict, Iterator, Optional, Set, Tuple
 
 
 # -------------------------
@@ -15,12 +17,107 @@ class Unit:
     module: str
 
 
-@dataclass
+# Boolean symbol attributes ("true"-valued) are kept as bit flags.
+# These are the only attrs the analyzers emit and the PIR prints.
+SYMBOL_FLAGS: Dict[str, int] = {
+    "entry": 1 << 0,
+    "nested": 1 << 1,
+}
+FLAG_ENTRY = SYMBOL_FLAGS["entry"]
+
+
+def split_attrs(attrs: Optional[Dict[str, str]], flags: int = 0):
+    """Split an attrs dict into (flags, extra-or-None)."""
+    extra = None
+    if attrs:
+        for key, value in attrs.items():
+            bit = SYMBOL_FLAGS.get(key)
+            if bit is not None and value == "true":
+                flags |= bit
+            else:
+                if extra is None:
+                    extra = {}
+                extra[key] = value
+    return flags, extra
+
+
+class SymbolAttrs(Mapping):
+    """Read-only ``attrs`` view over a Symbol's flags and extra attributes."""
+
+    __slots__ = ("_sym",)
+
+    def __init__(self, sym: "Symbol"):
+        self._sym = sym
+
+    def __getitem__(self, key: str) -> str:
+        bit = SYMBOL_FLAGS.get(key)
+        if bit is not None and self._sym.flags & bit:
+            return "true"
+        extra = self._sym.extra
+        if extra is not None and key in extra:
+            return extra[key]
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        flags = self._sym.flags
+        if flags:
+            for key, bit in SYMBOL_FLAGS.items():
+                if flags & bit:
+                    yield key
+        if self._sym.extra:
+            yield from self._sym.extra
+
+    def __len__(self) -> int:
+        return bin(self._sym.flags).count("1") + len(self._sym.extra or ())
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+
 class Symbol:
-    name: str
-    unit_uid: str
-    kind: str
-    attrs: Dict[str, str] = field(default_factory=dict)
+    """
+    A symbol definition.
+
+    Slotted to keep per-symbol memory small: kind strings are interned,
+    known boolean attrs live in ``flags`` and only other attrs (rare) get
+    an ``extra`` dict. ``attrs`` still exposes everything as a mapping.
+    """
+
+    __slots__ = ("name", "unit_uid", "kind", "flags", "extra")
+
+    def __init__(
+        self,
+        name: str,
+        unit_uid: str,
+        kind: str,
+        attrs: Optional[Dict[str, str]] = None,
+        flags: int = 0,
+    ):
+        self.name = name
+        self.unit_uid = unit_uid
+        self.kind = sys.intern(kind)
+        self.flags, self.extra = split_attrs(attrs, flags)
+
+    @property
+    def attrs(self) -> SymbolAttrs:
+        return SymbolAttrs(self)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Symbol):
+            return NotImplemented
+        return (
+            self.name == other.name
+            and self.unit_uid == other.unit_uid
+            and self.kind == other.kind
+            and self.flags == other.flags
+            and self.extra == other.extra
+        )
+
+    def __repr__(self) -> str:
+        return (
+            f"Symbol(name={self.name!r}, unit_uid={self.unit_uid!r}, "
+            f"kind={self.kind!r}, attrs={self.attrs!r})"
+        )
 
 
 @dataclass(frozen=True)
@@ -30,11 +127,20 @@ class Dependency:
     target: str
 
 
+# -------------------------
+# Dependency keys
+# -------------------------
+# A dependency is stored as one int: (target_id << VERB_BITS) | verb_id,
+# where the ids index ProjectModel's interned verb / target tables.
+VERB_BITS = 16
+VERB_MASK = (1 << VERB_BITS) - 1
+
+
 # -------------------------
 # Project Model
 # -------------------------
 class ProjectModel:
-    def __init__(self, name: str, root: str, profile: str):
+    def __init__(self, name: str, root: str, profile: str, columnar: bool = False):
         self.name = name
         self.root = root
         self.profile = profile  # Legacy profile field (kept for backward compatibility)
@@ -44,13 +150,35 @@ class ProjectModel:
         # ---- Units ----
         self.units: List[Unit] = []
         self._path_to_uid: Dict[str, str] = {}
+        # Units whose source did not parse; they hold what could be salvaged
+        self.partial_units: Set[str] = set()
 
         # ---- Symbols ----
-        self.symbols: List[Symbol] = []
+        # columnar=True stores symbols as array columns (core/symbol_table.py);
+        # self.symbols then is a ColumnarSymbols, a read-only Symbol sequence
+        self.columnar = columnar
+        if columnar:
+            from .symbol_table import ColumnarSymbols
+
+            self.symbols = ColumnarSymbols()
+        else:
+            self.symbols: List[Symbol] = []
+        # uid -> symbols of that unit, in insertion order (kept by add_symbol;
+        # the columnar backend keeps its own row index)
+        self._unit_symbols: Dict[str, List[Symbol]] = {}
+        self._entry_uids: Set[str] = set()
 
         # ---- Dependencies (two-phase) ----
-        self._unit_dep_keys: Dict[str, List[str]] = {}
-        self._all_dep_keys: Set[str] = set()
+        # Interned verb / target strings; dependency keys are packed ids
+        self._verbs: List[str] = []
+        self._verb_ids: Dict[str, int] = {}
+        self._targets: List[str] = []
+        self._target_ids: Dict[str, int] = {}
+
+        # uid -> ordered set of packed keys (dict keys, values unused):
+        # O(1) dedup on insert while keeping first-seen order
+        self._unit_dep_keys: Dict[str, Dict[int, None]] = {}
+        self._all_dep_keys: Set[int] = set()
 
         self.dep_pool_items: List[Tuple[str, str, str]] = []
         self.dep_refs: Dict[str, List[str]] = {}
@@ -81,11 +209,74 @@ class ProjectModel:
     def get_uid_by_path(self, path: str) -> Optional[str]:
         return self._path_to_uid.get(path)
 
+    def mark_partial(self, uid: str) -> None:
+        """Record that a unit's analysis recovered from a parse error."""
+        self.partial_units.add(uid)
+
     # -------------------------
     # Symbol
     # -------------------------
     def add_symbol(self, name: str, unit_uid: str, kind: str, **attrs):
-        self.symbols.append(Symbol(name, unit_uid, kind, attrs))
+        if self.columnar:
+            flags, extra = split_attrs(attrs)
+            self.symbols.append(name, unit_uid, kind, flags, extra)
+        else:
+            sym = Symbol(name, unit_uid, kind, attrs)
+            flags = sym.flags
+            self.symbols.append(sym)
+            unit_syms = self._unit_symbols.get(unit_uid)
+            if unit_syms is None:
+                self._unit_symbols[unit_uid] = [sym]
+            else:
+                unit_syms.append(sym)
+        if flags & FLAG_ENTRY:
+            self._entry_uids.add(unit_uid)
+
+    def symbols_of(self, unit_uid: str) -> List[Symbol]:
+        """Symbols defined in one unit, without scanning the global list."""
+        if self.columnar:
+            return [self.symbols.symbol(r) for r in self.symbols.unit_rows(unit_uid)]
+        return self._unit_symbols.get(unit_uid, [])
+
+    def iter_unit_symbols(self):
+        """Yield (uid, symbols) per unit, in the order units gained symbols."""
+        if self.columnar:
+            return ((uid, self.symbols_of(uid)) for uid, _ in self.symbols.iter_unit_rows())
+        return iter(self._unit_symbols.items())
+
+    # Row views: plain tuples, so the columnar backend never builds Symbols
+    def iter_symbol_rows(self):
+        """Yield (name, unit_uid, kind, flags) for every symbol, in insertion order."""
+        if self.columnar:
+            return self.symbols.iter_rows()
+        return ((s.name, s.unit_uid, s.kind, s.flags) for s in self.symbols)
+
+    def iter_unit_symbol_rows(self):
+        """
+        Yield (uid, rows) per unit in the order units gained symbols, where
+        rows are (name, kind, flags, extra) tuples.
+        """
+        if self.columnar:
+            return self.symbols.iter_unit_rows()
+        return (
+            (uid, ((s.name, s.kind, s.flags, s.extra) for s in syms))
+            for uid, syms in self._unit_symbols.items()
+        )
+
+    def unique_symbol_units(self):
+        """
+        Map name -> uid for names defined exactly once in the project.
+
+        Names with several definitions (even within one unit) map to None.
+        """
+        index: Dict[str, Optional[str]] = {}
+        for name, unit_uid, _, _ in self.iter_symbol_rows():
+            index[name] = None if name in index else unit_uid
+        return index
+
+    def entry_unit_uids(self) -> Set[str]:
+        """Units defining at least one symbol marked ``entry``."""
+        return set(self._entry_uids)
 
     # -------------------------
     # Dependency
@@ -108,14 +299,64 @@ class ProjectModel:
         if verb is None or target is None:
             raise ValueError("Dependency requires verb/kind and target")
 
-        key = f"{verb}:{target}"
+        key = self.dep_key(verb, target)
         self._all_dep_keys.add(key)
-        # Use set for deduplication during add
-        if src_uid not in self._unit_dep_keys:
-            self._unit_dep_keys[src_uid] = []
-        # Check for duplicates efficiently
-        if key not in self._unit_dep_keys[src_uid]:
-            self._unit_dep_keys[src_uid].append(key)
+        keys = self._unit_dep_keys.get(src_uid)
+        if keys is None:
+            keys = self._unit_dep_keys[src_uid] = {}
+        keys[key] = None
+
+    def set_dependencies(self, src_uid: str, deps) -> None:
+        """
+        Replace one unit's dependencies with (verb, target) pairs.
+
+        Used to hand a unit back to the resolver with its raw references;
+        keys that fall out of use stay in the global key set until the next
+        resolve pass rebuilds it.
+        """
+        if self.deps_finalized:
+            raise RuntimeError("Cannot set dependencies after finalize")
+
+        keys = {}
+        for verb, target in deps:
+            keys[self.dep_key(verb, target)] = None
+        self._all_dep_keys.update(keys)
+        self._unit_dep_keys[src_uid] = keys
+
+    def intern_verb(self, verb: str) -> int:
+        vid = self._verb_ids.get(verb)
+        if vid is None:
+            vid = len(self._verbs)
+            if vid > VERB_MASK:
+                raise ValueError("Too many distinct dependency verbs")
+            self._verbs.append(verb)
+            self._verb_ids[verb] = vid
+        return vid
+
+    def intern_target(self, target: str) -> int:
+        tid = self._target_ids.get(target)
+        if tid is None:
+            tid = len(self._targets)
+            self._targets.append(target)
+            self._target_ids[target] = tid
+        return tid
+
+    def dep_key(self, verb: str, target: str) -> int:
+        """Pack (verb, target) into an interned integer key."""
+        return (self.intern_target(target) << VERB_BITS) | self.intern_verb(verb)
+
+    def dep_verb(self, key: int) -> str:
+        return self._verbs[key & VERB_MASK]
+
+    def dep_target(self, key: int) -> str:
+        return self._targets[key >> VERB_BITS]
+
+    def iter_dependencies(self, src_uid: str):
+        """Yield (verb, target) strings for one unit, in first-seen order."""
+        verbs = self._verbs
+        targets = self._targets
+        for key in self._unit_dep_keys.get(src_uid, ()):
+            yield verbs[key & VERB_MASK], targets[key >> VERB_BITS]
 
     # -------------------------
     # Finalize Dependencies
@@ -124,13 +365,21 @@ class ProjectModel:
         if self.deps_finalized:
             return
 
-        sorted_keys = sorted(self._all_dep_keys)
+        # Order by (verb, target); verbs are identifier-like, so this is the
+        # same order as sorting the "verb:target" strings
+        verbs = self._verbs
+        targets = self._targets
+        sorted_keys = sorted(
+            self._all_dep_keys,
+            key=lambda k: (verbs[k & VERB_MASK], targets[k >> VERB_BITS]),
+        )
         key_to_did = {k: f"d{i}" for i, k in enumerate(sorted_keys)}
 
         self.dep_pool_items = []
         for k in sorted_keys:
-            verb, target = k.split(":", 1)
-            self.dep_pool_items.append((key_to_did[k], verb, target))
+            self.dep_pool_items.append(
+                (key_to_did[k], verbs[k & VERB_MASK], targets[k >> VERB_BITS])
+            )
 
         self.dep_refs = {}
         for uid, keys in self._unit_dep_keys.items():
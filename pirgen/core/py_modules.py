@@ -0,0 +1,261 @@
+# core/py_modules.py
+"""
+Dotted Python module names for the units of a project.
+
+PythonAnalyzer records imports as ``[pkg.mod]`` or, for relative imports,
+``[..mod]``. PythonModuleIndex maps every Python unit to its module names
+so those targets resolve to the importing project's own units:
+
+- A file's package is found by walking up through directories holding an
+  ``__init__.py`` unit; ``pkg/sub/mod.py`` is ``pkg.sub.mod`` and
+  ``pkg/sub/__init__.py`` is ``pkg.sub``. When the scanned root is a
+  package itself, the packages above it are looked up on disk.
+- Source roots declared in ``pyproject.toml``, ``setup.cfg`` or
+  ``setup.py`` (e.g. ``package-dir = {"" = "src"}``) and the project root
+  also name the files below them, which covers namespace packages without
+  ``__init__.py``. Names from ``__init__.py`` packages win over these.
+- A name claimed by several units is ambiguous and stays unresolved.
+
+Lookups are one dict access (relative imports first apply the importing
+unit's package).
+"""
+
+import configparser
+import os
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11: pyproject.toml package dirs are skipped
+    tomllib = None
+
+_SETUP_PACKAGE_DIR_RE = re.compile(r"""package_dir\s*=\s*\{\s*(['"])\1\s*:\s*['"]([^'"]+)['"]""")
+_SETUP_FIND_RE = re.compile(
+    r"""find_(?:namespace_)?packages\(\s*(?:where\s*=\s*)?['"]([^'"]+)['"]"""
+)
+
+
+def _pyproject_roots(data: dict) -> List[str]:
+    tool = data.get("tool", {})
+    roots = []
+    setuptools = tool.get("setuptools", {})
+    package_dir = setuptools.get("package-dir", {})
+    if isinstance(package_dir, dict) and package_dir.get(""):
+        roots.append(package_dir[""])
+    packages = setuptools.get("packages", {})
+    if isinstance(packages, dict):
+        where = packages.get("find", {}).get("where", [])
+        roots.extend([where] if isinstance(where, str) else where)
+    for entry in tool.get("poetry", {}).get("packages", []):
+        if isinstance(entry, dict) and entry.get("from"):
+            roots.append(entry["from"])
+    wheel = tool.get("hatch", {}).get("build", {}).get("targets", {}).get("wheel", {})
+    for package in wheel.get("packages", []):
+        parent = os.path.dirname(package.rstrip("/"))
+        if parent:
+            roots.append(parent)
+    return roots
+
+
+def declared_source_roots(directory: str) -> List[str]:
+    """
+    Package directories declared by the packaging files in ``directory``.
+
+    Args:
+        directory: Absolute directory that may hold pyproject.toml,
+            setup.cfg or setup.py
+
+    Returns:
+        Absolute, normalized source roots (possibly empty)
+    """
+    roots: List[str] = []
+    if tomllib is not None:
+        try:
+            with open(os.path.join(directory, "pyproject.toml"), "rb") as f:
+                roots.extend(_pyproject_roots(tomllib.load(f)))
+        except (OSError, ValueError):
+            pass
+
+    config = configparser.ConfigParser()
+    try:
+        config.read(os.path.join(directory, "setup.cfg"), encoding="utf-8")
+    except (configparser.Error, UnicodeDecodeError):
+        config = None
+    if config is not None:
+        for line in config.get("options", "package_dir", fallback="").splitlines():
+            key, _, value = line.partition("=")
+            if not key.strip() and value.strip():
+                roots.append(value.strip())
+        where = config.get("options.packages.find", "where", fallback="").strip()
+        if where:
+            roots.append(where)
+
+    try:
+        with open(os.path.join(directory, "setup.py"), "r", encoding="utf-8", errors="ignore") as f:
+            setup_py = f.read()
+    except OSError:
+        setup_py = ""
+    if setup_py:
+        roots.extend(m.group(2) for m in _SETUP_PACKAGE_DIR_RE.finditer(setup_py))
+        roots.extend(m.group(1) for m in _SETUP_FIND_RE.finditer(setup_py))
+
+    result = []
+    for root in roots:
+        if isinstance(root, str) and root not in (".", ""):
+            path = os.path.normpath(os.path.join(directory, root))
+            if path not in result:
+                result.append(path)
+    return result
+
+
+def _claim(names: Dict[str, Optional[str]], name: str, uid: str) -> None:
+    if name:
+        owner = names.get(name, uid)
+        names[name] = uid if owner == uid else None
+
+
+class PythonModuleIndex:
+    """
+    Dotted module name -> uid for the Python units of one project.
+
+    Args:
+        root: Absolute project root (unit paths are relative to it)
+        units: (uid, relative path) pairs of the project's Python units
+    """
+
+    def __init__(self, root: str, units: Iterable[Tuple[str, str]]):
+        self.root = os.path.abspath(root)
+        units = [(uid, path.replace(os.sep, "/")) for uid, path in units]
+        init_dirs = {
+            path.rpartition("/")[0] for _, path in units if path.rpartition("/")[2] == "__init__.py"
+        }
+        roots_memo: Dict[str, List[str]] = {}
+        # The scanned root may itself be (inside) a package
+        root_package: List[str] = []
+        if "" in init_dirs:
+            directory = self.root
+            while True:
+                parent, name = os.path.split(directory)
+                root_package.insert(0, name)
+                if parent == directory or not os.path.isfile(os.path.join(parent, "__init__.py")):
+                    break
+                directory = parent
+
+        # uid -> package its relative imports start from
+        self._packages: Dict[str, str] = {}
+        primary: Dict[str, Optional[str]] = {}
+        secondary: Dict[str, Optional[str]] = {}
+        for uid, path in units:
+            directory, _, filename = path.rpartition("/")
+            stem = filename[:-3]
+            package: List[str] = []
+            top = directory
+            while top and top in init_dirs:
+                top, _, part = top.rpartition("/")
+                package.append(part)
+            package.reverse()
+            if not top and "" in init_dirs:
+                package = root_package + package
+            self._packages[uid] = ".".join(package)
+            own = package if stem == "__init__" else package + [stem]
+            source_roots = self._source_roots(top, roots_memo)
+            # A package top that is no source root (e.g. a scripts directory)
+            # only gives a fallback name
+            _claim(primary if top in source_roots else secondary, ".".join(own), uid)
+
+            # Names below declared source roots and the project root
+            for source_root in source_roots:
+                if not source_root:
+                    rel_dir = directory
+                elif directory == source_root or directory.startswith(source_root + "/"):
+                    rel_dir = directory[len(source_root) + 1:]
+                else:
+                    continue
+                parts = rel_dir.split("/") if rel_dir else []
+                if stem != "__init__":
+                    parts.append(stem)
+                if all(part.isidentifier() for part in parts):
+                    _claim(secondary, ".".join(parts), uid)
+
+        self._modules = secondary
+        self._modules.update(primary)
+
+    def _source_roots(self, top: str, memo: Dict[str, List[str]]) -> List[str]:
+        """
+        Source roots (relative, "/"-separated, "" = project root) declared by
+        packaging files in ``top`` or any directory above it.
+        """
+        roots = [""]
+        rel_dir = top
+        while True:
+            declared = memo.get(rel_dir)
+            if declared is None:
+                directory = os.path.join(self.root, rel_dir) if rel_dir else self.root
+                declared = []
+                for path in declared_source_roots(directory):
+                    rel = os.path.relpath(path, self.root).replace(os.sep, "/")
+                    if not rel.startswith(".."):
+                        declared.append("" if rel == "." else rel)
+                memo[rel_dir] = declared
+            roots.extend(root for root in declared if root not in roots)
+            if not rel_dir:
+                return roots
+            rel_dir = rel_dir.rpartition("/")[0]
+
+    @classmethod
+    def from_model(cls, model) -> "PythonModuleIndex":
+        """Index the Python units of a ProjectModel."""
+        return cls(model.root, ((u.uid, u.path) for u in model.units if u.lang == "PY"))
+
+    def __len__(self) -> int:
+        return len(self._modules)
+
+    def package_of(self, uid: str) -> Optional[str]:
+        """Package a unit's relative imports start from (None if not Python)."""
+        return self._packages.get(uid)
+
+    def absolute_name(self, name: str, package: Optional[str]) -> Optional[str]:
+        """
+        Turn an import target into an absolute module name.
+
+        Args:
+            name: ``pkg.mod`` or, relative, ``..mod`` / ``.``
+            package: Package of the importing unit (see package_of())
+
+        Returns:
+            The absolute name, or None for a relative import that climbs
+            above the top-level package
+        """
+        if not name.startswith("."):
+            return name
+        if package is None:
+            return None
+        rest = name.lstrip(".")
+        level = len(name) - len(rest)
+        parts = package.split(".") if package else []
+        # Like importlib: "attempted relative import beyond top-level package"
+        if level - 1 >= len(parts):
+            return None
+        parts = parts[: len(parts) - (level - 1)]
+        if rest:
+            parts.append(rest)
+        return ".".join(parts) or None
+
+    def resolve(self, name: str, uid: Optional[str] = None) -> Optional[str]:
+        """
+        The unit a module import refers to.
+
+        Args:
+            name: Import target without brackets
+            uid: Importing unit (needed for relative imports)
+
+        Returns:
+            uid of the module's unit, or None if it is not a unique
+            module of the project
+        """
+        if name.startswith("."):
+            name = self.absolute_name(name, self._packages.get(uid))
+            if name is None:
+                return None
+        return self._modules.get(name)
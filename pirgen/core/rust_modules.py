@@ -0,0 +1,200 @@
+# core/rust_modules.py
+"""
+Rust crate module trees and ``use`` path resolution.
+
+RustAnalyzer records ``use`` paths with groups expanded (see
+expand_use_tree()) and ``mod foo;`` items as ``mod`` dependencies.
+RustModuleIndex maps every Rust unit to its module path, following the
+compiler's file layout:
+
+- The nearest ``lib.rs`` or ``main.rs`` above a file is its crate root.
+- ``a/b.rs`` and ``a/b/mod.rs`` below the crate root are ``crate::a::b``.
+- A crate root, ``mod.rs`` or ``foo.rs`` declares its ``mod`` items in
+  its own directory or ``foo/`` respectively.
+
+``crate::``, ``self::`` and ``super::`` paths, and paths starting with a
+module of the current one (2018 uniform paths), resolve to the unit of
+the longest module prefix: ``crate::mm::alloc::Frame`` is the unit of
+``crate::mm::alloc`` if that file exists, else of ``crate::mm``. Items
+of inline ``mod`` blocks belong to their file's unit that way too.
+"""
+
+import os
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+_COMMENT_RE = re.compile(r"//[^\n]*|/\*.*?\*/", re.DOTALL)
+_ALIAS_RE = re.compile(r"\s+as\s+\w+$")
+_CRATE_ROOTS = ("lib.rs", "main.rs")
+
+
+def _split_top_level(text: str) -> List[str]:
+    items, depth, start = [], 0, 0
+    for i, ch in enumerate(text):
+        if ch == "{":
+            depth += 1
+        elif ch == "}":
+            depth -= 1
+        elif ch == "," and depth == 0:
+            items.append(text[start:i])
+            start = i + 1
+    items.append(text[start:])
+    return items
+
+
+def expand_use_tree(tree: str) -> List[str]:
+    """
+    Expand a ``use`` tree into one path per imported item.
+
+    ``crate::mm::{alloc, free as release, self}`` gives ``crate::mm::alloc``,
+    ``crate::mm::free`` and ``crate::mm``. Aliases are dropped, globs kept.
+
+    Args:
+        tree: Text between ``use`` and ``;``
+
+    Returns:
+        Paths in source order, without duplicates
+    """
+    tree = " ".join(_COMMENT_RE.sub(" ", tree).split())
+    paths: List[str] = []
+    _expand("", tree, paths)
+    return paths
+
+
+def _expand(prefix: str, tree: str, paths: List[str]) -> None:
+    tree = tree.strip()
+    if not tree:
+        return
+    brace = tree.find("{")
+    if brace == -1:
+        path = _ALIAS_RE.sub("", tree).replace(" ", "")
+        if path == "self":
+            path = prefix[:-2]
+        else:
+            path = prefix + path
+        if path and path not in paths:
+            paths.append(path)
+        return
+    end = tree.rfind("}")
+    if end < brace:
+        end = len(tree)
+    group_prefix = prefix + tree[:brace].replace(" ", "")
+    for item in _split_top_level(tree[brace + 1:end]):
+        _expand(group_prefix, item, paths)
+
+
+class RustModuleIndex:
+    """
+    Module path -> uid for the Rust units of one project.
+
+    Args:
+        units: (uid, relative path) pairs of the project's Rust units
+    """
+
+    def __init__(self, units: Iterable[Tuple[str, str]]):
+        units = [(uid, path.replace(os.sep, "/")) for uid, path in units]
+        # crate directory -> uid of its root file (lib.rs over main.rs)
+        self._roots: Dict[str, str] = {}
+        for uid, path in sorted(units, key=lambda u: u[1].rpartition("/")[2] != "lib.rs"):
+            directory, _, name = path.rpartition("/")
+            if name in _CRATE_ROOTS:
+                self._roots.setdefault(directory, uid)
+
+        # (crate directory, "a::b") -> uid; "" is the crate root module
+        self._modules: Dict[Tuple[str, str], str] = {}
+        # uid -> (crate directory, module path)
+        self._units: Dict[str, Tuple[str, Tuple[str, ...]]] = {}
+        crate_memo: Dict[str, Optional[str]] = {}
+        for uid, path in units:
+            directory, _, name = path.rpartition("/")
+            crate = self._crate_of(directory, crate_memo)
+            if crate is None:
+                continue
+            rel = directory[len(crate):].lstrip("/") if crate else directory
+            parts = rel.split("/") if rel else []
+            if name in _CRATE_ROOTS and not parts:
+                module: Tuple[str, ...] = ()
+            elif name == "mod.rs":
+                module = tuple(parts)
+            else:
+                module = tuple(parts) + (name[:-3],)
+            if not all(part.isidentifier() for part in module):
+                continue
+            self._units[uid] = (crate, module)
+            if module:
+                self._modules.setdefault((crate, "::".join(module)), uid)
+
+    def _crate_of(self, directory: str, memo: Dict[str, Optional[str]]) -> Optional[str]:
+        """Nearest directory at or above ``directory`` holding a crate root."""
+        if directory in memo:
+            return memo[directory]
+        if directory in self._roots:
+            crate: Optional[str] = directory
+        elif directory:
+            crate = self._crate_of(directory.rpartition("/")[0], memo)
+        else:
+            crate = None
+        memo[directory] = crate
+        return crate
+
+    @classmethod
+    def from_model(cls, model) -> "RustModuleIndex":
+        """Index the Rust units of a ProjectModel."""
+        return cls((u.uid, u.path) for u in model.units if u.lang == "Rust")
+
+    def __len__(self) -> int:
+        return len(self._units)
+
+    def module_of(self, uid: str) -> Optional[Tuple[str, Tuple[str, ...]]]:
+        """(crate directory, module path) of a unit, None if not in a crate."""
+        return self._units.get(uid)
+
+    def _unit(self, crate: str, parts: List[str], root: Optional[str]) -> Optional[str]:
+        for end in range(len(parts), 0, -1):
+            uid = self._modules.get((crate, "::".join(parts[:end])))
+            if uid is not None:
+                return uid
+        return root
+
+    def resolve(self, path: str, uid: str) -> Optional[str]:
+        """
+        The unit a ``use`` path (or ``self::name`` of a ``mod`` item) of
+        unit ``uid`` refers to.
+
+        Args:
+            path: ``crate::a::b``, ``self::x``, ``super::super::y`` or a
+                path starting with a child module of the current one
+            uid: Unit the path appears in
+
+        Returns:
+            uid of the longest matching module's unit, or None for paths
+            leaving the crate (other crates, std) and paths into ``uid``
+            itself
+        """
+        context = self._units.get(uid)
+        if context is None:
+            return None
+        crate, module = context
+        # Items of the crate root; a main.rs next to a lib.rs is its own root
+        root = uid if not module else self._roots.get(crate)
+        parts = [part for part in path.split("::") if part and part != "*"]
+        if not parts:
+            return None
+
+        head = parts[0]
+        base = list(module)
+        if head == "crate":
+            found = self._unit(crate, parts[1:], root)
+        elif head in ("self", "super"):
+            while parts and parts[0] in ("self", "super"):
+                if parts.pop(0) == "super":
+                    if not base:
+                        return None
+                    base.pop()
+            found = self._unit(crate, base + parts, root)
+        elif (crate, "::".join(base + [head])) in self._modules:
+            found = self._unit(crate, base + parts, root)
+        else:
+            # Uniform paths not naming a child module name another crate
+            return None
+        return None if found == uid else found
@@ -0,0 +1,154 @@
+# core/symbol_table.py
+"""
+Columnar symbol storage for very large projects.
+
+Instead of one Symbol object per definition, symbols are stored as rows:
+the name in a plain list and unit id, kind id and flags in array columns
+that index a small string table of unit uids and kinds. A row costs about
+17 bytes besides its name string, against ~90 for a Symbol object and
+its list slots.
+
+Enabled with ProjectModel(..., columnar=True) / `air --columnar`.
+"""
+
+from array import array
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .project_model import Symbol
+
+
+class StringTable:
+    """Interns strings to dense integer ids (unit uids and kinds)."""
+
+    __slots__ = ("strings", "_ids")
+
+    def __init__(self):
+        self.strings: List[str] = []
+        self._ids: Dict[str, int] = {}
+
+    def intern(self, s: str) -> int:
+        sid = self._ids.get(s)
+        if sid is None:
+            sid = len(self.strings)
+            self.strings.append(s)
+            self._ids[s] = sid
+        return sid
+
+    def get_id(self, s: str) -> Optional[int]:
+        return self._ids.get(s)
+
+    def __getitem__(self, sid: int) -> str:
+        return self.strings[sid]
+
+    def __len__(self) -> int:
+        return len(self.strings)
+
+
+class ColumnarSymbols:
+    """
+    Struct-of-arrays symbol table.
+
+    Behaves like a read-only sequence of Symbol for existing callers
+    (len, indexing and iteration materialize Symbol objects on demand);
+    hot paths should use iter_rows() / iter_unit_rows() instead.
+    """
+
+    def __init__(self, strings: Optional[StringTable] = None):
+        self.strings = strings if strings is not None else StringTable()
+        # Names are mostly unique, so interning them would only add a dict
+        # entry and an id object per row
+        self.names: List[str] = []
+        self.unit_ids = array("I")
+        self.kind_ids = array("I")
+        self.flags = array("B")  # SYMBOL_FLAGS bits; widen if it outgrows 8
+        # row -> non-flag attrs; rare, so kept out of the columns
+        self.extra: Dict[int, Dict[str, str]] = {}
+        # unit string id -> row numbers of that unit
+        self._unit_rows: Dict[int, array] = {}
+
+    def append(self, name: str, unit_uid: str, kind: str, flags: int = 0,
+               extra: Optional[Dict[str, str]] = None) -> int:
+        row = len(self.names)
+        intern = self.strings.intern
+        unit_id = intern(unit_uid)
+        self.names.append(name)
+        self.unit_ids.append(unit_id)
+        self.kind_ids.append(intern(kind))
+        self.flags.append(flags)
+        if extra:
+            self.extra[row] = extra
+        rows = self._unit_rows.get(unit_id)
+        if rows is None:
+            self._unit_rows[unit_id] = array("I", (row,))
+        else:
+            rows.append(row)
+        return row
+
+    def symbol(self, row: int) -> Symbol:
+        s = self.strings.strings
+        return Symbol(
+            self.names[row],
+            s[self.unit_ids[row]],
+            s[self.kind_ids[row]],
+            self.extra.get(row),
+            self.flags[row],
+        )
+
+    # ------------------------
+    # Sequence protocol (compatibility)
+    # ------------------------
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __getitem__(self, row: int) -> Symbol:
+        if row < 0:
+            row += len(self)
+        if not 0 <= row < len(self):
+            raise IndexError(row)
+        return self.symbol(row)
+
+    def __iter__(self) -> Iterator[Symbol]:
+        for row in range(len(self.names)):
+            yield self.symbol(row)
+
+    # ------------------------
+    # Row access
+    # ------------------------
+    def iter_rows(self) -> Iterator[Tuple[str, str, str, int]]:
+        """(name, unit_uid, kind, flags) for every row, in insertion order."""
+        s = self.strings.strings
+        for name, unit_id, kind_id, flags in zip(
+            self.names, self.unit_ids, self.kind_ids, self.flags
+        ):
+            yield name, s[unit_id], s[kind_id], flags
+
+    def unit_rows(self, unit_uid: str) -> array:
+        unit_id = self.strings.get_id(unit_uid)
+        if unit_id is None:
+            return array("I")
+        return self._unit_rows.get(unit_id, array("I"))
+
+    def iter_unit_rows(self):
+        """
+        Yield (uid, rows) per unit in the order units gained symbols, where
+        rows are (name, kind, flags, extra) tuples.
+        """
+        s = self.strings.strings
+        names = self.names
+        kind_ids = self.kind_ids
+        flags = self.flags
+        extra = self.extra
+        for unit_id, rows in self._unit_rows.items():
+            yield s[unit_id], (
+                (names[r], s[kind_ids[r]], flags[r], extra.get(r)) for r in rows
+            )
+
+    def nbytes(self) -> int:
+        """Approximate size of the columns (excluding strings)."""
+        cols = (self.unit_ids, self.kind_ids, self.flags)
+        index = sum(len(rows) for rows in self._unit_rows.values())
+        return (
+            sum(c.itemsize * len(c) for c in cols)
+            + 8 * len(self.names)
+            + index * self.unit_ids.itemsize
+        )
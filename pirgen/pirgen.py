@@ -1,13 +1,25 @@
 import os
+import sys
 import argparse
+import contextlib
 import fnmatch
-from collections import defaultdict
-
-from .core.project_model import ProjectModel, Unit
+import re
+import stat
+import tempfile
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+
+from .core.project_model import ProjectModel, Unit, VERB_BITS, VERB_MASK
 from .core.pir_builder import PIRBuilder
 from .core.dep_canon import canonicalize_dependencies
-from .core.analysis_cache import AnalysisCache
-from .analyzers import get_analyzer
+from .core.analysis_cache import AnalysisCache, DEFAULT_HASH, HASH_ALGORITHMS
+from .core.git_index import find_git_dir, read_index
+from .core.ignore_rules import IgnoreRules, is_ignored
+from .core.c_includes import IncludeIndex
+from .core.py_modules import PythonModuleIndex
+from .core.rust_modules import RustModuleIndex
+from .analyzers import ANALYZER_MAP, PythonAnalyzer, get_analyzer
 
 DEFAULT_IGNORED = {
     ".git",
@@ -28,26 +40,250 @@ DEFAULT_IGNORED = {
     "doc",
     "dist",
     ".dist",
+    ".pir-cache",
 }
 
 USER_IGNORED = set()
 
 
+SOURCE_EXTENSIONS = frozenset(ANALYZER_MAP)
+
+
+def compile_ignore_matcher(names=DEFAULT_IGNORED, patterns=()):
+    """
+    Build one regex matching ignored directory names.
+
+    Args:
+        names: Exact directory names
+        patterns: fnmatch-style patterns (an exact name is a pattern too)
+
+    Returns:
+        Compiled pattern; use ``.match(dirname)``
+    """
+    alternatives = [re.escape(n) + r"\Z" for n in sorted(names)]
+    alternatives += [fnmatch.translate(p) for p in sorted(patterns)]
+    return re.compile("|".join(alternatives) or r"(?!)")
+
+
+class SourceFile:
+    """
+    DirEntry-like (path, name, stat()) handle for a discovered source file.
+
+    stat() is taken on first use (or given up front) and then kept, so the
+    analysis cache and the scan share one stat call.
+    """
+
+    __slots__ = ("path", "name", "_stat")
+
+    def __init__(self, path, name, st=None):
+        self.path = path
+        self.name = name
+        self._stat = st
+
+    def stat(self):
+        if self._stat is None:
+            self._stat = os.stat(self.path)
+        return self._stat
+
+
+def _list_dir(dir_path, rel_dir, snapshots):
+    """
+    Children of one directory as sorted (name, kind) pairs, kind "d" for
+    directories (symlinked ones are left out) and "f" for anything else.
+
+    With a snapshot store, an unchanged directory is replayed from its
+    snapshot instead of being listed; fresh listings are recorded.
+    Returns None if the directory cannot be read.
+    """
+    if snapshots is not None:
+        try:
+            st = os.stat(dir_path)
+        except OSError:
+            return None
+        children = snapshots.dir_snapshot(rel_dir, st)
+        if children is not None:
+            return children
+        listed_ns = time.time_ns()
+
+    children = []
+    try:
+        with os.scandir(dir_path) as it:
+            for entry in it:
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                if not is_dir:
+                    children.append((entry.name, "f"))
+                elif not entry.is_symlink():
+                    children.append((entry.name, "d"))
+    except OSError:
+        return None
+    children.sort()
+
+    if snapshots is not None:
+        snapshots.save_dir_snapshot(rel_dir, st, listed_ns, children)
+    return children
+
+
+def iter_source_entries(root_path, ignore_files=True, snapshots=None, on_dir=None):
+    """
+    Walk root_path and yield a SourceFile per analyzable source file.
+
+    Directories are read with os.scandir and names are sorted, so the
+    order does not depend on the filesystem: a directory's files first,
+    then its subdirectories. Symlinked directories are not followed.
+
+    Besides the ignored directory names, .gitignore / .airignore rules
+    (see core/ignore_rules.py) prune files and directories as the walk
+    goes, unless ignore_files is False.
+
+    snapshots (an AnalysisCache) lets unchanged directories be replayed
+    from their recorded listing; filters are applied again on replay, so
+    changed ignore settings take effect. After a complete walk, snapshots
+    of directories no longer reached are dropped.
+
+    on_dir, if given, is called with the path of every directory read.
+    """
+    ignored_name = compile_ignore_matcher(DEFAULT_IGNORED, USER_IGNORED).match
+    rules = IgnoreRules(root_path) if ignore_files else None
+    splitext = os.path.splitext
+    join = os.path.join
+    # Directories are tracked relative to the rules' top (with trailing
+    # "/"); snapshots are keyed relative to root_path
+    base = rules.root_rel if rules else ""
+    visited = set()
+    # (abs dir, rel dir, parent chain)
+    stack = [(root_path, base, rules.base_chain if rules else ())]
+    while stack:
+        dir_path, rel_dir, chain = stack.pop()
+        snap_key = rel_dir[len(base):-1]
+        visited.add(snap_key)
+        children = _list_dir(dir_path, snap_key, snapshots)
+        if children is None:
+            continue
+        if on_dir is not None:
+            on_dir(dir_path)
+        if rules:
+            chain = rules.enter(chain, rel_dir, {name for name, _ in children})
+
+        subdirs = []
+        for name, kind in children:
+            if kind == "d":
+                if not ignored_name(name) and not (
+                    chain and is_ignored(chain, rel_dir + name, True)
+                ):
+                    subdirs.append((join(dir_path, name), rel_dir + name + "/", chain))
+            elif splitext(name)[1].lower() in SOURCE_EXTENSIONS and not (
+                chain and is_ignored(chain, rel_dir + name, False)
+            ):
+                yield SourceFile(join(dir_path, name), name)
+        stack.extend(reversed(subdirs))
+
+    if snapshots is not None:
+        snapshots.retain_dir_snapshots(visited)
+
+
+def _walk_order_key(rel_path):
+    # Same order as iter_source_entries: per directory, files (by name)
+    # before subdirectories (by name)
+    parts = rel_path.split("/")
+    return [(1, d) for d in parts[:-1]] + [(0, parts[-1])]
+
+
+def iter_git_source_entries(root_path, ignore_files=True, on_dir=None):
+    """
+    List source files under root_path from the git index, without a walk.
+
+    Applies the same extension and ignore filters (including ignore
+    files) as iter_source_entries and yields in the same order. Each file
+    is still stat()ed: the index only records the stat of the last
+    ``git add``/refresh, so it cannot vouch for unstaged edits, and
+    deleted files are skipped this way. on_dir is called with the root
+    and every directory above a listed file, in walk order.
+
+    Returns:
+        Generator of SourceFile, or None when root_path is not in a
+        git checkout with a readable index
+    """
+    found = find_git_dir(root_path)
+    if found is None:
+        return None
+    git_dir, work_tree = found
+    index = read_index(git_dir)
+    if index is None:
+        return None
+
+    root = os.path.abspath(root_path)
+    prefix = os.path.relpath(root, work_tree).replace(os.sep, "/")
+    prefix = "" if prefix == "." else prefix + "/"
+    ignored = compile_ignore_matcher(DEFAULT_IGNORED, USER_IGNORED).match
+    rules = IgnoreRules(root) if ignore_files else None
+    splitext = os.path.splitext
+
+    selected = []
+    for entry in index:
+        if not entry.path.startswith(prefix):
+            continue
+        rel = entry.path[len(prefix):]
+        dirs = rel.split("/")
+        name = dirs.pop()
+        if splitext(name)[1].lower() not in SOURCE_EXTENSIONS:
+            continue
+        if any(ignored(d) for d in dirs):
+            continue
+        if rules and rules.is_file_ignored(rel):
+            continue
+        selected.append(rel)
+    selected.sort(key=_walk_order_key)
+
+    if on_dir is not None:
+        dirs = {""}
+        for rel in selected:
+            parts = rel.split("/")[:-1]
+            dirs.update("/".join(parts[:i]) for i in range(1, len(parts) + 1))
+        for rel_dir in sorted(dirs, key=lambda d: d.split("/")):
+            on_dir(os.path.join(root, *rel_dir.split("/")) if rel_dir else root)
+
+    def stat_files():
+        for rel in selected:
+            path = os.path.join(root, *rel.split("/"))
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue  # deleted (or unreadable) in the work tree
+            if stat.S_ISDIR(st.st_mode):
+                continue
+            yield SourceFile(path, rel.rpartition("/")[2], st)
+
+    return stat_files()
+
+
+def iter_project_entries(
+    root_path,
+    use_git_index=False,
+    untracked=False,
+    ignore_files=True,
+    snapshots=None,
+    on_dir=None,
+):
+    """
+    Source files to scan: from the git index when asked and available,
+    otherwise (or when untracked files are wanted) by walking the tree.
+    on_dir receives the directories read by the walk, or those holding
+    the files the index lists.
+    """
+    if use_git_index and not untracked:
+        entries = iter_git_source_entries(root_path, ignore_files, on_dir)
+        if entries is not None:
+            return entries
+    return iter_source_entries(root_path, ignore_files, snapshots, on_dir)
+
+
 def discover_source_files(root_path):
-    results = []
-    for root, dirs, files in os.walk(root_path):
-        dirs[:] = [
-            d
-            for d in dirs
-            if d not in DEFAULT_IGNORED
-            and d not in USER_IGNORED
-            and not any(fnmatch.fnmatch(d, p) for p in USER_IGNORED)
-        ]
-        for file in files:
-            ext = os.path.splitext(file)[1]
-            if get_analyzer(ext):
-                results.append(os.path.join(root, file))
-    return results
+    """Yield source file paths under root_path (see iter_source_entries)."""
+    for entry in iter_source_entries(root_path):
+        yield entry.path
 
 
 def infer_unit_meta(file_path, project_root):
@@ -61,108 +297,439 @@ def infer_unit_meta(file_path, project_root):
 
 
 def sync_entry_roles(model):
-    entry_uids = {s.unit_uid for s in model.symbols if s.attrs.get("entry") == "true"}
+    entry_uids = model.entry_unit_uids()
     for i, unit in enumerate(model.units):
         if unit.uid in entry_uids and unit.role == "lib":
             model.units[i] = Unit(unit.uid, unit.path, unit.lang, "entry", unit.module)
 
 
-def scan_project(root_path, model, use_cache=True):
+def unit_record(model, uid):
+    """
+    Collect what the analyzers produced for one unit as a plain record.
+
+    Units salvaged from a parse error get ``"partial": true``; like any
+    record it is cached, so unchanged broken files are not retried.
+    """
+    record = {
+        "symbols": [
+            {"name": s.name, "kind": s.kind, "attrs": dict(s.attrs)}
+            for s in model.symbols_of(uid)
+        ],
+        "deps": [[verb, target] for verb, target in model.iter_dependencies(uid)],
+        "layout": list(model.layout_lines),
+    }
+    if uid in model.partial_units:
+        record["partial"] = True
+    return record
+
+
+def record_deps(record):
+    """Yield a unit record's dependencies as (verb, target) pairs."""
+    for dep in record.get("deps", []):
+        if isinstance(dep, str):
+            # Entries written before deps were stored as [verb, target] pairs
+            dep = dep.split(":", 1)
+        yield dep[0], dep[1]
+
+
+def record_references(record):
+    """Names a unit record refers to as ``[name]`` (resolution candidates)."""
+    return {
+        target[1:-1]
+        for _, target in record_deps(record)
+        if target.startswith("[") and target.endswith("]")
+    }
+
+
+def apply_record(model, uid, record):
+    """Replay a unit record (fresh analysis or cache entry) into the model."""
+    for s in record.get("symbols", []):
+        model.add_symbol(s["name"], uid, s["kind"], **s.get("attrs", {}))
+    for verb, target in record_deps(record):
+        model.add_dependency(uid, verb, target)
+    model.layout_lines.extend(record.get("layout", []))
+    if record.get("partial"):
+        model.mark_partial(uid)
+
+
+def read_source_bytes(file_path):
+    """Read a source file once; the buffer feeds both the hasher and the analyzer."""
+    with open(file_path, "rb") as f:
+        return f.read()
+
+
+def analyze_file(
+    file_path, uid, root, content=None, outline_threshold=PythonAnalyzer.OUTLINE_THRESHOLD
+):
+    """
+    Analyze one file against a scratch model and return its unit record.
+
+    Runs in worker processes for ``--jobs``, so it must stay a module-level
+    function and must not touch the shared model. outline_threshold is
+    PythonAnalyzer's (None parses every Python file).
+    """
+    scratch = ProjectModel(name="", root=root, profile="generic")
+    analyzer = get_analyzer(os.path.splitext(file_path)[1])
+    if isinstance(analyzer, PythonAnalyzer) and analyzer.outline_threshold != outline_threshold:
+        analyzer = PythonAnalyzer(outline_threshold)
+    if analyzer:
+        analyzer.analyze(file_path, uid, scratch, content)
+    return unit_record(scratch, uid)
+
+
+def _cache_lang(lang, py_outline_threshold):
+    """
+    Language a file's records are cached under. The token outline reads
+    more of a broken Python file than the AST does, so Python records made
+    with a non-default outline threshold are kept apart.
+    """
+    if lang != "PY" or py_outline_threshold == PythonAnalyzer.OUTLINE_THRESHOLD:
+        return lang
+    return f"{lang}:outline-{py_outline_threshold}"
+
+
+def _init_worker(log_to_stderr):
+    """
+    Set up a --jobs worker process. Spawned workers do not inherit the
+    parent's stdout redirect (``-o -``), so analyzer warnings would land
+    in the PIR; they follow it here instead.
+    """
+    if log_to_stderr:
+        sys.stdout = sys.stderr
+
+
+def scan_project(
+    root_path,
+    model,
+    use_cache=True,
+    jobs=1,
+    hash_name=DEFAULT_HASH,
+    use_git_index=False,
+    untracked=False,
+    ignore_files=True,
+    cache=None,
+    reuse=None,
+    records=None,
+    on_dir=None,
+    entries=None,
+    py_outline_threshold=PythonAnalyzer.OUTLINE_THRESHOLD,
+):
+    """
+    Discover the project's source files and merge one record per file into
+    model, in discovery order.
+
+    Args:
+        cache: An open AnalysisCache to use (and leave open) instead of
+            opening one for this scan
+        reuse: Records by file path from an earlier scan; files found there
+            are merged as-is without being read
+        records: Dict that receives each merged record by file path
+        on_dir: Called with the directories discovery reports (see
+            iter_project_entries)
+        entries: Source files already discovered (SourceFile-like); skips
+            discovery
+        py_outline_threshold: Size from which Python files are read from
+            their tokens instead of an AST; None parses every file
+    """
     print(f"Scanning project: {root_path}")
 
-    cache = AnalysisCache(model.root) if use_cache else None
+    own_cache = cache is None
+    if own_cache and use_cache:
+        cache = AnalysisCache(model.root, hash_name=hash_name)
+    if cache:
+        cache.dir_hits = cache.dir_misses = 0
     cache_hits = 0
     cache_misses = 0
-    unit_cache = {}
-
-    for file_path in discover_source_files(root_path):
-        rel_path, lang, module = infer_unit_meta(file_path, model.root)
-
-        if rel_path not in unit_cache:
-            uid = model.add_unit(rel_path, lang=lang, role="lib", module=module)
-            unit_cache[rel_path] = uid
-        else:
-            uid = unit_cache[rel_path]
-
-        analyzer = get_analyzer(os.path.splitext(file_path)[1])
-        if not analyzer:
-            continue
-
-        if cache:
-            cached = cache.load(file_path, lang)
-            if cached:
-                for s in cached.get("symbols", []):
-                    model.add_symbol(s["name"], uid, s["kind"], **s.get("attrs", {}))
-                for k in cached.get("deps", []):
-                    verb, target = k.split(":", 1)
-                    model.add_dependency(uid, verb, target)
-                cache_hits += 1
-                continue
-            cache_misses += 1
-
-        analyzer.analyze(file_path, uid, model)
-
-        if cache:
+    reused = 0
+
+    # Files are read at most once: the same buffer is hashed for the cache
+    # and handed to the analyzer. With --jobs, misses are analyzed in worker
+    # processes while records are still merged in discovery order, so the
+    # model (and the PIR) is identical to a serial run. The window bounds
+    # how many buffers are in flight at once.
+    executor = None
+    if jobs > 1:
+        executor = ProcessPoolExecutor(
+            max_workers=jobs, initializer=_init_worker, initargs=(sys.stdout is sys.stderr,)
+        )
+    max_in_flight = jobs * 4
+    window = deque()
+
+    def merge_head():
+        file_path, uid, lang, module, st, digest, record, fresh = window.popleft()
+        if isinstance(record, Future):
+            record = record.result()
+        if fresh and cache:
             cache.save(
                 file_path,
                 lang,
-                {
-                    "unit": {"role": "lib", "module": module},
-                    "symbols": [
-                        {"name": s.name, "kind": s.kind, "attrs": s.attrs}
-                        for s in model.symbols
-                        if s.unit_uid == uid
-                    ],
-                    "deps": model._unit_dep_keys.get(uid, []),
-                },
+                {"unit": {"role": "lib", "module": module}, **record},
+                st=st,
+                digest=digest,
+            )
+        apply_record(model, uid, record)
+        if records is not None:
+            records[file_path] = record
+
+    try:
+        if entries is None:
+            entries = iter_project_entries(
+                root_path, use_git_index, untracked, ignore_files, snapshots=cache, on_dir=on_dir
             )
+        for entry in entries:
+            file_path = entry.path
+            rel_path, lang, module = infer_unit_meta(file_path, model.root)
+            uid = model.add_unit(rel_path, lang=lang, role="lib", module=module)
+            lang = _cache_lang(lang, py_outline_threshold)
+
+            record = reuse.get(file_path) if reuse else None
+            if record is not None:
+                reused += 1
+                window.append((file_path, uid, lang, module, None, None, record, False))
+                while window and (executor is None or len(window) > max_in_flight):
+                    merge_head()
+                continue
 
+            st = None
+            digest = None
+            content = None
+            record = None
+            if cache:
+                st = entry.stat()
+                digest = cache.cached_digest(file_path, st)
+                if digest is None:
+                    content = read_source_bytes(file_path)
+                    digest = cache.digest(content)
+                record = cache.load(file_path, lang, st=st, digest=digest)
+                if record:
+                    cache_hits += 1
+                else:
+                    cache_misses += 1
+                    if content is None:
+                        # Manifest pointed at an entry that no longer exists
+                        content = read_source_bytes(file_path)
+                        digest = cache.digest(content)
+
+            fresh = not record
+            if fresh:
+                if content is None:
+                    content = read_source_bytes(file_path)
+                job = (file_path, uid, model.root, content, py_outline_threshold)
+                if executor:
+                    record = executor.submit(analyze_file, *job)
+                else:
+                    record = analyze_file(*job)
+
+            window.append((file_path, uid, lang, module, st, digest, record, fresh))
+            while window and (executor is None or len(window) > max_in_flight):
+                merge_head()
+
+        while window:
+            merge_head()
+    finally:
+        if executor:
+            executor.shutdown()
+
+    if reuse is not None:
+        print(f"  Reused: {reused}")
     if cache:
+        if own_cache:
+            cache.close()
+        else:
+            cache.flush()
         print(f"  Cache hits: {cache_hits}, misses: {cache_misses}")
-
-
-def resolve_dependencies(model):
+        if cache.dir_hits or cache.dir_misses:
+            print(f"  Dir snapshots: hits: {cache.dir_hits}, misses: {cache.dir_misses}")
+    if model.partial_units:
+        print(f"  Partially analyzed (syntax errors): {len(model.partial_units)}")
+
+
+def resolve_dependencies(
+    model, symbol_index=None, uids=None, modules=None, includes=None, crates=None
+):
+    """
+    Rewrite ``[name]`` references to ``<uid>#name`` where the name has a
+    single definition; unresolvable calls are dropped. Python imports of
+    the project's own modules (absolute or relative), C/C++ includes of
+    its own headers and Rust ``use`` paths / ``mod`` items into its own
+    crates become the module's or header's ``<uid>``.
+
+    Args:
+        symbol_index: name -> defining uid, None (or missing) unless
+            unique; anything with ``.get()``, e.g. a NameIndex. Built from
+            the model when not given.
+        uids: Resolve only these units; the others are taken as already
+            resolved (see ProjectSession)
+        modules: PythonModuleIndex of the model's units; built when not
+            given
+        includes: IncludeIndex of the model's units (with the include
+            paths); built without include paths when not given
+        crates: RustModuleIndex of the model's units; built when not given
+    """
     print("Resolving dependencies...")
 
-    symbol_index = defaultdict(list)
-    for sym in model.symbols:
-        symbol_index[sym.name].append(sym.unit_uid)
+    # name -> uid, only for names with a single definition
+    if symbol_index is None:
+        symbol_index = model.unique_symbol_units()
+    if modules is None:
+        modules = PythonModuleIndex.from_model(model)
+    if includes is None:
+        includes = IncludeIndex.from_model(model)
+    if crates is None:
+        crates = RustModuleIndex.from_model(model)
 
     resolved = 0
     dropped = 0
-    new_all_keys = set()
 
-    for uid, dep_keys in model._unit_dep_keys.items():
-        resolved_keys = []
+    # Resolution only depends on the target, so each interned target is
+    # looked at once: tid -> resolved tid, the same tid (not a reference),
+    # or -1 (unresolvable reference)
+    target_memo = {}
+    call_vid = model._verb_ids.get("call")
+    # Module imports: absolute targets memoized by tid, relative ones by
+    # (importing package, tid); the value is the unit's tid or -1
+    import_vids = {vid for verb, vid in model._verb_ids.items() if verb.startswith("import")}
+    module_memo = {}
+    # Header lookups are memoized by the IncludeIndex itself
+    quoted_vid = model._verb_ids.get("include")
+    include_vids = {model._verb_ids.get(verb) for verb in ("include", "include_sys")}
+    include_vids.discard(None)
+    # Rust paths depend on the using unit's module, so they are not memoized
+    # (the index lookups are a few dict accesses)
+    use_vid = model._verb_ids.get("use")
+    mod_vid = model._verb_ids.get("mod")
+
+    unit_dep_keys = model._unit_dep_keys
+    if uids is None:
+        units = list(unit_dep_keys.items())
+    else:
+        units = [(uid, unit_dep_keys[uid]) for uid in uids if uid in unit_dep_keys]
+
+    for uid, dep_keys in units:
+        resolved_keys = {}
 
         for key in dep_keys:
-            verb, target = key.split(":", 1)
-
-            if target.startswith("[") and target.endswith("]"):
-                name = target[1:-1]
-                candidates = symbol_index.get(name)
-
-                if candidates and len(candidates) == 1:
-                    target = f"{candidates[0]}#{name}"
+            tid = key >> VERB_BITS
+            if key & VERB_MASK in import_vids and len(modules):
+                target = model._targets[tid]
+                relative = target.startswith("[.")
+                memo_key = (modules.package_of(uid), tid) if relative else tid
+                module_tid = module_memo.get(memo_key)
+                if module_tid is None:
+                    module_tid = -1
+                    if target.startswith("[") and target.endswith("]"):
+                        owner = modules.resolve(target[1:-1], uid)
+                        if owner is not None:
+                            module_tid = model.intern_target(owner)
+                    module_memo[memo_key] = module_tid
+                if module_tid != -1:
+                    resolved_keys[(module_tid << VERB_BITS) | (key & VERB_MASK)] = None
                     resolved += 1
-                elif verb == "call":
+                    continue
+
+            if key & VERB_MASK in include_vids:
+                target = model._targets[tid]
+                if target.startswith("[") and target.endswith("]"):
+                    owner = includes.resolve(target[1:-1], uid, key & VERB_MASK == quoted_vid)
+                    if owner is not None:
+                        header_tid = model.intern_target(owner)
+                        resolved_keys[(header_tid << VERB_BITS) | (key & VERB_MASK)] = None
+                        resolved += 1
+                        continue
+
+            if (key & VERB_MASK == use_vid or key & VERB_MASK == mod_vid) and len(crates):
+                target = model._targets[tid]
+                if target.startswith("[") and target.endswith("]"):
+                    path = target[1:-1]
+                    if key & VERB_MASK == mod_vid:
+                        path = "self::" + path
+                    owner = crates.resolve(path, uid)
+                    if owner is not None:
+                        module_tid = model.intern_target(owner)
+                        resolved_keys[(module_tid << VERB_BITS) | (key & VERB_MASK)] = None
+                        resolved += 1
+                        continue
+
+            new_tid = target_memo.get(tid)
+            if new_tid is None:
+                new_tid = tid
+                target = model._targets[tid]
+                if target.startswith("[") and target.endswith("]"):
+                    name = target[1:-1]
+                    owner = symbol_index.get(name)
+
+                    if owner is not None:
+                        new_tid = model.intern_target(f"{owner}#{name}")
+                    else:
+                        new_tid = -1
+                target_memo[tid] = new_tid
+
+            if new_tid == -1:
+                if key & VERB_MASK == call_vid:
                     dropped += 1
                     continue
+                new_key = key
+            elif new_tid != tid:
+                new_key = (new_tid << VERB_BITS) | (key & VERB_MASK)
+                resolved += 1
+            else:
+                new_key = key
 
-            new_key = f"{verb}:{target}"
-            resolved_keys.append(new_key)
-            new_all_keys.add(new_key)
+            resolved_keys[new_key] = None
 
-        model._unit_dep_keys[uid] = list(dict.fromkeys(resolved_keys))
+        unit_dep_keys[uid] = resolved_keys
 
+    new_all_keys = set()
+    for keys in unit_dep_keys.values():
+        new_all_keys.update(keys)
     model._all_dep_keys = new_all_keys
-    print(f"  - Resolved {resolved} references, dropped {dropped} unresolvable")
-
-
-def main():
-    global USER_IGNORED
-
-    parser = argparse.ArgumentParser(description="AIR - AI Project Analyzer")
+    scope = "" if uids is None else f" in {len(units)} units"
+    print(f"  - Resolved {resolved} references{scope}, dropped {dropped} unresolvable")
+
+
+def write_pir(model, output_file):
+    """
+    Write the PIR of a finalized model to output_file atomically.
+
+    The PIR is streamed into a temporary file next to output_file, which
+    then replaces it, so readers never see a partially written PIR.
+    """
+    directory = os.path.dirname(os.path.abspath(output_file))
+    fd, tmp_path = tempfile.mkstemp(prefix=".", suffix=".pir.tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            PIRBuilder(model).write(f)
+        # mkstemp creates the file private; give it the usual permissions
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(tmp_path, 0o666 & ~umask)
+        os.replace(tmp_path, output_file)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(tmp_path)
+        raise
+
+
+def _outline_threshold(value):
+    """--py-outline-threshold: a size in characters; 0 or "none" disables."""
+    if value.lower() == "none":
+        return None
+    try:
+        size = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid size: {value!r}")
+    if size < 0:
+        raise argparse.ArgumentTypeError(f"invalid size: {value!r}")
+    return size or None
+
+
+def build_parser(serve=False):
+    """Command line of ``air PATH``, or of ``air serve PATH`` when serve is set."""
+    parser = argparse.ArgumentParser(
+        prog="air serve" if serve else None,
+        description="AIR - AI Project Analyzer"
+        + (": keep a project in memory and serve PIR requests" if serve else ""),
+    )
     parser.add_argument("path", help="Project root path")
     parser.add_argument("--name", default="my_project")
     parser.add_argument("--no-cache", action="store_true", help="Disable cache")
@@ -174,7 +741,191 @@ def main():
         dest="ignore_patterns",
         help="Ignore directories matching pattern (can be used multiple times)",
     )
-    args = parser.parse_args()
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=1,
+        help="Analyze files in N worker processes (0 = one per CPU)",
+    )
+    parser.add_argument(
+        "--hash",
+        default=DEFAULT_HASH,
+        choices=HASH_ALGORITHMS,
+        dest="hash_name",
+        help="Content hash used by the analysis cache (e.g. blake2b)",
+    )
+    parser.add_argument(
+        "--columnar",
+        action="store_true",
+        help="Store symbols in compact array columns (for very large projects)",
+    )
+    parser.add_argument(
+        "--no-ignore-files",
+        action="store_true",
+        help="Do not apply .gitignore / .airignore rules",
+    )
+    parser.add_argument(
+        "--no-git-index",
+        action="store_true",
+        help="Walk the tree even when the root is inside a git checkout",
+    )
+    parser.add_argument(
+        "--untracked",
+        action="store_true",
+        help="Also scan files git does not track (walks the tree)",
+    )
+    parser.add_argument(
+        "--include-path",
+        "-I",
+        action="append",
+        default=[],
+        dest="include_paths",
+        metavar="DIR",
+        help=(
+            "Search DIR for C/C++ headers "
+            "(relative to the project root; can be used multiple times)"
+        ),
+    )
+    parser.add_argument(
+        "--py-outline-threshold",
+        type=_outline_threshold,
+        default=PythonAnalyzer.OUTLINE_THRESHOLD,
+        metavar="SIZE",
+        help=(
+            "Read Python files of at least SIZE characters from their tokens "
+            "instead of an AST (0 or 'none' disables; default: 1 MiB)"
+        ),
+    )
+    parser.add_argument(
+        "--socket",
+        help="Server socket (default: per project, in $XDG_RUNTIME_DIR or the temp dir)",
+    )
+    if serve:
+        return parser
+
+    parser.add_argument(
+        "--output",
+        "-o",
+        help="Output file (default: <name>.pir; '-' writes the PIR to stdout)",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep running and rewrite the PIR whenever source files change",
+    )
+    parser.add_argument(
+        "--watch-poll",
+        action="store_true",
+        help="With --watch, poll for changes instead of using inotify",
+    )
+    parser.add_argument(
+        "--client",
+        action="store_true",
+        help="Ask a running `air serve` for the PIR; build locally if none runs",
+    )
+    return parser
+
+
+def _open_session(args, abs_root):
+    from .session import ProjectSession
+
+    return ProjectSession(
+        abs_root,
+        name=args.name,
+        columnar=args.columnar,
+        use_cache=not args.no_cache,
+        jobs=args.jobs if args.jobs > 0 else (os.cpu_count() or 1),
+        hash_name=args.hash_name,
+        use_git_index=not args.no_git_index,
+        untracked=args.untracked,
+        ignore_files=not args.no_ignore_files,
+        include_paths=args.include_paths,
+        py_outline_threshold=args.py_outline_threshold,
+    )
+
+
+def _build_options(args):
+    """
+    The options that decide which files a build reads and how it
+    resolves them. A server answers only clients whose options match its
+    own, so a --client build equals a local one.
+    """
+    return {
+        "ignore": sorted(set(args.ignore_patterns)),
+        "ignore_files": not args.no_ignore_files,
+        "git_index": not args.no_git_index and not args.untracked,
+        "untracked": args.untracked,
+        "include_paths": list(args.include_paths),
+        "columnar": args.columnar,
+        "py_outline_threshold": args.py_outline_threshold,
+    }
+
+
+def serve(args, abs_root):
+    """Run ``air serve``: build once, then answer requests until shut down."""
+    from .server import PIRServer, default_socket_path
+
+    session = _open_session(args, abs_root)
+    try:
+        session.build()
+        server = PIRServer(
+            session, args.socket or default_socket_path(abs_root), _build_options(args)
+        )
+        print(f"\n🛰  Serving {abs_root} on {server.sock_path}")
+        server.serve_forever()
+    except RuntimeError as e:
+        print(f"Error: {e}")
+    finally:
+        session.close()
+
+
+def run_client(args, abs_root, output_file, stdout):
+    """
+    Have a running server build the PIR.
+
+    Returns:
+        False if no server is listening, its socket belongs to another
+        user, or it runs with other discovery or resolution options (the
+        caller then builds locally)
+    """
+    from .server import default_socket_path, send_request
+
+    to_stdout = output_file == "-"
+    request = {"op": "build", "name": args.name, "options": _build_options(args)}
+    if not to_stdout:
+        request["output"] = os.path.abspath(output_file)
+    try:
+        response = send_request(args.socket or default_socket_path(abs_root), request)
+    except RuntimeError as e:
+        print(f"Warning: {e}; building locally")
+        return False
+    if response is None:
+        print("No AIR server running for this project, building locally")
+        return False
+    if not response.get("ok") and "options" in response:
+        print(f"Warning: {response.get('error')}; building locally")
+        return False
+    if not response.get("ok"):
+        print(f"Error: {response.get('error')}")
+        return True
+    if to_stdout:
+        stdout.write(response["pir"])
+        stdout.flush()
+    print(f"✅ PIR served: {'<stdout>' if to_stdout else output_file}")
+    print(
+        f"   Units: {response['units']} | Symbols: {response['symbols']} | Deps: {response['deps']}"
+    )
+    return True
+
+
+def main(argv=None):
+    global USER_IGNORED
+
+    argv = sys.argv[1:] if argv is None else argv
+    # "air serve PATH ..." runs the server; anything else is a one-shot run
+    serving = argv[:1] == ["serve"]
+    args = build_parser(serving).parse_args(argv[1:] if serving else argv)
 
     USER_IGNORED = set(args.ignore_patterns)
 
@@ -183,29 +934,53 @@ def main():
         print(f"Error: Path {abs_root} does not exist.")
         return
 
-    model = ProjectModel(name=args.name, root=abs_root, profile="generic")
+    if serving:
+        serve(args, abs_root)
+        return
+
+    output_file = args.output or f"{args.name}.pir"
+    to_stdout = output_file == "-"
+    stdout = sys.stdout
+    # With -o -, stdout carries the PIR, so progress goes to stderr
+    log = contextlib.redirect_stdout(sys.stderr) if to_stdout else contextlib.nullcontext()
 
-    scan_project(abs_root, model, use_cache=not args.no_cache)
-    sync_entry_roles(model)
-    resolve_dependencies(model)
-    canonicalize_dependencies(model)
-    model.finalize_dependencies()
+    if args.watch and to_stdout:
+        print("Error: --watch needs an output file.")
+        return
 
-    builder = PIRBuilder(model)
-    pir_content = builder.build()
+    with log:
+        if args.client:
+            if run_client(args, abs_root, output_file, stdout):
+                return
+
+        session = _open_session(args, abs_root)
+        try:
+            model = session.build()
+            if to_stdout:
+                PIRBuilder(model).write(stdout)
+                stdout.flush()
+            else:
+                write_pir(model, output_file)
+
+            print(f"\n✅ PIR generated: {'<stdout>' if to_stdout else output_file}")
+            print(
+                f"   Units: {len(model.units)} | Symbols: {len(model.symbols)} | Deps: {len(model.dep_pool_items)}"
+            )
+            if args.ignore_patterns:
+                print(f"   Ignored patterns: {', '.join(args.ignore_patterns)}")
 
-    output_file = f"{args.name}.pir"
-    with open(output_file, "w", encoding="utf-8") as f:
-        f.write(pir_content)
+            if args.watch:
+                from .watch import watch_project
 
-    ignored = DEFAULT_IGNORED | USER_IGNORED
-    print(f"\n✅ PIR generated: {output_file}")
-    print(
-        f"   Units: {len(model.units)} | Symbols: {len(model.symbols)} | Deps: {len(model.dep_pool_items)}"
-    )
-    if args.ignore_patterns:
-        print(f"   Ignored patterns: {', '.join(args.ignore_patterns)}")
+                watch_project(session, output_file, poll=args.watch_poll)
+        finally:
+            session.close()
 
 
 if __name__ == "__main__":
-    main()
+    # Run the package's copy of this module, so the settings main() keeps
+    # in module globals are seen by the modules importing it (session, watch,
+    # server)
+    from pirgen.pirgen import main as package_main
+
+    package_main()
@@ -0,0 +1,326 @@
+"""
+`air serve`: a resident daemon answering PIR requests over a unix socket.
+
+The daemon builds the project once and then keeps the ProjectSession (the
+model, every file's unit record and the open analysis cache) in memory.
+Discovery is the same as in a one-shot run: from the git index unless
+untracked files are asked for. Before answering, the daemon compares the
+stats of the known files and directories (and of the git index, which
+changes when files are added) with the last build and, if something
+changed, rebuilds through the session, which re-analyzes only the
+touched files.
+
+Protocol: one JSON object per line in each direction. Requests carry an
+``op``:
+
+- ``{"op": "ping"}``
+- ``{"op": "build", "name": "...", "output": "/abs/path.pir",
+  "options": {...}}``: writes the PIR to ``output``; without ``output``
+  the PIR text is returned in the ``pir`` field. ``options`` are the
+  client's discovery and resolution options; when they differ from the
+  daemon's, the build fails and the response carries the daemon's
+  ``options``
+- ``{"op": "query", "symbol": "name"}``: where a symbol is defined
+- ``{"op": "query", "path": "rel/path.c"}``: one unit with its symbols
+  and dependencies
+- ``{"op": "shutdown"}``
+
+Every response has ``ok``; failed requests carry ``error`` instead of a
+result. Connections are served one at a time.
+
+Only the user running the daemon may talk to it: the socket is created
+with mode 0600, in a private directory when it defaults to the shared
+temp directory. Both sides refuse a socket path owned by another user
+and, where the platform reports it, a peer process of another user.
+"""
+
+import contextlib
+import hashlib
+import json
+import os
+import socket
+import stat
+import struct
+import tempfile
+from typing import Any, Dict, List, Optional
+
+from .core.pir_builder import PIRBuilder
+from .pirgen import DEFAULT_IGNORED, compile_ignore_matcher, write_pir
+from .watch import PollingWatcher, is_relevant_change, watch_targets
+
+# Seconds a connection may sit idle before the daemon drops it, so one
+# stuck client cannot block the others
+IDLE_TIMEOUT = 30.0
+CONNECT_TIMEOUT = 1.0
+
+
+def default_socket_path(root: str) -> str:
+    """
+    Socket of the daemon serving root: in $XDG_RUNTIME_DIR, or else in a
+    private ``air-<uid>`` directory of the temp directory (created if
+    missing), named after the user and a hash of the resolved root.
+
+    Raises:
+        RuntimeError: The private directory is not the user's own
+    """
+    digest = hashlib.sha1(os.path.realpath(root).encode("utf-8")).hexdigest()[:16]
+    base = os.environ.get("XDG_RUNTIME_DIR")
+    if not base:
+        base = _private_dir(os.path.join(tempfile.gettempdir(), f"air-{os.getuid()}"))
+    return os.path.join(base, f"air-{os.getuid()}-{digest}.sock")
+
+
+def _private_dir(path: str) -> str:
+    """Create path (mode 0700) if missing; check that only this user can use it."""
+    with contextlib.suppress(FileExistsError):
+        os.mkdir(path, 0o700)
+    st = os.lstat(path)
+    if not stat.S_ISDIR(st.st_mode) or st.st_uid != os.getuid() or st.st_mode & 0o077:
+        raise RuntimeError(f"{path} is not a private directory of this user")
+    return path
+
+
+def _check_owner(sock_path: str) -> bool:
+    """
+    Whether something exists at sock_path.
+
+    Raises:
+        RuntimeError: It is owned by another user
+    """
+    try:
+        st = os.lstat(sock_path)
+    except FileNotFoundError:
+        return False
+    if st.st_uid != os.getuid():
+        raise RuntimeError(f"refusing {sock_path}: owned by another user")
+    return True
+
+
+def _peer_uid(sock: socket.socket) -> Optional[int]:
+    """User id of the process at the other end, where the platform reports it."""
+    if not hasattr(socket, "SO_PEERCRED"):
+        return None
+    creds = sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i"))
+    return struct.unpack("3i", creds)[1]
+
+
+class PIRServer:
+    """
+    Answer requests for one built ProjectSession.
+
+    Args:
+        session: A ProjectSession that has already been built
+        sock_path: Unix socket to listen on
+        options: The options the session was opened with; build requests
+            carrying other options are refused (None accepts any)
+    """
+
+    def __init__(self, session, sock_path: str, options: Optional[Dict[str, Any]] = None):
+        from .pirgen import USER_IGNORED
+
+        self.session = session
+        self.sock_path = sock_path
+        self.options = options
+        self._ignored_name = compile_ignore_matcher(DEFAULT_IGNORED, USER_IGNORED).match
+        # Stat snapshot of the last build; read(0) diffs it right away
+        self._watcher = PollingWatcher()
+        self._watcher.update(*watch_targets(session))
+        self._symbol_index: Optional[Dict[str, List[tuple]]] = None
+        self._stopping = False
+
+    # ------------------------
+    # Requests
+    # ------------------------
+    def refresh(self) -> bool:
+        """Rebuild if files changed since the last build; True if it did."""
+        changed = self._watcher.read(0)
+        if changed is not None and not any(
+            is_relevant_change(p, self._ignored_name, self.session.index_file) for p in changed
+        ):
+            return False
+        self.session.build(changed)
+        self._watcher.update(*watch_targets(self.session))
+        self._symbol_index = None
+        return True
+
+    def handle(self, request: dict) -> dict:
+        """Answer one decoded request."""
+        op = request.get("op")
+        if op == "ping":
+            return {"ok": True, "root": self.session.root, "pid": os.getpid()}
+        if op == "shutdown":
+            self._stopping = True
+            return {"ok": True}
+        if op == "build":
+            return self._build(request)
+        if op == "query":
+            return self._query(request)
+        return {"ok": False, "error": f"unknown op: {op!r}"}
+
+    def _build(self, request: dict) -> dict:
+        options = request.get("options")
+        if options is not None and self.options is not None and options != self.options:
+            differing = sorted(
+                key
+                for key in options.keys() | self.options.keys()
+                if options.get(key) != self.options.get(key)
+            )
+            return {
+                "ok": False,
+                "error": f"server runs with other options: {', '.join(differing)}",
+                "options": self.options,
+            }
+        rebuilt = self.refresh()
+        model = self.session.model
+        model.name = request.get("name") or self.session.name
+        response = {
+            "ok": True,
+            "rebuilt": rebuilt,
+            "units": len(model.units),
+            "symbols": len(model.symbols),
+            "deps": len(model.dep_pool_items),
+        }
+        output = request.get("output")
+        if output:
+            write_pir(model, output)
+            response["output"] = output
+        else:
+            response["pir"] = PIRBuilder(model).build()
+        return response
+
+    def _query(self, request: dict) -> dict:
+        self.refresh()
+        model = self.session.model
+        if "symbol" in request:
+            if self._symbol_index is None:
+                index: Dict[str, List[tuple]] = {}
+                for name, uid, kind, _ in model.iter_symbol_rows():
+                    index.setdefault(name, []).append((uid, kind))
+                self._symbol_index = index
+            paths = {u.uid: u.path for u in model.units}
+            defs = self._symbol_index.get(request["symbol"], [])
+            return {
+                "ok": True,
+                "symbols": [
+                    {"unit": uid, "path": paths[uid], "kind": kind} for uid, kind in defs
+                ],
+            }
+        if "path" in request:
+            uid = model.get_uid_by_path(os.path.normpath(request["path"]))
+            if uid is None:
+                return {"ok": False, "error": f"no unit for path: {request['path']}"}
+            unit = model.units[int(uid[1:])]
+            return {
+                "ok": True,
+                "unit": {
+                    "uid": unit.uid,
+                    "path": unit.path,
+                    "lang": unit.lang,
+                    "role": unit.role,
+                    "module": unit.module,
+                },
+                "symbols": [
+                    {"name": s.name, "kind": s.kind, "attrs": dict(s.attrs)}
+                    for s in model.symbols_of(uid)
+                ],
+                "deps": [list(dep) for dep in model.iter_dependencies(uid)],
+            }
+        return {"ok": False, "error": "query needs 'symbol' or 'path'"}
+
+    # ------------------------
+    # Socket
+    # ------------------------
+    def _serve_connection(self, conn: socket.socket) -> None:
+        conn.settimeout(IDLE_TIMEOUT)
+        with conn.makefile("rwb") as stream:
+            try:
+                for line in stream:
+                    if not line.strip():
+                        continue
+                    try:
+                        request = json.loads(line)
+                        response = self.handle(request)
+                    except Exception as e:  # keep serving; report to the client
+                        response = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+                    stream.write(json.dumps(response).encode("utf-8") + b"\n")
+                    stream.flush()
+                    if self._stopping:
+                        break
+            except (socket.timeout, OSError):
+                pass
+
+    def serve_forever(self) -> None:
+        """Listen on the socket until a shutdown request (or Ctrl+C)."""
+        probe = _connect(self.sock_path)
+        if probe is not None:
+            probe.close()
+            raise RuntimeError(f"a server is already listening on {self.sock_path}")
+        if _check_owner(self.sock_path):
+            os.unlink(self.sock_path)  # left behind by a daemon that died
+
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        # Only the owner may connect: requests can write files as this user
+        umask = os.umask(0o177)
+        try:
+            listener.bind(self.sock_path)
+        finally:
+            os.umask(umask)
+        try:
+            listener.listen(16)
+            while not self._stopping:
+                conn, _ = listener.accept()
+                with conn:
+                    if _peer_uid(conn) in (None, os.getuid()):
+                        self._serve_connection(conn)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            listener.close()
+            with contextlib.suppress(OSError):
+                os.unlink(self.sock_path)
+
+
+def _connect(sock_path: str) -> Optional[socket.socket]:
+    """
+    Connect to the daemon at sock_path; None if none listens there.
+
+    Raises:
+        RuntimeError: The socket or the process serving it belongs to
+            another user
+    """
+    if not _check_owner(sock_path):
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(CONNECT_TIMEOUT)
+    try:
+        sock.connect(sock_path)
+    except OSError:
+        sock.close()
+        return None
+    if _peer_uid(sock) not in (None, os.getuid()):
+        sock.close()
+        raise RuntimeError(f"refusing {sock_path}: served by another user")
+    sock.settimeout(None)
+    return sock
+
+
+def send_request(sock_path: str, request: dict) -> Optional[dict]:
+    """
+    Send one request to a running daemon.
+
+    Returns:
+        The decoded response, or None if no daemon listens on sock_path
+
+    Raises:
+        RuntimeError: sock_path belongs to another user
+    """
+    sock = _connect(sock_path)
+    if sock is None:
+        return None
+    with sock, sock.makefile("rwb") as stream:
+        stream.write(json.dumps(request).encode("utf-8") + b"\n")
+        stream.flush()
+        line = stream.readline()
+    if not line:
+        return None
+    return json.loads(line)
@@ -0,0 +1,255 @@
+"""
+A project kept in memory between builds.
+
+ProjectSession remembers the unit record of every scanned file, so a
+rebuild after some files changed only re-analyzes those files: the rest
+are merged from memory, and the model is then resolved and finalized as
+usual. Discovery still runs on every build (cheap with directory
+snapshots), which picks up added, removed and newly ignored files, and
+keeps the model identical to what a fresh run would produce.
+
+Resolution is incremental too. A NameIndex (core/name_index.py) keeps
+which units define and which reference each name, and every unit's
+resolved dependencies are remembered. When the file list is unchanged,
+only re-analyzed units and the units referencing a name whose owner
+changed are resolved again. Adding or removing a file renumbers the
+units, so those builds resolve everything.
+"""
+
+import os
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .core.analysis_cache import AnalysisCache, DEFAULT_HASH
+from .core.c_includes import IncludeIndex
+from .core.git_index import find_git_dir
+from .core.dep_canon import canonicalize_dependencies
+from .core.name_index import NameIndex
+from .core.project_model import ProjectModel
+from .core.py_modules import PythonModuleIndex
+from .core.rust_modules import RustModuleIndex
+from .analyzers import PythonAnalyzer
+from .pirgen import (
+    iter_project_entries,
+    record_deps,
+    record_references,
+    resolve_dependencies,
+    scan_project,
+    sync_entry_roles,
+)
+
+
+class ProjectSession:
+    """
+    Scan state of one project root, reused across builds.
+
+    Args:
+        root: Project root path
+        name: Project name written to the PIR
+        columnar: Use the columnar symbol backend
+        use_cache: Keep an analysis cache open for the session
+        jobs: Worker processes for analysis
+        hash_name: Content hash of the analysis cache
+        use_git_index: Discover files from .git/index when possible
+        untracked: Also scan files git does not track
+        ignore_files: Apply .gitignore / .airignore rules
+        include_paths: Header search directories for C/C++ includes
+        py_outline_threshold: Size from which Python files are read from
+            their tokens instead of an AST; None parses every file
+    """
+
+    def __init__(
+        self,
+        root: str,
+        name: str = "my_project",
+        columnar: bool = False,
+        use_cache: bool = True,
+        jobs: int = 1,
+        hash_name: str = DEFAULT_HASH,
+        use_git_index: bool = False,
+        untracked: bool = False,
+        ignore_files: bool = True,
+        include_paths: Iterable[str] = (),
+        py_outline_threshold: Optional[int] = PythonAnalyzer.OUTLINE_THRESHOLD,
+    ):
+        self.root = os.path.abspath(root)
+        self.name = name
+        self.columnar = columnar
+        self.jobs = jobs
+        self.use_git_index = use_git_index
+        self.untracked = untracked
+        self.ignore_files = ignore_files
+        self.include_paths = list(include_paths)
+        self.py_outline_threshold = py_outline_threshold
+        self.cache = AnalysisCache(self.root, hash_name=hash_name) if use_cache else None
+
+        self.model: Optional[ProjectModel] = None
+        # Unit record per file path, in discovery order
+        self.records: Dict[str, dict] = {}
+        # Directories read by the last walk, or holding the files listed
+        # by the git index
+        self.dirs: List[str] = []
+        # The git index discovery reads: it changes when files are added
+        self.index_file: Optional[str] = None
+        if use_git_index and not untracked:
+            found = find_git_dir(self.root)
+            if found is not None:
+                self.index_file = os.path.join(found[0], "index")
+
+        # File paths of the last build; position i is unit u{i}
+        self._paths: List[str] = []
+        self.names = NameIndex()
+        self._modules: Optional[PythonModuleIndex] = None
+        self._includes: Optional[IncludeIndex] = None
+        self._crates: Optional[RustModuleIndex] = None
+        # Resolved dependencies per file path, for units where resolution
+        # changed something (others resolve to their raw deps)
+        self._resolved: Dict[str, List[Tuple[str, str]]] = {}
+
+    def build(self, changed: Optional[Iterable[str]] = None) -> ProjectModel:
+        """
+        Scan the project and return a finalized model.
+
+        Args:
+            changed: Paths touched since the last build; only those files
+                are analyzed again. None (or a first build) analyzes every
+                file, still going through the analysis cache.
+
+        Returns:
+            The new model, also kept as ``self.model``
+        """
+        dirs: List[str] = []
+        entries = list(
+            iter_project_entries(
+                self.root,
+                self.use_git_index,
+                self.untracked,
+                self.ignore_files,
+                snapshots=self.cache,
+                on_dir=dirs.append,
+            )
+        )
+        paths = [entry.path for entry in entries]
+
+        reuse = None
+        incremental = False
+        if changed is not None and self.model is not None:
+            changed = set(changed)
+            # Same files in the same order: uids are stable, so earlier
+            # resolutions still hold
+            incremental = paths == self._paths
+            reuse = {}
+            for path, record in self.records.items():
+                if path in changed:
+                    continue
+                resolved = self._resolved.get(path) if incremental else None
+                if resolved is not None:
+                    record = {**record, "deps": resolved}
+                reuse[path] = record
+
+        model = ProjectModel(
+            name=self.name, root=self.root, profile="generic", columnar=self.columnar
+        )
+        records: Dict[str, dict] = {}
+        scan_project(
+            self.root,
+            model,
+            use_cache=self.cache is not None,
+            jobs=self.jobs,
+            cache=self.cache,
+            reuse=reuse,
+            records=records,
+            entries=entries,
+            py_outline_threshold=self.py_outline_threshold,
+        )
+        if reuse:
+            # Keep the raw records: they are what a unit resolves from
+            for path in reuse:
+                if path in records:
+                    records[path] = self.records[path]
+
+        sync_entry_roles(model)
+        if incremental:
+            dirty = self._prepare_incremental(model, paths, records, reuse)
+            resolve_dependencies(
+                model, self.names, dirty, self._modules, self._includes, self._crates
+            )
+        else:
+            # Module names and header locations only change with the file
+            # list (or packaging files), so the indexes are kept until the
+            # next full build
+            self._modules = PythonModuleIndex.from_model(model)
+            self._includes = IncludeIndex.from_model(model, self.include_paths)
+            self._crates = RustModuleIndex.from_model(model)
+            self.names = NameIndex()
+            for i, path in enumerate(paths):
+                self._index_unit(f"u{i}", records[path])
+            self._resolved = {}
+            dirty = [f"u{i}" for i in range(len(paths))]
+            resolve_dependencies(
+                model,
+                self.names,
+                modules=self._modules,
+                includes=self._includes,
+                crates=self._crates,
+            )
+        self._remember_resolved(model, paths, records, dirty)
+        canonicalize_dependencies(model)
+        model.finalize_dependencies()
+
+        self.model = model
+        self.records = records
+        self.dirs = dirs
+        self._paths = paths
+        return model
+
+    def _index_unit(self, uid: str, record: dict):
+        return self.names.set_unit(
+            uid,
+            [s["name"] for s in record.get("symbols", [])],
+            record_references(record),
+        )
+
+    def _prepare_incremental(self, model, paths, records, reuse) -> List[str]:
+        """
+        Update the name index for re-analyzed units and hand every unit
+        whose resolution may change back to the resolver with its raw
+        dependencies. Returns the uids to resolve.
+        """
+        dirty = set()
+        owners_changed = set()
+        for i, path in enumerate(paths):
+            if path not in reuse:
+                uid = f"u{i}"
+                owners_changed |= self._index_unit(uid, records[path])
+                dirty.add(uid)
+
+        for uid in self.names.referencing(owners_changed) - dirty:
+            model.set_dependencies(uid, record_deps(records[paths[int(uid[1:])]]))
+            dirty.add(uid)
+
+        # A reused unit that resolved to nothing still has an (empty) entry
+        # after a full resolve
+        position = None
+        for path, resolved in self._resolved.items():
+            if not resolved and path in reuse:
+                if position is None:
+                    position = {p: i for i, p in enumerate(paths)}
+                uid = f"u{position[path]}"
+                if uid not in dirty:
+                    model.set_dependencies(uid, ())
+        return sorted(dirty, key=lambda uid: int(uid[1:]))
+
+    def _remember_resolved(self, model, paths, records, uids) -> None:
+        for uid in uids:
+            path = paths[int(uid[1:])]
+            resolved = list(model.iter_dependencies(uid))
+            if resolved != list(record_deps(records[path])):
+                self._resolved[path] = resolved
+            else:
+                self._resolved.pop(path, None)
+
+    def close(self) -> None:
+        """Flush and close the analysis cache."""
+        if self.cache is not None:
+            self.cache.close()
+            self.cache = None
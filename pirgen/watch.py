@@ -0,0 +1,322 @@
+"""
+Watch mode: keep a project's PIR up to date while files change.
+
+After the initial build, the directories read by discovery are watched
+with Linux inotify (called through ctypes, no extra dependency). Where
+inotify is unavailable or runs out of watches, a polling watcher compares
+stat snapshots instead. Changes are collected until the tree has been
+quiet for a short debounce interval, then the session re-analyzes only
+the touched files, resolves and finalizes, and the PIR is replaced
+atomically. When files are listed from the git index, the index is
+watched too: a file shows up once it is added, as in a one-shot run.
+"""
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import time
+from typing import Dict, Iterable, Optional, Set
+
+from .core.ignore_rules import IGNORE_FILES
+from .pirgen import DEFAULT_IGNORED, SOURCE_EXTENSIONS, compile_ignore_matcher, write_pir
+
+# inotify(7) event bits
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_DONT_FOLLOW = 0x02000000
+IN_EXCL_UNLINK = 0x04000000
+IN_ISDIR = 0x40000000
+
+WATCH_MASK = (
+    IN_CLOSE_WRITE
+    | IN_MOVED_FROM
+    | IN_MOVED_TO
+    | IN_CREATE
+    | IN_DELETE
+    | IN_DELETE_SELF
+    | IN_ONLYDIR
+    | IN_DONT_FOLLOW
+    | IN_EXCL_UNLINK
+)
+
+# struct inotify_event header: wd, mask, cookie, len (name follows)
+_EVENT = struct.Struct("iIII")
+
+DEFAULT_DEBOUNCE = 0.2
+# A batch is built at the latest this long after its first change, even
+# if changes keep coming
+MAX_BATCH_DELAY = 2.0
+
+
+class InotifyWatcher:
+    """
+    Report changes below a set of directories through inotify.
+
+    Changed paths are returned as absolute paths; directory events carry a
+    trailing separator. Raises OSError if inotify cannot be used.
+    """
+
+    def __init__(self):
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+            self._add_watch = libc.inotify_add_watch
+        except (OSError, AttributeError) as e:
+            raise OSError(errno.ENOSYS, f"inotify not available: {e}")
+        self._add_watch.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32)
+        self._add_watch.restype = ctypes.c_int
+
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        self._fd = fd
+        self._dirs: Dict[int, str] = {}  # watch descriptor -> directory
+        self._watched: Set[str] = set()
+
+    def update(self, files: Iterable[str], dirs: Iterable[str]) -> None:
+        """
+        Watch every directory in dirs not watched yet (files are not
+        needed: events arrive per directory).
+
+        Raises OSError(ENOSPC) when the inotify watch limit is reached.
+        """
+        for path in dirs:
+            if path in self._watched:
+                continue
+            wd = self._add_watch(self._fd, os.fsencode(path), WATCH_MASK)
+            if wd < 0:
+                err = ctypes.get_errno()
+                if err == errno.ENOSPC:
+                    raise OSError(err, "inotify watch limit reached")
+                continue  # removed meanwhile, or not a directory any more
+            self._dirs[wd] = path
+            self._watched.add(path)
+
+    def read(self, timeout: float) -> Optional[Set[str]]:
+        """
+        Wait up to timeout seconds for changes.
+
+        Returns:
+            Changed paths (empty if none), or None if the kernel queue
+            overflowed and anything may have changed
+        """
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return set()
+        changed: Set[str] = set()
+        overflow = False
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            pos = 0
+            while pos + _EVENT.size <= len(data):
+                wd, mask, _, name_len = _EVENT.unpack_from(data, pos)
+                pos += _EVENT.size
+                name = data[pos:pos + name_len].rstrip(b"\0")
+                pos += name_len
+                if mask & IN_Q_OVERFLOW:
+                    overflow = True
+                    continue
+                directory = self._dirs.get(wd)
+                if directory is None:
+                    continue
+                if mask & IN_IGNORED:
+                    # Watch removed (directory deleted or unmounted)
+                    del self._dirs[wd]
+                    self._watched.discard(directory)
+                    changed.add(directory + os.sep)
+                    continue
+                if not name:
+                    changed.add(directory + os.sep)
+                    continue
+                path = os.path.join(directory, os.fsdecode(name))
+                changed.add(path + os.sep if mask & IN_ISDIR else path)
+        return None if overflow else changed
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+class PollingWatcher:
+    """
+    Report changes by comparing stat snapshots of the known files and
+    directories; a directory whose mtime moved had entries added or
+    removed. Same interface as InotifyWatcher.
+    """
+
+    def __init__(self, interval: float = 1.0):
+        self.interval = interval
+        self._state: Dict[str, Optional[tuple]] = {}
+
+    @staticmethod
+    def _stat(path: str) -> Optional[tuple]:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def update(self, files: Iterable[str], dirs: Iterable[str]) -> None:
+        """Snapshot the files and directories of the last build."""
+        state = {path: self._stat(path) for path in files}
+        for path in dirs:
+            state[path + os.sep] = self._stat(path)
+            # Ignore files are edited in place, which leaves the
+            # directory's mtime alone
+            for name in IGNORE_FILES:
+                ignore_file = os.path.join(path, name)
+                state[ignore_file] = self._stat(ignore_file)
+        self._state = state
+
+    def read(self, timeout: float) -> Optional[Set[str]]:
+        """Poll until something changed or timeout seconds passed."""
+        deadline = time.monotonic() + timeout
+        while True:
+            time.sleep(max(0.0, min(self.interval, deadline - time.monotonic())))
+            changed = set()
+            for path, old in self._state.items():
+                new = self._stat(path[:-1] if path.endswith(os.sep) else path)
+                if new != old:
+                    self._state[path] = new
+                    changed.add(path)
+            if changed or time.monotonic() >= deadline:
+                return changed
+
+    def close(self) -> None:
+        pass
+
+
+def open_watcher(files, dirs, poll=False, poll_interval=1.0):
+    """
+    inotify watcher for the given directories, or a polling watcher when
+    poll is set or inotify cannot be used.
+    """
+    if not poll:
+        watcher = None
+        try:
+            watcher = InotifyWatcher()
+            watcher.update(files, dirs)
+            return watcher
+        except OSError as e:
+            if watcher is not None:
+                watcher.close()
+            print(f"  inotify unavailable ({e.strerror or e}), polling instead")
+    watcher = PollingWatcher(poll_interval)
+    watcher.update(files, dirs)
+    return watcher
+
+
+def _merge(changed: Optional[Set[str]], more: Optional[Set[str]]) -> Optional[Set[str]]:
+    if changed is None or more is None:
+        return None
+    return changed | more
+
+
+def watch_targets(session):
+    """
+    Files and directories whose changes can affect the session's next
+    build: its sources and their directories, plus the git index (and the
+    directory it is replaced in) when discovery reads it.
+    """
+    files = list(session.records)
+    dirs = list(session.dirs)
+    if session.index_file is not None:
+        files.append(session.index_file)
+        dirs.append(os.path.dirname(session.index_file))
+    return files, dirs
+
+
+def is_relevant_change(path: str, ignored_name=None, index_file=None) -> bool:
+    """
+    Whether a changed path can affect the PIR: a source file, an ignore
+    file, the git index discovery reads, or a directory that is not
+    ignored by name.
+    """
+    if path == index_file:
+        return True
+    if ignored_name is None:
+        ignored_name = compile_ignore_matcher(DEFAULT_IGNORED).match
+    if path.endswith(os.sep):
+        return not ignored_name(os.path.basename(path[:-1]))
+    name = os.path.basename(path)
+    return name in IGNORE_FILES or os.path.splitext(name)[1].lower() in SOURCE_EXTENSIONS
+
+
+def collect_batch(watcher, timeout, debounce=DEFAULT_DEBOUNCE):
+    """
+    Wait up to timeout for a change, then keep collecting until the tree
+    has been quiet for debounce seconds (at most MAX_BATCH_DELAY).
+
+    Returns:
+        Changed paths (empty if nothing happened), or None for "rescan all"
+    """
+    changed = watcher.read(timeout)
+    if changed is not None and not changed:
+        return changed
+    deadline = time.monotonic() + MAX_BATCH_DELAY
+    while time.monotonic() < deadline:
+        more = watcher.read(debounce)
+        if more is not None and not more:
+            break
+        changed = _merge(changed, more)
+    return changed
+
+
+def watch_project(
+    session,
+    output_file,
+    debounce=DEFAULT_DEBOUNCE,
+    poll=False,
+    poll_interval=1.0,
+    stop=None,
+):
+    """
+    Rebuild output_file from session whenever the project changes.
+
+    Args:
+        session: A ProjectSession that has already been built
+        output_file: PIR path, replaced atomically on every rebuild
+        debounce: Quiet time (seconds) that ends a batch of changes
+        poll: Use the polling watcher even where inotify works
+        poll_interval: Seconds between polls
+        stop: Optional threading.Event ending the loop (runs until
+            interrupted otherwise)
+    """
+    from .pirgen import USER_IGNORED
+
+    ignored_name = compile_ignore_matcher(DEFAULT_IGNORED, USER_IGNORED).match
+    files, dirs = watch_targets(session)
+    watcher = open_watcher(files, dirs, poll, poll_interval)
+    print(f"\n👀 Watching {session.root} (Ctrl+C to stop)")
+    try:
+        while stop is None or not stop.is_set():
+            changed = collect_batch(watcher, 0.5, debounce)
+            if changed is not None and not any(
+                is_relevant_change(p, ignored_name, session.index_file) for p in changed
+            ):
+                continue
+
+            started = time.perf_counter()
+            model = session.build(changed)
+            write_pir(model, output_file)
+            watcher.update(*watch_targets(session))
+            elapsed = (time.perf_counter() - started) * 1000
+            print(f"✅ PIR updated: {output_file} ({elapsed:.0f} ms)")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
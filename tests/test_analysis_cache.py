@@ -0,0 +1,156 @@
+"""Tests for AnalysisCache.
+
+Tests cover:
+- Round trip of saved entries
+- Stat manifest fast path (no hashing for unchanged files)
+- Invalidation when file content changes
+- Packed SQLite store and migration of v1 JSON caches
+- Directory snapshots (mtime check, racy guard, pruning)
+"""
+
+import json
+import os
+import tempfile
+import time
+import pytest
+from pirgen.core.analysis_cache import AnalysisCache
+
+
+PAYLOAD = {
+    "unit": {"role": "lib", "module": "root"},
+    "symbols": [{"name": "main", "kind": "func", "attrs": {"entry": "true"}}],
+    "deps": ["import_std:[os]"],
+}
+
+
+class TestAnalysisCache:
+    def setup_method(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = self._tmp.name
+        self.path = os.path.join(self.root, "main.py")
+        self._write("def main():\n    pass\n")
+
+    def teardown_method(self):
+        self._tmp.cleanup()
+
+    def _write(self, content: str):
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write(content)
+
+    def _warm_cache(self) -> AnalysisCache:
+        cache = AnalysisCache(self.root)
+        cache.save(self.path, "PY", PAYLOAD)
+        cache.flush()
+        return AnalysisCache(self.root)
+
+    def test_miss_on_empty_cache(self):
+        cache = AnalysisCache(self.root)
+        assert cache.load(self.path, "PY") is None
+
+    def test_save_and_load_round_trip(self):
+        cache = self._warm_cache()
+        data = cache.load(self.path, "PY")
+        assert data is not None
+        assert data["symbols"] == PAYLOAD["symbols"]
+        assert data["deps"] == PAYLOAD["deps"]
+
+    def test_unchanged_stat_skips_hashing(self, monkeypatch):
+        cache = self._warm_cache()
+
+        def fail_hash(path):
+            raise AssertionError("file should not be hashed")
+
+        monkeypatch.setattr(cache, "file_hash", fail_hash)
+        assert cache.load(self.path, "PY") is not None
+
+    def test_changed_content_misses(self):
+        cache = self._warm_cache()
+        self._write("def main():\n    return 1\n")
+        assert cache.load(self.path, "PY") is None
+
+    def test_touched_file_with_same_content_hits(self):
+        cache = self._warm_cache()
+        st = os.stat(self.path)
+        os.utime(self.path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+        assert cache.load(self.path, "PY") is not None
+
+    def test_invalidate_removes_entry(self):
+        cache = self._warm_cache()
+        cache.invalidate(self.path, "PY")
+        assert cache.load(self.path, "PY") is None
+
+    def test_entries_are_packed_into_one_store(self):
+        self._warm_cache()
+        cache_dir = os.path.join(self.root, ".pir-cache")
+        assert os.listdir(cache_dir) == [AnalysisCache.DB_FILE]
+
+    def test_unflushed_entries_are_not_persisted(self):
+        cache = AnalysisCache(self.root)
+        cache.save(self.path, "PY", PAYLOAD)
+        assert cache.load(self.path, "PY") is not None
+        assert AnalysisCache(self.root).load(self.path, "PY") is None
+
+    def test_legacy_json_cache_is_migrated(self):
+        cache = AnalysisCache(self.root)
+        h = cache.file_hash(self.path)
+        cache.close()
+        os.remove(cache.db_path)
+
+        legacy_dir = os.path.join(self.root, ".pir-cache", "v1", "py")
+        os.makedirs(legacy_dir)
+        with open(os.path.join(legacy_dir, h + ".json"), "w", encoding="utf-8") as f:
+            json.dump({"version": AnalysisCache.CACHE_VERSION, "hash": h, **PAYLOAD}, f, indent=2)
+
+        data = AnalysisCache(self.root).load(self.path, "PY")
+        assert data is not None
+        assert data["symbols"] == PAYLOAD["symbols"]
+
+    def test_get_stats_counts_entries(self):
+        cache = self._warm_cache()
+        stats = cache.get_stats()
+        assert stats["total_entries"] == 1
+        assert stats["by_language"]["py"]["entries"] == 1
+
+    def _snapshot(self, cache, children=(("main.py", "f"), ("pkg", "d"))):
+        st = os.stat(self.root)
+        cache.save_dir_snapshot("", st, time.time_ns(), list(children))
+        cache.flush()
+        return AnalysisCache(self.root)
+
+    def _age_root(self, seconds=10):
+        st = os.stat(self.root)
+        os.utime(self.root, ns=(st.st_atime_ns, st.st_mtime_ns - seconds * 10**9))
+
+    def test_dir_snapshot_round_trip(self):
+        self._age_root()
+        cache = self._snapshot(AnalysisCache(self.root))
+        children = cache.dir_snapshot("", os.stat(self.root))
+        assert children == [("main.py", "f"), ("pkg", "d")]
+        assert (cache.dir_hits, cache.dir_misses) == (1, 0)
+
+    def test_dir_snapshot_misses_after_mtime_change(self):
+        self._age_root()
+        cache = self._snapshot(AnalysisCache(self.root))
+        self._age_root(-5)
+        assert cache.dir_snapshot("", os.stat(self.root)) is None
+        assert cache.dir_snapshot("missing", os.stat(self.root)) is None
+        assert (cache.dir_hits, cache.dir_misses) == (0, 2)
+
+    def test_racy_dir_snapshot_misses(self):
+        cache = AnalysisCache(self.root)
+        st = os.stat(self.root)
+        cache.save_dir_snapshot("", st, st.st_mtime_ns, [("main.py", "f")])
+        assert cache.dir_snapshot("", st) is None
+
+    def test_retain_dir_snapshots_drops_unvisited(self):
+        self._age_root()
+        cache = AnalysisCache(self.root)
+        st = os.stat(self.root)
+        cache.save_dir_snapshot("", st, time.time_ns(), [])
+        cache.save_dir_snapshot("gone", st, time.time_ns(), [])
+        cache.flush()
+        cache.retain_dir_snapshots({""})
+        cache.flush()
+        reopened = AnalysisCache(self.root)
+        assert reopened.dir_snapshot("", st) == []
+        assert reopened.dir_snapshot("gone", st) is None
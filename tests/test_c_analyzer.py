@@ -117,8 +117,8 @@ int sizeof(int z) {
         model.finalize_dependencies()
         
         dep_items = model.dep_pool_items
-        sys_deps = [d for d in dep_items if d[1] == "include" and "sys" in dep_items]
-        
+        assert {d[1] for d in dep_items} == {"include_sys"}
+
         targets = [d[2] for d in dep_items]
         assert "[stdio.h]" in targets
         assert "[stdlib.h]" in targets
@@ -133,6 +133,7 @@ int sizeof(int z) {
         model.finalize_dependencies()
         
         dep_items = model.dep_pool_items
+        assert {d[1] for d in dep_items} == {"include"}
         targets = [d[2] for d in dep_items]
         assert "[myheader.h]" in targets
         assert "[utils/utils.h]" in targets
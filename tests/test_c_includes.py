@@ -0,0 +1,96 @@
+"""Tests for C/C++ include resolution (core/c_includes.py).
+
+Tests cover:
+- Quoted includes searching the including file's directory first
+- System includes searching the include paths only
+- Include path order and paths outside the root
+- The unique-suffix fallback for quoted includes
+- Includes resolving to header uids during a build (-I on the command line)
+"""
+
+import os
+import tempfile
+from pirgen.core.c_includes import IncludeIndex
+from pirgen.pirgen import main
+
+
+UNITS = [
+    ("u0", "kernel/main.c"),
+    ("u1", "kernel/mm.h"),
+    ("u2", "include/mm.h"),
+    ("u3", "include/sys/types.h"),
+    ("u4", "lib/list.h"),
+    ("u5", "arch/x86/list.h"),
+    ("u6", "lib/string.c"),
+]
+
+
+class TestIncludeIndex:
+    def setup_method(self):
+        self.root = tempfile.gettempdir()
+
+    def test_quoted_prefers_own_directory(self):
+        index = IncludeIndex(self.root, UNITS, ["include"])
+        assert index.resolve("mm.h", "u0") == "u1"
+        assert index.resolve("../include/mm.h", "u0") == "u2"
+        assert index.resolve("sys/types.h", "u0") == "u3"
+        assert index.resolve("mm.h", "u6") == "u2"  # via -I include
+
+    def test_system_includes_use_include_paths_only(self):
+        index = IncludeIndex(self.root, UNITS, ["include"])
+        assert index.resolve("mm.h", "u0", quoted=False) == "u2"
+        assert index.resolve("list.h", "u6", quoted=False) is None
+        assert IncludeIndex(self.root, UNITS).resolve("sys/types.h", "u0", quoted=False) is None
+
+    def test_include_path_order(self):
+        index = IncludeIndex(self.root, UNITS, ["arch/x86", "lib", os.path.join(self.root, "lib")])
+        assert index.include_dirs == ["arch/x86", "lib"]
+        assert index.resolve("list.h", "u0", quoted=False) == "u5"
+        assert IncludeIndex(self.root, UNITS, ["../elsewhere"]).include_dirs == []
+
+    def test_unique_suffix_fallback(self):
+        index = IncludeIndex(self.root, UNITS)
+        assert index.resolve("sys/types.h", "u6") == "u3"
+        assert index.resolve("x86/list.h", "u6") == "u5"
+        assert index.resolve("list.h", "u0") is None  # lib/ and arch/x86/
+        assert index.resolve("../mm.h", "u6") is None
+
+
+class TestIncludeResolution:
+    def setup_method(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self._tmp.name, "proj")
+        sources = {
+            "src/main.c": '#include <stdio.h>\n#include "util.h"\n#include <api.h>\n\nint main(void) {\n    return 0;\n}\n',
+            "src/util.h": "int util(void);\n",
+            "include/api.h": "int api(void);\n",
+        }
+        for rel, text in sources.items():
+            path = os.path.join(self.root, rel)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as f:
+                f.write(text)
+
+    def teardown_method(self):
+        self._tmp.cleanup()
+
+    def _pool(self, *extra):
+        output = os.path.join(self._tmp.name, "out.pir")
+        main([self.root, "--no-cache", "-o", output, *extra])
+        with open(output, encoding="utf-8") as f:
+            pir = f.read()
+        units = dict(
+            (line.split("|")[1], line.split("|")[0])
+            for line in pir.split("<units>\n")[1].split("\n</units>")[0].splitlines()
+        )
+        pool = pir.split("<pool>\n")[1].split("\n</pool>")[0].splitlines()
+        return units, {line.split("|", 1)[1] for line in pool}
+
+    def test_include_paths(self):
+        units, pool = self._pool()
+        assert f"include|{units['src/util.h']}" in pool
+        assert "include_sys|[api.h]" in pool
+        assert "include_sys|[stdlib:c]" in pool
+
+        units, pool = self._pool("-I", "include")
+        assert f"include_sys|{units['include/api.h']}" in pool
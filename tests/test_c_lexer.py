@@ -0,0 +1,129 @@
+"""Tests for the C/C++ function scanner (analyzers/c_lexer.py).
+
+Tests cover:
+- Comments, string literals and raw strings hiding braces and signatures
+- Function bodies and initializers skipped, namespaces and classes scanned
+- #if / #else branches with duplicated signatures
+- Template parameters, default arguments and trailing return types
+- Linear time on large generated sources
+"""
+
+import time
+from pirgen.analyzers.c_lexer import find_functions
+
+
+class TestFindFunctions:
+    def test_basic_definitions(self):
+        content = """
+static int add(int a, int b) {
+    return a + b;
+}
+
+void
+hello(void)
+{
+}
+
+int declared(int x);
+"""
+        assert find_functions(content) == ["add", "hello"]
+
+    def test_comments_and_strings_hidden(self):
+        content = """
+/* int commented(void) { } */
+// void line_comment() {
+const char *s = "int in_string() {";
+const char *r = R"x(void in_raw() { ")x";
+char c = '{';
+
+int after_literals(void) {
+    return '}';
+}
+"""
+        assert find_functions(content) == ["after_literals"]
+
+    def test_bodies_not_scanned(self):
+        content = """
+int outer(void) {
+    if (x) {
+        return y(op)->next;
+    }
+    struct { int a; } local;
+}
+
+int second(void) {
+}
+"""
+        assert find_functions(content) == ["outer", "second"]
+
+    def test_initializers_and_enums_skipped(self):
+        content = """
+static const struct ops table[] = {
+    { .open = a, .close = b },
+    { .open = c, .close = d },
+};
+
+enum color { RED, GREEN };
+
+int after_table(void) {
+}
+"""
+        assert find_functions(content) == ["after_table"]
+
+    def test_namespace_and_class_members(self):
+        content = """
+namespace app _VISIBILITY(default) {
+class Widget {
+public:
+    int width() {
+        return w;
+    }
+    Widget(int w) : w(w) {}
+};
+
+extern "C" {
+int exported(void) {
+}
+}
+}
+"""
+        assert find_functions(content) == ["width", "exported"]
+
+    def test_conditional_branches_keep_depth(self):
+        content = """
+#ifdef USE_FAST
+int run(int n) {
+#else
+int run(int n, int flags) {
+#endif
+    return n;
+}
+
+int next_func(void) {
+}
+"""
+        assert find_functions(content) == ["run", "run", "next_func"]
+
+    def test_templates_and_default_arguments(self):
+        content = """
+template <class Policy, class It>
+bool any_of(Policy&& p, It first) {
+    return false;
+}
+
+template <typename T> static constexpr T at(Size<T> = {}) {
+}
+
+auto trailing(int x) -> int {
+    return x;
+}
+"""
+        assert find_functions(content) == ["any_of", "at", "trailing"]
+
+    def test_large_generated_source_is_linear(self):
+        # Word-only lines made the former regex backtrack quadratically
+        rows = "".join("    REG_%d  FIELD_%d  MASK_%d\n" % (i, i, i) for i in range(20000))
+        content = "static const unsigned table[] = {\n" + rows + "};\n\nint f(void) {\n}\n"
+        start = time.perf_counter()
+        assert find_functions(content) == ["f"]
+        assert time.perf_counter() - start < 1.0
@@ -0,0 +1,113 @@
+"""Tests for git-index based discovery (core/git_index.py).
+
+Tests cover:
+- Parsing index versions 2-4 against `git ls-files`
+- Locating the repository from a subdirectory and via a .git file
+- Index discovery matching the directory walk (order, filters)
+- Deleted files, untracked files and the fallback to walking
+"""
+
+import os
+import shutil
+import subprocess
+import tempfile
+import pytest
+from pirgen.core.git_index import find_git_dir, read_index
+from pirgen.pirgen import (
+    iter_git_source_entries,
+    iter_project_entries,
+    iter_source_entries,
+)
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="git not installed")
+
+FILES = (
+    "top.py",
+    "a/z.rs",
+    "a/b/c.py",
+    "a-b/x.c",
+    "build/gen.c",
+    "docs/conf.py",
+    "README.md",
+)
+
+
+def _git(cwd, *args):
+    subprocess.run(
+        ["git", "-c", "user.email=t@t", "-c", "user.name=t", *args],
+        cwd=cwd,
+        check=True,
+        capture_output=True,
+    )
+
+
+class TestGitIndex:
+    def setup_method(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = os.path.realpath(self._tmp.name)
+        _git(self.root, "init", "-q")
+        for rel in FILES:
+            path = os.path.join(self.root, rel)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as f:
+                f.write("x = 1\n")
+        _git(self.root, "add", "-A")
+        _git(self.root, "commit", "-qm", "init")
+
+    def teardown_method(self):
+        self._tmp.cleanup()
+
+    def _rel(self, entries):
+        return [os.path.relpath(e.path, self.root) for e in entries]
+
+    @pytest.mark.parametrize("version", ["2", "3", "4"])
+    def test_read_index_matches_ls_files(self, version):
+        _git(self.root, "update-index", "--index-version", version)
+        listed = subprocess.run(
+            ["git", "ls-files"], cwd=self.root, capture_output=True, text=True
+        ).stdout.split()
+        entries = read_index(os.path.join(self.root, ".git"))
+        assert [e.path for e in entries] == listed
+        assert entries[0].mode == 0o100644
+
+    def test_find_git_dir(self):
+        git_dir = os.path.join(self.root, ".git")
+        assert find_git_dir(os.path.join(self.root, "a", "b")) == (git_dir, self.root)
+
+        linked = os.path.join(self.root, "a", "b")
+        with open(os.path.join(linked, ".git"), "w") as f:
+            f.write("gitdir: ../../.git\n")
+        assert find_git_dir(linked) == (git_dir, linked)
+
+    def test_matches_walk(self):
+        from_index = self._rel(iter_git_source_entries(self.root))
+        assert from_index == self._rel(iter_source_entries(self.root))
+        assert from_index == ["top.py", "a/z.rs", "a/b/c.py", "a-b/x.c"]
+
+    def test_subdirectory_root(self):
+        sub = os.path.join(self.root, "a")
+        assert [e.name for e in iter_git_source_entries(sub)] == ["z.rs", "c.py"]
+
+    def test_deleted_and_untracked_files(self):
+        os.remove(os.path.join(self.root, "a", "z.rs"))
+        with open(os.path.join(self.root, "new.py"), "w") as f:
+            f.write("")
+        tracked = self._rel(iter_project_entries(self.root, use_git_index=True))
+        assert tracked == ["top.py", "a/b/c.py", "a-b/x.c"]
+        everything = self._rel(
+            iter_project_entries(self.root, use_git_index=True, untracked=True)
+        )
+        assert everything == ["new.py", "top.py", "a/b/c.py", "a-b/x.c"]
+
+    def test_stat_is_current(self):
+        path = os.path.join(self.root, "top.py")
+        with open(path, "w") as f:
+            f.write("changed = True\n")
+        entry = next(iter_git_source_entries(self.root))
+        assert entry.stat().st_size == os.path.getsize(path)
+
+    def test_fallback_without_index(self):
+        os.remove(os.path.join(self.root, ".git", "index"))
+        assert iter_git_source_entries(self.root) is None
+        walked = self._rel(iter_project_entries(self.root, use_git_index=True))
+        assert walked == ["top.py", "a/z.rs", "a/b/c.py", "a-b/x.c"]
@@ -0,0 +1,144 @@
+"""Tests for .gitignore / .airignore handling (core/ignore_rules.py).
+
+Tests cover:
+- Pattern semantics: anchoring, **, negation, directory-only, escapes
+- Deeper ignore files overriding shallower ones
+- Pruning during the directory walk
+- Git-index discovery agreeing with the walk
+"""
+
+import os
+import shutil
+import subprocess
+import tempfile
+import pytest
+from pirgen.core.ignore_rules import IgnoreLevel, IgnoreRules, is_ignored, parse_ignore_lines
+from pirgen.pirgen import iter_git_source_entries, iter_source_entries
+
+
+def _level(text, base=""):
+    return IgnoreLevel(base, parse_ignore_lines(text.splitlines()))
+
+
+class TestPatterns:
+    def test_unanchored_name_matches_at_any_depth(self):
+        level = _level("*.gen.c\n")
+        assert level.match("x.gen.c", False)
+        assert level.match("a/b/x.gen.c", False)
+        assert level.match("a/x.c", False) is None
+
+    def test_anchored_patterns(self):
+        level = _level("/build.py\nsrc/gen.py\n")
+        assert level.match("build.py", False)
+        assert level.match("sub/build.py", False) is None
+        assert level.match("src/gen.py", False)
+        assert level.match("x/src/gen.py", False) is None
+
+    def test_star_does_not_cross_directories(self):
+        level = _level("src/*.py\n")
+        assert level.match("src/a.py", False)
+        assert level.match("src/sub/a.py", False) is None
+
+    def test_double_star(self):
+        level = _level("**/gen\nvendor/**\na/**/b.py\n")
+        assert level.match("gen", True)
+        assert level.match("x/y/gen", True)
+        assert level.match("vendor/x/y.c", False)
+        assert level.match("vendor", True) is None
+        assert level.match("a/b.py", False)
+        assert level.match("a/x/y/b.py", False)
+
+    def test_last_matching_rule_wins(self):
+        level = _level("*.py\n!keep.py\n")
+        assert level.match("drop.py", False) is True
+        assert level.match("keep.py", False) is False
+        assert _level("!keep.py\n*.py\n").match("keep.py", False) is True
+
+    def test_directory_only(self):
+        level = _level("out/\n")
+        assert level.match("out", True)
+        assert level.match("out", False) is None
+
+    def test_comments_escapes_and_brackets(self):
+        level = _level("# note\n\n\\#x.py\n\\!y.py\nf[0-9].c\nz[!a].c\ntrail.py   \n")
+        assert level.match("#x.py", False)
+        assert level.match("!y.py", False)
+        assert level.match("f7.c", False)
+        assert level.match("fa.c", False) is None
+        assert level.match("zb.c", False)
+        assert level.match("za.c", False) is None
+        assert level.match("trail.py", False)
+        assert level.match("# note", False) is None
+
+    def test_base_directory(self):
+        level = _level("/m.py\n", base="pkg/")
+        assert level.match("pkg/m.py", False)
+        assert level.match("m.py", False) is None
+
+    def test_deeper_level_overrides(self):
+        chain = (_level("*.py\n"), _level("!keep.py\n", base="a/"))
+        assert is_ignored(chain, "a/keep.py", False) is False
+        assert is_ignored(chain, "keep.py", False) is True
+        assert is_ignored(chain, "a/other.py", False) is True
+
+
+class TestIgnoreFilesInDiscovery:
+    def setup_method(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = os.path.realpath(self._tmp.name)
+        for rel in (
+            "main.py",
+            "gen.py",
+            "proto/api_pb2.py",
+            "proto/api.py",
+            "third_party/lib/x.c",
+            "pkg/keep.py",
+            "pkg/gen.py",
+        ):
+            path = os.path.join(self.root, rel)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as f:
+                f.write("")
+        self._write(".gitignore", "gen.py\n*_pb2.py\n")
+        self._write(".airignore", "third_party/\n")
+        self._write("pkg/.gitignore", "!gen.py\n")
+
+    def teardown_method(self):
+        self._tmp.cleanup()
+
+    def _write(self, rel, text):
+        with open(os.path.join(self.root, rel), "w") as f:
+            f.write(text)
+
+    def _walk(self, **kwargs):
+        return [os.path.relpath(e.path, self.root) for e in iter_source_entries(self.root, **kwargs)]
+
+    def test_walk_prunes_ignored_paths(self):
+        assert self._walk() == ["main.py", "pkg/gen.py", "pkg/keep.py", "proto/api.py"]
+
+    def test_ignore_files_can_be_disabled(self):
+        assert len(self._walk(ignore_files=False)) == 7
+
+    @pytest.mark.skipif(shutil.which("git") is None, reason="git not installed")
+    def test_subdirectory_root_sees_parent_rules(self):
+        # Inside a checkout, ignore files between the work tree top and the
+        # scanned directory apply too
+        subprocess.run(["git", "init", "-q"], cwd=self.root, check=True)
+        found = [e.name for e in iter_source_entries(os.path.join(self.root, "proto"))]
+        assert found == ["api.py"]
+
+    @pytest.mark.skipif(shutil.which("git") is None, reason="git not installed")
+    def test_git_index_discovery_agrees(self):
+        subprocess.run(["git", "init", "-q"], cwd=self.root, check=True)
+        subprocess.run(["git", "add", "-f", "-A"], cwd=self.root, check=True)
+        from_index = [
+            os.path.relpath(e.path, self.root) for e in iter_git_source_entries(self.root)
+        ]
+        assert from_index == self._walk()
+
+    def test_is_file_ignored_checks_directories(self):
+        rules = IgnoreRules(self.root)
+        assert rules.is_file_ignored("third_party/lib/x.c")
+        assert rules.is_file_ignored("proto/api_pb2.py")
+        assert not rules.is_file_ignored("pkg/gen.py")
+        assert not rules.is_file_ignored("main.py")
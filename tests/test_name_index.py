@@ -0,0 +1,66 @@
+"""Tests for the persistent name indexes (core/name_index.py).
+
+Tests cover:
+- Unique owners agreeing with ProjectModel.unique_symbol_units()
+- Owner changes reported when units are re-indexed
+- Reverse (referencing units) index maintenance
+"""
+
+from pirgen.core.name_index import NameIndex
+from pirgen.core.project_model import ProjectModel
+
+
+class TestNameIndex:
+    def setup_method(self):
+        self.index = NameIndex()
+        self.index.set_unit("u0", ["init", "run"], {"helper"})
+        self.index.set_unit("u1", ["helper", "run"], {"init"})
+        self.index.set_unit("u2", [], {"helper", "run"})
+
+    def test_unique_owner(self):
+        assert self.index.get("init") == "u0"
+        assert self.index.get("helper") == "u1"
+        assert self.index.get("run") is None  # defined twice
+        assert "run" in self.index
+        assert self.index.get("missing") is None
+
+    def test_matches_unique_symbol_units(self):
+        model = ProjectModel(name="p", root="/", profile="generic")
+        for path, names in (("a.c", ["x", "y", "y"]), ("b.c", ["z", "x"]), ("c.c", ["w"])):
+            uid = model.add_unit(path, "C")
+            for name in names:
+                model.add_symbol(name, uid, "func")
+        index = NameIndex()
+        for uid, syms in model.iter_unit_symbols():
+            index.set_unit(uid, [s.name for s in syms], ())
+        expected = model.unique_symbol_units()
+        assert {name: index.get(name) for name in expected} == expected
+
+    def test_owner_changes(self):
+        # u1 stops defining "run": u0 becomes its only owner
+        assert self.index.set_unit("u1", ["helper"], {"init"}) == {"run"}
+        assert self.index.get("run") == "u0"
+        # Re-indexing with the same names changes nothing
+        assert self.index.set_unit("u1", ["helper"], {"init"}) == set()
+        # A second definition makes "helper" ambiguous, a new name appears
+        assert self.index.set_unit("u2", ["helper", "fresh"], {"run"}) == {"helper", "fresh"}
+        assert self.index.get("helper") is None
+        # Dropping a unit's symbols removes its names
+        assert self.index.set_unit("u2", [], ()) == {"helper", "fresh"}
+        assert self.index.get("helper") == "u1"
+        assert "fresh" not in self.index
+
+    def test_duplicate_within_one_unit(self):
+        assert self.index.set_unit("u3", ["twice", "twice"], ()) == set()
+        assert self.index.get("twice") is None
+        assert self.index.set_unit("u3", ["twice"], ()) == {"twice"}
+        assert self.index.get("twice") == "u3"
+
+    def test_referencing(self):
+        assert self.index.referencing(["helper"]) == {"u0", "u2"}
+        assert self.index.referencing(["init", "run"]) == {"u1", "u2"}
+        self.index.set_unit("u2", [], {"run"})
+        assert self.index.referencing(["helper"]) == {"u0"}
+        self.index.set_unit("u0", ["init", "run"], ())
+        assert self.index.referencing(["helper"]) == set()
+        assert self.index.referencing(["nothing"]) == set()
@@ -0,0 +1,305 @@
+"""Tests for the scan pipeline in pirgen.pirgen.
+
+Tests cover:
+- Serial and --jobs scans produce identical PIR
+- Unit records round-trip through the model
+- Partial records of files with syntax errors are cached
+- Each file is read at most once per scan
+- With -o - and --jobs, stdout holds only the PIR
+- The Python outline threshold reaching serial and --jobs scans
+- scandir discovery: ordering, ignore matcher, lazy generator
+- Directory snapshots replaying unchanged directories
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import pytest
+import pirgen.pirgen as pirgen_mod
+from pirgen.pirgen import (
+    compile_ignore_matcher,
+    discover_source_files,
+    iter_source_entries,
+    scan_project,
+    resolve_dependencies,
+    sync_entry_roles,
+    analyze_file,
+    apply_record,
+)
+from pirgen.analyzers.python_analyzer import PythonAnalyzer
+from pirgen.core.analysis_cache import AnalysisCache
+from pirgen.core.dep_canon import canonicalize_dependencies
+from pirgen.core.pir_builder import PIRBuilder
+from pirgen.core.project_model import ProjectModel
+
+
+SOURCES = {
+    "main.py": "import util\n\ndef main():\n    helper()\n",
+    "util.py": "import os\n\ndef helper():\n    pass\n\nclass Box:\n    def get(self):\n        pass\n",
+    "core/mm.c": '#include <stdlib.h>\n#include "mm.h"\n\nint mm_init(void) {\n    return 0;\n}\n',
+    "core/mm.h": "int mm_init(void);\n",
+    "boot/start.s": "_start:\n    call mm_init\n    call kmain\nkmain:\n    ret\n",
+    "lib.rs": "use std::io;\n\npub fn run() {\n}\n\nstruct State {\n}\n",
+}
+
+
+def _write_project(root: str):
+    for rel, content in SOURCES.items():
+        path = os.path.join(root, rel)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+
+
+def _build_pir(root: str, **scan_kwargs) -> str:
+    model = ProjectModel(name="t", root=root, profile="generic")
+    scan_project(root, model, **scan_kwargs)
+    sync_entry_roles(model)
+    resolve_dependencies(model)
+    canonicalize_dependencies(model)
+    model.finalize_dependencies()
+    return PIRBuilder(model).build()
+
+
+class TestScanProject:
+    def setup_method(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = self._tmp.name
+        _write_project(self.root)
+
+    def teardown_method(self):
+        self._tmp.cleanup()
+
+    def test_parallel_scan_matches_serial(self):
+        serial = _build_pir(self.root, use_cache=False, jobs=1)
+        parallel = _build_pir(self.root, use_cache=False, jobs=3)
+        assert serial == parallel
+
+    def test_cached_scan_matches_uncached(self):
+        uncached = _build_pir(self.root, use_cache=False)
+        cold = _build_pir(self.root, use_cache=True)
+        warm = _build_pir(self.root, use_cache=True, jobs=2)
+        assert cold == uncached
+        assert warm == uncached
+
+    def test_scan_resolves_cross_file_calls(self):
+        pir = _build_pir(self.root, use_cache=False)
+        assert "|call|" in pir
+        assert "#mm_init" in pir
+
+    def test_analyze_file_record_round_trip(self):
+        path = os.path.join(self.root, "util.py")
+        record = analyze_file(path, "u0", self.root)
+
+        names = [s["name"] for s in record["symbols"]]
+        assert names == ["helper", "Box", "get"]
+        assert ["import_std", "[os]"] in record["deps"]
+
+        model = ProjectModel("t", self.root, "generic")
+        uid = model.add_unit("util.py", "PY")
+        apply_record(model, uid, record)
+        assert [s.name for s in model.symbols] == names
+        assert model.symbols[2].attrs == {"nested": "true"}
+
+    def _count_reads(self, monkeypatch):
+        reads = []
+        real_read = pirgen_mod.read_source_bytes
+
+        def counting_read(path):
+            reads.append(path)
+            return real_read(path)
+
+        monkeypatch.setattr(pirgen_mod, "read_source_bytes", counting_read)
+        monkeypatch.setattr(
+            AnalysisCache, "file_hash", lambda self, path: pytest.fail("unexpected re-hash")
+        )
+        return reads
+
+    def test_cold_scan_reads_each_file_once(self, monkeypatch):
+        reads = self._count_reads(monkeypatch)
+        _build_pir(self.root, use_cache=True)
+        assert len(reads) == len(SOURCES)
+        assert len(set(reads)) == len(SOURCES)
+
+    def test_warm_scan_reads_nothing(self, monkeypatch):
+        _build_pir(self.root, use_cache=True)
+        reads = self._count_reads(monkeypatch)
+        _build_pir(self.root, use_cache=True)
+        assert reads == []
+
+    def test_partial_record_is_cached(self, monkeypatch, capsys):
+        with open(os.path.join(self.root, "broken.py"), "w") as f:
+            f.write("def ok():\n    pass\n\ndef bad(:\n    pass\n")
+        model = ProjectModel(name="t", root=self.root, profile="generic")
+        scan_project(self.root, model, use_cache=True)
+        uid = model.get_uid_by_path("broken.py")
+        assert model.partial_units == {uid}
+        assert [s.name for s in model.symbols_of(uid)] == ["ok"]
+        assert "Partially analyzed (syntax errors): 1" in capsys.readouterr().out
+
+        # Unchanged: served from the cache, flag included, without a retry
+        monkeypatch.setattr(
+            PythonAnalyzer, "_analyze_regions", lambda *args: pytest.fail("re-analyzed")
+        )
+        model = ProjectModel(name="t", root=self.root, profile="generic")
+        scan_project(self.root, model, use_cache=True)
+        assert model.partial_units == {model.get_uid_by_path("broken.py")}
+
+    def test_parallel_stdout_holds_only_pir(self):
+        with open(os.path.join(self.root, "broken.py"), "w") as f:
+            f.write("def bad(:\n    pass\n")
+        # Spawned workers do not inherit the parent's stdout redirect
+        script = (
+            "import multiprocessing, sys\n"
+            "from pirgen.pirgen import main\n"
+            "multiprocessing.set_start_method('spawn')\n"
+            "main(sys.argv[1:])\n"
+        )
+        repo = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        args = [self.root, "--name", "t", "-o", "-", "-j", "2", "--no-cache"]
+        result = subprocess.run(
+            [sys.executable, "-c", script, *args],
+            capture_output=True,
+            text=True,
+            check=True,
+            env={**os.environ, "PYTHONPATH": repo},
+        )
+        assert "Syntax error" in result.stderr
+        assert "Syntax error" not in result.stdout
+        assert result.stdout == _build_pir(self.root, use_cache=False)
+
+    def test_blake2b_cache_matches_uncached(self):
+        uncached = _build_pir(self.root, use_cache=False)
+        assert _build_pir(self.root, use_cache=True, hash_name="blake2b") == uncached
+        assert _build_pir(self.root, use_cache=True, hash_name="blake2b") == uncached
+
+    def test_outline_threshold_reaches_scan(self):
+        # Tokens are fine, the AST is not: only the outline finds f
+        with open(os.path.join(self.root, "broken.py"), "w") as f:
+            f.write("def f(x y):\n    pass\n")
+
+        def symbols(**scan_kwargs):
+            model = ProjectModel(name="t", root=self.root, profile="generic")
+            scan_project(self.root, model, **scan_kwargs)
+            return [s.name for s in model.symbols_of(model.get_uid_by_path("broken.py"))]
+
+        assert symbols(use_cache=True) == []
+        assert symbols(use_cache=False, py_outline_threshold=1) == ["f"]
+        assert symbols(use_cache=True, jobs=2, py_outline_threshold=1) == ["f"]
+        # Cached records of either threshold are kept apart
+        assert symbols(use_cache=True, py_outline_threshold=1) == ["f"]
+        assert symbols(use_cache=True) == []
+
+    def test_outline_threshold_option(self):
+        def threshold(*argv):
+            return pirgen_mod.build_parser().parse_args([".", *argv]).py_outline_threshold
+
+        assert threshold() == PythonAnalyzer.OUTLINE_THRESHOLD
+        assert threshold("--py-outline-threshold", "4096") == 4096
+        assert threshold("--py-outline-threshold", "0") is None
+        assert threshold("--py-outline-threshold", "none") is None
+
+    def test_analyzer_uses_given_buffer(self):
+        model = ProjectModel("t", self.root, "generic")
+        uid = model.add_unit("virtual.py", "PY")
+        missing = os.path.join(self.root, "does_not_exist.py")
+        PythonAnalyzer().analyze(missing, uid, model, b"def run():\r\n    pass\r\n")
+        assert [s.name for s in model.symbols] == ["run"]
+
+
+class TestDiscovery:
+    def setup_method(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = self._tmp.name
+        for rel in (
+            "b.py",
+            "a.c",
+            "notes.txt",
+            "pkg/z.rs",
+            "pkg/sub/m.S",
+            "build/gen.c",
+            "vendor_x/lib.c",
+            "__pycache__/a.py",
+        ):
+            path = os.path.join(self.root, rel)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            open(path, "w").close()
+
+    def teardown_method(self):
+        self._tmp.cleanup()
+
+    def _rel(self, paths):
+        return [os.path.relpath(p, self.root) for p in paths]
+
+    def test_sorted_files_before_subdirectories(self):
+        found = self._rel(discover_source_files(self.root))
+        assert found == ["a.c", "b.py", "pkg/z.rs", "pkg/sub/m.S", "vendor_x/lib.c"]
+
+    def test_user_patterns(self, monkeypatch):
+        monkeypatch.setattr(pirgen_mod, "USER_IGNORED", {"vendor_*", "sub"})
+        found = self._rel(discover_source_files(self.root))
+        assert found == ["a.c", "b.py", "pkg/z.rs"]
+
+    def test_discovery_is_lazy(self):
+        entries = iter_source_entries(self.root)
+        first = next(entries)
+        assert first.name == "a.c"
+        assert first.stat().st_size == 0
+
+    def test_symlinked_directories_are_not_followed(self):
+        os.symlink(os.path.join(self.root, "pkg"), os.path.join(self.root, "link"))
+        assert "link/z.rs" not in self._rel(discover_source_files(self.root))
+
+    def test_ignore_matcher(self):
+        match = compile_ignore_matcher({"build", "a.b"}, {"gen*"}).match
+        assert match("build")
+        assert match("generated")
+        assert match("a.b")
+        assert not match("axb")
+        assert not match("builder")
+        assert not compile_ignore_matcher(set(), ()).match("x")
+
+    def _age_tree(self):
+        old = os.stat(self.root).st_mtime_ns - 10**10
+        for dirpath, dirnames, _ in os.walk(self.root):
+            os.utime(dirpath, ns=(old, old))
+
+    def test_unchanged_directories_are_replayed(self, monkeypatch):
+        cache = AnalysisCache(self.root)
+        self._age_tree()
+        first = self._rel(e.path for e in iter_source_entries(self.root, snapshots=cache))
+        assert cache.dir_hits == 0
+        cache.close()
+
+        cache = AnalysisCache(self.root)
+        monkeypatch.setattr(
+            pirgen_mod.os, "scandir", lambda path: pytest.fail(f"listed {path}")
+        )
+        replayed = self._rel(e.path for e in iter_source_entries(self.root, snapshots=cache))
+        assert replayed == first
+        assert cache.dir_misses == 0
+        assert cache.dir_hits > 0
+
+    def test_changed_directory_is_listed_again(self):
+        cache = AnalysisCache(self.root)
+        self._age_tree()
+        list(iter_source_entries(self.root, snapshots=cache))
+        cache.close()
+
+        open(os.path.join(self.root, "pkg", "new.py"), "w").close()
+        cache = AnalysisCache(self.root)
+        found = self._rel(e.path for e in iter_source_entries(self.root, snapshots=cache))
+        assert "pkg/new.py" in found
+        assert cache.dir_misses == 1
+
+    def test_filters_apply_to_replayed_listings(self, monkeypatch):
+        cache = AnalysisCache(self.root)
+        self._age_tree()
+        list(iter_source_entries(self.root, snapshots=cache))
+        cache.close()
+
+        monkeypatch.setattr(pirgen_mod, "USER_IGNORED", {"pkg"})
+        cache = AnalysisCache(self.root)
+        found = self._rel(e.path for e in iter_source_entries(self.root, snapshots=cache))
+        assert found == ["a.c", "b.py", "vendor_x/lib.c"]
@@ -0,0 +1,175 @@
+"""Tests for ProjectModel.
+
+Tests cover:
+- Per-unit symbol index kept by add_symbol
+- Entry unit tracking
+- Ordered, deduplicated dependency storage
+- Interned integer dependency keys
+- Slotted Symbol with flag-backed attrs mapping
+- PIR <syms> output grouped by unit
+- Streaming PIRBuilder.write matching build()
+- Columnar symbol backend matching the object backend
+"""
+
+import io
+import pytest
+from pirgen.core.project_model import ProjectModel, Symbol, SYMBOL_FLAGS
+from pirgen.core.pir_builder import PIRBuilder
+
+
+class TestProjectModel:
+    def setup_method(self):
+        self.model = ProjectModel("test", "/tmp", "generic")
+        self.u0 = self.model.add_unit("a.py", "PY")
+        self.u1 = self.model.add_unit("b.py", "PY")
+
+    def test_symbols_of_returns_unit_symbols(self):
+        self.model.add_symbol("f", self.u0, "func")
+        self.model.add_symbol("g", self.u1, "func")
+        self.model.add_symbol("h", self.u0, "class")
+
+        assert [s.name for s in self.model.symbols_of(self.u0)] == ["f", "h"]
+        assert [s.name for s in self.model.symbols_of(self.u1)] == ["g"]
+        assert self.model.symbols_of("u99") == []
+        assert len(self.model.symbols) == 3
+
+    def test_entry_unit_uids(self):
+        self.model.add_symbol("helper", self.u0, "func")
+        self.model.add_symbol("main", self.u1, "func", entry="true")
+        assert self.model.entry_unit_uids() == {self.u1}
+
+    def test_builder_emits_symbols_per_unit(self):
+        self.model.add_symbol("f", self.u0, "func")
+        self.model.add_symbol("main", self.u1, "func", entry="true")
+        self.model.finalize_dependencies()
+
+        pir = PIRBuilder(self.model).build()
+        assert "f|u0|func\nmain|u1|func|entry\n</syms>" in pir
+
+    def test_dependencies_keep_first_seen_order_without_duplicates(self):
+        for target in ["[b]", "[a]", "[b]", "[c]", "[a]"]:
+            self.model.add_dependency(self.u0, "call", target)
+        self.model.finalize_dependencies()
+
+        pool = {did: target for did, _, target in self.model.dep_pool_items}
+        assert [pool[d] for d in self.model.dep_refs[self.u0]] == ["[b]", "[a]", "[c]"]
+
+    def test_many_dependencies_are_deduplicated(self):
+        for i in range(20000):
+            self.model.add_dependency(self.u0, "call", f"[f{i % 500}]")
+        self.model.finalize_dependencies()
+        assert len(self.model.dep_refs[self.u0]) == 500
+
+    def test_dependency_targets_are_interned(self):
+        self.model.add_dependency(self.u0, "import_std", "[os]")
+        self.model.add_dependency(self.u1, "import_std", "[os]")
+        self.model.add_dependency(self.u1, "call", "[os]")
+
+        assert len(self.model._targets) == 1
+        assert len(self.model._all_dep_keys) == 2
+        assert list(self.model.iter_dependencies(self.u1)) == [
+            ("import_std", "[os]"),
+            ("call", "[os]"),
+        ]
+
+    def test_pool_is_sorted_by_verb_then_target(self):
+        self.model.add_dependency(self.u0, "use", "[a]")
+        self.model.add_dependency(self.u0, "import_std", "[z]")
+        self.model.add_dependency(self.u0, "import", "[z]")
+        self.model.add_dependency(self.u0, "call", "u1#x")
+        self.model.finalize_dependencies()
+
+        assert self.model.dep_pool_items == [
+            ("d0", "call", "u1#x"),
+            ("d1", "import", "[z]"),
+            ("d2", "import_std", "[z]"),
+            ("d3", "use", "[a]"),
+        ]
+
+    def test_symbol_boolean_attrs_become_flags(self):
+        sym = Symbol("main", "u0", "func", {"entry": "true", "nested": "true"})
+        assert sym.flags == SYMBOL_FLAGS["entry"] | SYMBOL_FLAGS["nested"]
+        assert sym.extra is None
+        assert sym.attrs == {"entry": "true", "nested": "true"}
+        assert sym.attrs.get("entry") == "true"
+        assert sym.attrs.get("missing") is None
+        assert not hasattr(sym, "__dict__")
+
+    def test_symbol_keeps_other_attrs(self):
+        sym = Symbol("f", "u0", "func", {"entry": "false", "abi": "C"})
+        assert sym.flags == 0
+        assert dict(sym.attrs) == {"entry": "false", "abi": "C"}
+
+    def test_symbol_kind_is_interned(self):
+        a = Symbol("a", "u0", "".join(["fu", "nc"]))
+        b = Symbol("b", "u0", "".join(["f", "unc"]))
+        assert a.kind is b.kind
+
+    def test_builder_prints_only_true_attrs(self):
+        self.model.add_symbol("f", self.u0, "func", nested="true", entry="true")
+        self.model.add_symbol("g", self.u0, "func", abi="C")
+        self.model.finalize_dependencies()
+
+        pir = PIRBuilder(self.model).build()
+        assert "f|u0|func|entry|nested\n" in pir
+        assert "g|u0|func|\n" in pir
+
+    def test_write_streams_same_output_as_build(self):
+        self.model.add_symbol("f", self.u0, "func", entry="true")
+        self.model.add_dependency(self.u0, "import", "[os]")
+        self.model.finalize_dependencies()
+
+        out = io.StringIO()
+        PIRBuilder(self.model).write(out)
+        assert out.getvalue() == PIRBuilder(self.model).build()
+        assert out.getvalue().startswith("<pir>\n<meta>\n")
+        assert out.getvalue().endswith("</syms>\n</pir>")
+
+    def test_empty_sections_leave_blank_lines(self):
+        self.model.finalize_dependencies()
+        pir = PIRBuilder(self.model).build()
+        assert pir.endswith("</units>\n\n\n\n</pir>")
+
+    def test_write_requires_finalized_dependencies(self):
+        with pytest.raises(RuntimeError):
+            PIRBuilder(self.model).write(io.StringIO())
+
+
+class TestColumnarSymbols:
+    def _fill(self, model):
+        u0 = model.add_unit("a.py", "PY")
+        u1 = model.add_unit("b.py", "PY")
+        model.add_symbol("main", u0, "func", entry="true")
+        model.add_symbol("Box", u1, "class")
+        model.add_symbol("get", u1, "func", nested="true", abi="C")
+        model.add_symbol("helper", u0, "func")
+        model.add_symbol("get", u0, "func")
+        model.finalize_dependencies()
+        return model
+
+    def setup_method(self):
+        self.objects = self._fill(ProjectModel("t", "/tmp", "generic"))
+        self.columns = self._fill(ProjectModel("t", "/tmp", "generic", columnar=True))
+
+    def test_sequence_matches_object_backend(self):
+        assert len(self.columns.symbols) == len(self.objects.symbols)
+        assert list(self.columns.symbols) == self.objects.symbols
+        assert self.columns.symbols[-1] == self.objects.symbols[-1]
+        with pytest.raises(IndexError):
+            self.columns.symbols[5]
+
+    def test_unit_views_match_object_backend(self):
+        assert self.columns.symbols_of("u0") == self.objects.symbols_of("u0")
+        assert self.columns.symbols_of("u9") == []
+        assert list(self.columns.iter_symbol_rows()) == list(self.objects.iter_symbol_rows())
+        assert self.columns.entry_unit_uids() == {"u0"}
+
+    def test_unique_symbol_units(self):
+        index = self.columns.unique_symbol_units()
+        assert index.get("helper") == "u0"
+        assert index.get("Box") == "u1"
+        assert index.get("get") is None
+        assert index == self.objects.unique_symbol_units()
+
+    def test_builder_output_is_identical(self):
+        assert PIRBuilder(self.columns).build() == PIRBuilder(self.objects).build()
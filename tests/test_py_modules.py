@@ -0,0 +1,137 @@
+"""Tests for the Python module-path index (core/py_modules.py).
+
+Tests cover:
+- Module names from ``__init__.py`` package chains
+- Relative imports applied to the importing unit's package
+- Ambiguous names staying unresolved
+- src layouts declared in pyproject.toml, setup.cfg and setup.py
+- Import targets resolving to module uids during a scan
+"""
+
+import os
+import tempfile
+import pytest
+from pirgen.core import py_modules
+from pirgen.core.pir_builder import PIRBuilder
+from pirgen.core.project_model import ProjectModel
+from pirgen.core.py_modules import PythonModuleIndex, declared_source_roots
+from pirgen.pirgen import scan_project, resolve_dependencies
+
+
+class TestPythonModuleIndex:
+    def setup_method(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = self._tmp.name
+
+    def teardown_method(self):
+        self._tmp.cleanup()
+
+    def _write(self, rel, text=""):
+        path = os.path.join(self.root, rel)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+
+    def _index(self, paths):
+        return PythonModuleIndex(self.root, [(f"u{i}", p) for i, p in enumerate(paths)])
+
+    def test_package_chain(self):
+        index = self._index(["app/__init__.py", "app/core/__init__.py", "app/core/db.py", "run.py"])
+        assert index.resolve("app") == "u0"
+        assert index.resolve("app.core") == "u1"
+        assert index.resolve("app.core.db") == "u2"
+        assert index.resolve("run") == "u3"
+        assert index.resolve("core.db") is None
+        assert index.package_of("u2") == "app.core"
+        assert index.package_of("u1") == "app.core"
+
+    def test_relative_imports(self):
+        index = self._index(["app/__init__.py", "app/core/__init__.py", "app/core/db.py", "app/util.py"])
+        assert index.resolve(".db", "u2") == "u2"
+        assert index.resolve(".", "u2") == "u1"
+        assert index.resolve("..util", "u2") == "u3"
+        assert index.resolve("..", "u2") == "u0"
+        assert index.resolve("...x", "u2") is None
+        assert index.resolve(".util", "u3") == "u3"
+
+    def test_relative_import_beyond_top_level_package(self):
+        index = self._index(["app/__init__.py", "app/mod.py", "x.py"])
+        # Python raises ImportError for these; they must not bind to x.py
+        assert index.resolve("..x", "u1") is None
+        assert index.resolve("..", "u0") is None
+        assert index.resolve(".x", "u2") is None
+        assert index.resolve(".", "u1") == "u0"
+
+    def test_ambiguous_names(self):
+        index = self._index(["a/util.py", "util.py", "b/util.py"])
+        # The root-level module wins over the fallback names of a/ and b/
+        assert index.resolve("util") == "u1"
+        assert index.resolve("a.util") == "u0"
+        # Two packages claiming one name resolve to neither
+        index = self._index(["q/p/__init__.py", "q/p/x.py", "r/p/__init__.py", "r/p/x.py"])
+        assert index.resolve("p") is None
+        assert index.resolve("p.x") is None
+        assert index.resolve("q.p.x") == "u1"
+
+    @pytest.mark.skipif(py_modules.tomllib is None, reason="tomllib needs Python 3.11")
+    def test_pyproject_src_layout(self):
+        self._write("pyproject.toml", '[tool.setuptools.packages.find]\nwhere = ["src"]\n')
+        index = self._index(["src/pkg/__init__.py", "src/pkg/mod.py", "src/nsp/part.py"])
+        assert declared_source_roots(self.root) == [os.path.join(self.root, "src")]
+        assert index.resolve("pkg.mod") == "u1"
+        assert index.resolve("nsp.part") == "u2"  # namespace package below the root
+        assert index.resolve("src.nsp.part") == "u2"
+
+    def test_setup_cfg_and_setup_py(self):
+        self._write("one/setup.cfg", "[options]\npackage_dir =\n    =lib\n")
+        self._write("two/setup.py", 'from setuptools import setup, find_packages\nsetup(packages=find_packages("src"))\n')
+        assert declared_source_roots(os.path.join(self.root, "one")) == [
+            os.path.join(self.root, "one", "lib")
+        ]
+        assert declared_source_roots(os.path.join(self.root, "two")) == [
+            os.path.join(self.root, "two", "src")
+        ]
+        index = self._index(["one/lib/alpha/core.py", "two/src/beta/__init__.py", "two/src/beta/x.py"])
+        assert index.resolve("alpha.core") == "u0"
+        assert index.resolve("beta.x") == "u2"
+
+    def test_root_inside_package(self):
+        self._write("outer/__init__.py")
+        self._write("outer/inner/__init__.py")
+        self.root = os.path.join(self.root, "outer", "inner")
+        index = self._index(["__init__.py", "mod.py"])
+        assert index.resolve("outer.inner.mod") == "u1"
+        assert index.package_of("u1") == "outer.inner"
+
+
+class TestImportResolution:
+    def setup_method(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = self._tmp.name
+        sources = {
+            "app/__init__.py": "",
+            "app/models.py": "class User:\n    pass\n",
+            "app/views.py": "from . import models\nfrom .models import User\nimport app.models\nimport os\n",
+        }
+        for rel, text in sources.items():
+            path = os.path.join(self.root, rel)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as f:
+                f.write(text)
+
+    def teardown_method(self):
+        self._tmp.cleanup()
+
+    def test_imports_resolve_to_units(self):
+        model = ProjectModel(name="t", root=self.root, profile="generic")
+        scan_project(self.root, model, use_cache=False)
+        resolve_dependencies(model)
+        uid_of = {u.path: u.uid for u in model.units}
+        models_uid = uid_of[os.path.join("app", "models.py")]
+        targets = {t for _, t in model.iter_dependencies(uid_of[os.path.join("app", "views.py")])}
+        assert models_uid in targets
+        assert "[app.models]" not in targets and "[.models]" not in targets
+        assert "[os]" in targets
+
+        model.finalize_dependencies()
+        assert f"|{models_uid}\n" in PIRBuilder(model).build()
@@ -0,0 +1,122 @@
+"""Tests for the token outline of Python modules (analyzers/py_outline.py).
+
+Tests cover:
+- Same symbols and imports as the AST pass, in the same order
+- Same-line bodies, soft keywords and TYPE_CHECKING branches
+- Falling back to the AST for ambiguous tests and tokenizer errors
+- Selecting the outline by file size
+- Splitting broken modules into regions
+"""
+
+from pirgen.analyzers.py_outline import outline, split_regions
+from pirgen.analyzers.python_analyzer import PythonAnalyzer
+from pirgen.core.project_model import ProjectModel
+
+
+SOURCE = '''
+"""def in_docstring(): pass"""
+import os.path as osp, json
+from . import sibling
+from ..pkg.mod import (a,
+                       b)
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+elif typing.TYPE_CHECKING: import typed
+else:
+    import fallback
+
+@decorator
+class Service(Base, metaclass=Meta):
+    x: int = 1; import inline_import
+
+    class _Hidden:
+        def method(self) -> Dict[str, int]:
+            match = 1
+            return match
+
+    async def fetch(self):
+        try: import lazy
+        except ImportError: pass
+
+class _Private:
+    def skipped(self):
+        pass
+
+if sys.version_info >= (3, 8):
+    def conditional():
+        pass
+
+def main():
+    text = f"{x!r:>{width}}"
+    return lambda: 0
+
+async def _helper(): pass
+'''
+
+
+def _analyze(source: str, threshold):
+    model = ProjectModel("test", "/tmp", "py")
+    uid = model.add_unit("/tmp/mod.py", "Python", "src")
+    PythonAnalyzer(threshold).analyze("/tmp/mod.py", uid, model, source.encode())
+    symbols = [(s.name, s.kind, sorted(s.attrs)) for s in model.symbols]
+    deps = [(model.dep_verb(k), model.dep_target(k)) for k in model._unit_dep_keys.get(uid, {})]
+    return symbols, deps
+
+
+class TestOutline:
+    def test_matches_ast_pass(self):
+        symbols, deps = _analyze(SOURCE, 0)
+        assert (symbols, deps) == _analyze(SOURCE, None)
+        assert [name for name, _, _ in symbols] == ["Service", "method", "fetch", "main"]
+        assert ("import_type_checking", "[typed]") in deps
+        assert ("import_external", "[fallback]") in deps
+        assert ("import_relative", "[..pkg.mod]") in deps
+        assert ("import_external", "[lazy]") in deps
+
+    def test_outline_records(self):
+        symbols, imports = outline("import a.b as c, d\nfrom ... import e\ndef main(): import f\n")
+        assert symbols == [("main", "func", False)]
+        assert imports == [("a.b", 0, False), ("d", 0, False), ("", 3, False), ("f", 0, False)]
+
+    def test_ambiguous_and_broken_sources_need_ast(self):
+        assert outline("if (TYPE_CHECKING):\n    import x\n") is None
+        assert outline("def f(x y):\n    pass\n") is not None  # tokens are fine
+        assert outline("x = (\n") is None
+        assert outline("if x:\n        a = 1\n    b = 2\n") is None
+
+    def test_threshold_selects_outline(self):
+        source = "if (TYPE_CHECKING):\n    import x\n"
+        # An ambiguous file falls back to the AST at any threshold
+        assert _analyze(source, 0)[1] == [("import_type_checking", "[x]")]
+        # Below the threshold the outline is not used at all
+        broken = "def f(x y):\n    pass\n"
+        assert _analyze(broken, len(broken) + 1) == ([], [])
+        assert _analyze(broken, len(broken))[0] == [("f", "func", [])]
+
+
+class TestSplitRegions:
+    def test_regions_cover_source(self):
+        source = "import os\nx = 1\n@a\n@b\ndef f():\n    s = \"\"\"\ndef not_here(): pass\n\"\"\"\nclass C:\n    def m(self): pass\n"
+        regions = split_regions(source)
+        assert "".join(regions) == source
+        assert regions == [
+            "import os\nx = 1\n",
+            "@a\n@b\ndef f():\n    s = \"\"\"\ndef not_here(): pass\n\"\"\"\n",
+            "class C:\n    def m(self): pass\n",
+        ]
+
+    def test_recovers_after_tokenizer_errors(self):
+        source = (
+            "x = f(\n"
+            "def a(): pass\n"
+            "class B:\n"
+            "        pass\n"
+            "    bad = 1\n"
+            "def c(): pass\n"
+            "s = \"\"\"open\n"
+            "def d(): pass\n"
+        )
+        starts = [region.split("\n", 1)[0] for region in split_regions(source)]
+        assert starts == ["x = f(", "def a(): pass", "class B:", "def c(): pass", "def d(): pass"]
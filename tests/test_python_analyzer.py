@@ -310,4 +310,73 @@ if __name__ == "__main__":
 """
         model = self._analyze_file(content)
         symbols = [s.name for s in model.symbols]
-        assert len(symbols) == 0
\ No newline at end of file
+        assert len(symbols) == 0
+    def test_nested_symbols_in_source_order(self):
+        content = """
+class Outer:
+    class _Hidden:
+        def kept(self):
+            pass
+
+    def later(self):
+        pass
+
+class _Private:
+    def skipped(self):
+        pass
+
+if True:
+    def conditional():
+        pass
+"""
+        model = self._analyze_file(content)
+        names = [(s.name, s.attrs.get("nested")) for s in model.symbols]
+        assert names == [("Outer", None), ("kept", "true"), ("later", "true")]
+
+    def test_imports_at_any_depth(self):
+        content = """
+import typing
+
+if typing.TYPE_CHECKING:
+    import checked
+else:
+    import fallback
+
+class Loader:
+    def load(self):
+        try:
+            from .plugins import registry
+        except ImportError:
+            import json
+"""
+        model = self._analyze_file(content)
+        model.finalize_dependencies()
+
+        kinds = {d[2]: d[1] for d in model.dep_pool_items}
+        assert kinds["[checked]"] == "import_type_checking"
+        assert kinds["[fallback]"] == "import_external"
+        assert kinds["[.plugins]"] == "import_relative"
+        assert kinds["[json]"] == "import_external"
+
+    def test_syntax_error_salvages_valid_regions(self):
+        content = """
+import os
+from .broken import (
+
+@decorated
+def kept():
+    pass
+
+def broken(:
+    pass
+
+class Also:
+    def method(self):
+        pass
+"""
+        model = self._analyze_file(content)
+        assert [s.name for s in model.symbols] == ["kept", "Also", "method"]
+        assert model.partial_units == {"u0"}
+
+        model.finalize_dependencies()
+        assert ("import_std", "[os]") in [d[1:] for d in model.dep_pool_items]
@@ -5,6 +5,7 @@ Tests cover:
 - Generic functions
 - impl blocks (impl Struct and impl Trait for Struct)
 - Complex use paths and grouping
+- Item modifiers, multi-line use trees and items inside comments
 """
 
 import tempfile
@@ -310,8 +311,10 @@ use std::io::{Read, Write, BufReader};
         dep_items = model.dep_pool_items
         targets = [d[2] for d in dep_items]
         
-        assert "[std::collections::{HashMap, HashSet, VecDeque}]" in targets
-        assert "[std::io::{Read, Write, BufReader}]" in targets
+        assert "[std::collections::HashMap]" in targets
+        assert "[std::collections::VecDeque]" in targets
+        assert "[std::io::BufReader]" in targets
+        assert not any("{" in t for t in targets)
 
     def test_use_complex_path(self):
         content = """
@@ -396,4 +399,48 @@ fn implemented_function() {
         symbols = [s.name for s in model.symbols]
         
         assert "declared_function" not in symbols
-        assert "implemented_function" in symbols
\ No newline at end of file
+        assert "implemented_function" in symbols
+
+    def test_modifiers_and_symbol_order(self):
+        content = """
+pub(crate) struct Engine;
+
+impl Engine {
+    pub const fn new() -> Self {
+        Engine
+    }
+}
+
+pub extern "C" fn engine_start() -> i32 {
+    0
+}
+
+/* pub fn commented_out() {} */
+unsafe fn main() {
+}
+"""
+        model = self._analyze_file(content)
+        symbols = [(s.name, s.kind) for s in model.symbols]
+
+        # Grouped by kind: functions, then types, then impls
+        assert symbols == [
+            ("new", "func"), ("engine_start", "func"), ("main", "func"),
+            ("Engine", "struct"), ("Engine", "impl"),
+        ]
+        assert model.symbols[2].attrs.get("entry") == "true"
+
+    def test_use_tree_across_lines(self):
+        content = """
+use crate::{
+    model::{Unit, Symbol},  // items; grouped
+    util::*,
+};
+// use commented::Out;
+"""
+        model = self._analyze_file(content)
+        model.finalize_dependencies()
+
+        targets = [d[2] for d in model.dep_pool_items]
+        assert sorted(targets) == [
+            "[crate::model::Symbol]", "[crate::model::Unit]", "[crate::util::*]",
+        ]
@@ -0,0 +1,126 @@
+"""Tests for the single-pass Rust item scanner (analyzers/rust_lexer.py).
+
+Tests cover:
+- Nested block comments, raw strings and char literals hiding items
+- Lifetimes not taken for character literals
+- pub(crate) / const / async / unsafe / extern "C" modifiers and attributes
+- Multi-line use trees and mod declarations
+- impl headers with generics, paths, references and where clauses
+- Linear time on large generated sources and long lines
+"""
+
+import time
+from pirgen.analyzers.rust_lexer import scan_items
+
+
+class TestScanItems:
+    def test_comments_and_literals_hidden(self):
+        content = r'''
+/* outer /* nested */ fn in_comment() { } */
+// fn line_comment() {
+/// ```
+/// use doc::example;
+/// ```
+const RAW: &str = r#"fn in_raw() { "quoted" }"#;
+const BYTES: &[u8] = b"struct InBytes;";
+const QUOTE: char = '"';
+const ESCAPED: char = '\'';
+
+fn after_literals<'a>(s: &'a str) -> &'a str {
+    'outer: loop { break 'outer; }
+    s
+}
+'''
+        items = scan_items(content)
+        assert items.functions == ["after_literals"]
+        assert items.types == []
+        assert items.uses == []
+
+    def test_modifiers_and_attributes(self):
+        content = """
+pub(crate) fn crate_visible() {}
+pub(in crate::mm) const fn constant() -> u32 { 0 }
+pub async unsafe fn dangerous() {}
+pub extern "C" fn exported(x: i32) -> i32 { x }
+extern "system" fn callback() {}
+#[inline] fn inlined() {}
+let pointer: fn(u8) -> u8 = id;
+fn returns_impl() -> impl Iterator<Item = u8> { todo!() }
+"""
+        assert scan_items(content).functions == [
+            "crate_visible", "constant", "dangerous", "exported", "callback",
+            "inlined", "returns_impl",
+        ]
+
+    def test_declarations_without_body(self):
+        content = """
+trait Codec {
+    fn encode(&self) -> [u8; 4];
+    fn decode(bytes: [u8; 4]) -> Self where Self: Sized;
+    fn name(&self) -> &str {
+        "codec"
+    }
+}
+
+extern "C" {
+    fn abort() -> !;
+}
+
+weak! { fn mlock2(addr: *const u8) -> i32 }
+fn after_macro(pattern: &str = r"{0,5}") -> bool {
+}
+"""
+        items = scan_items(content)
+        assert items.functions == ["name", "after_macro"]
+        assert items.types == [("trait", "Codec")]
+
+    def test_use_trees_and_mods(self):
+        content = """
+pub(crate) use crate::{
+    model::{Unit, Symbol},  // grouped; across lines
+    util::*,
+};
+use std::io;
+mod inline { }
+pub mod child;
+mod r#ref;
+"""
+        items = scan_items(content)
+        assert [tree.split() for tree in items.uses] == [
+            ["crate::{", "model::{Unit,", "Symbol},", "//", "grouped;", "across", "lines",
+             "util::*,", "}"],
+            ["std::io"],
+        ]
+        assert items.mods == ["child", "ref"]
+
+    def test_impl_headers(self):
+        content = """
+impl Plain {}
+impl<'a, T: Clone> Wrapper<'a, T> {}
+impl fmt::Display for crate::model::Unit {}
+unsafe impl<T: Send> Send for Queue<T> where T: for<'b> Fn(&'b u8) {}
+impl<'a> From<&'a str> for &'a mut Buffer {}
+impl<T: Display> ToString for T {}
+impl<const N: usize> Default for [u8; N] {}
+impl dyn Any {}
+"""
+        assert scan_items(content).impls == [
+            "Plain", "Wrapper", "Unit", "Queue", "Buffer", "Any",
+        ]
+
+    def test_large_generated_source_is_linear(self):
+        rows = "".join("    ENTRY_%d, // fn not_here() {\n" % i for i in range(50000))
+        content = "static TABLE: &[u32] = &[\n" + rows + "];\n\nfn f() {\n}\n"
+        start = time.perf_counter()
+        assert scan_items(content).functions == ["f"]
+        assert time.perf_counter() - start < 1.0
+
+    def test_long_lines_are_linear(self):
+        # Attributes and keywords repeated on one line: each line prefix
+        # is matched once, without backtracking between attributes
+        attributes = "#[a]" * 20000
+        assert scan_items(attributes + " fn f() {}\n").functions == ["f"]
+        keywords = "fn a() {} " * 100000 + "\n" + attributes + " x fn g() {}\n"
+        start = time.perf_counter()
+        assert scan_items(keywords).functions == ["a"]
+        assert time.perf_counter() - start < 1.0
@@ -0,0 +1,130 @@
+"""Tests for Rust module trees (core/rust_modules.py).
+
+Tests cover:
+- Expanding grouped, nested and aliased use trees
+- Module paths from lib.rs / main.rs / mod.rs / foo.rs layouts
+- crate::, self::, super:: and uniform paths resolving to units
+- mod items and use paths resolving to uids during a build
+"""
+
+import os
+import tempfile
+from pirgen.core.rust_modules import RustModuleIndex, expand_use_tree
+from pirgen.pirgen import main
+
+
+UNITS = [
+    ("u0", "kernel/src/lib.rs"),
+    ("u1", "kernel/src/mm/mod.rs"),
+    ("u2", "kernel/src/mm/alloc.rs"),
+    ("u3", "kernel/src/sched.rs"),
+    ("u4", "kernel/src/sched/task.rs"),
+    ("u5", "kernel/src/main.rs"),
+    ("u6", "tools/src/main.rs"),
+    ("u7", "tools/src/cli.rs"),
+    ("u8", "stray.rs"),
+]
+
+
+class TestExpandUseTree:
+    def test_simple_and_grouped(self):
+        assert expand_use_tree("crate::mm::Frame") == ["crate::mm::Frame"]
+        assert expand_use_tree("crate::mm::{alloc, free}") == ["crate::mm::alloc", "crate::mm::free"]
+
+    def test_nested_self_alias_glob(self):
+        tree = """std::{
+            io::{self, Read as R},  // reading
+            collections::*,
+            fmt
+        }"""
+        assert expand_use_tree(tree) == ["std::io", "std::io::Read", "std::collections::*", "std::fmt"]
+
+    def test_duplicates_and_empty_items(self):
+        assert expand_use_tree("a::{b, b, }") == ["a::b"]
+
+
+class TestRustModuleIndex:
+    def setup_method(self):
+        self.index = RustModuleIndex(UNITS)
+
+    def test_module_paths(self):
+        assert self.index.module_of("u0") == ("kernel/src", ())
+        assert self.index.module_of("u1") == ("kernel/src", ("mm",))
+        assert self.index.module_of("u2") == ("kernel/src", ("mm", "alloc"))
+        assert self.index.module_of("u4") == ("kernel/src", ("sched", "task"))
+        assert self.index.module_of("u7") == ("tools/src", ("cli",))
+        assert self.index.module_of("u8") is None
+        assert len(self.index) == 8
+
+    def test_crate_paths(self):
+        assert self.index.resolve("crate::mm::alloc::Frame", "u3") == "u2"
+        assert self.index.resolve("crate::mm::Zone", "u3") == "u1"
+        assert self.index.resolve("crate::Kernel", "u3") == "u0"
+        assert self.index.resolve("crate::mm::*", "u4") == "u1"
+        assert self.index.resolve("crate::cli::run", "u6") == "u7"
+        # No such module file: an (inline) item of the crate root
+        assert self.index.resolve("crate::cli::run", "u3") == "u0"
+        assert self.index.resolve("crate::Config", "u7") == "u6"
+        # main.rs next to lib.rs is its own crate root
+        assert self.index.resolve("crate::Kernel", "u1") == "u0"
+        assert self.index.resolve("crate::mm", "u5") == "u1"
+
+    def test_relative_paths(self):
+        assert self.index.resolve("self::alloc::Frame", "u1") == "u2"
+        assert self.index.resolve("super::mm::alloc", "u3") == "u2"
+        assert self.index.resolve("super::super::sched", "u4") == "u3"
+        assert self.index.resolve("super::Task", "u4") == "u3"
+        assert self.index.resolve("self::task", "u3") == "u4"
+        assert self.index.resolve("super::x", "u0") is None
+        # Paths into the unit itself stay unresolved
+        assert self.index.resolve("self::inner::Item", "u2") is None
+
+    def test_uniform_paths(self):
+        assert self.index.resolve("mm::alloc", "u0") == "u2"
+        assert self.index.resolve("task::Task", "u3") == "u4"
+        assert self.index.resolve("serde::Serialize", "u0") is None
+        assert self.index.resolve("std::io", "u3") is None
+
+
+class TestRustResolution:
+    def setup_method(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self._tmp.name, "proj")
+        sources = {
+            "src/main.rs": "mod mm;\nmod util;\nuse mm::{alloc::Frame, Zone};\nuse std::io;\n\nfn main() {\n}\n",
+            "src/mm/mod.rs": "pub mod alloc;\npub struct Zone;\n",
+            "src/mm/alloc.rs": "use super::Zone;\nuse crate::util::*;\npub struct Frame;\n",
+            "src/util.rs": "pub fn helper() {\n}\n",
+        }
+        for rel, text in sources.items():
+            path = os.path.join(self.root, rel)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as f:
+                f.write(text)
+
+    def teardown_method(self):
+        self._tmp.cleanup()
+
+    def test_mod_and_use_resolve(self):
+        output = os.path.join(self._tmp.name, "out.pir")
+        main([self.root, "--no-cache", "-o", output])
+        with open(output, encoding="utf-8") as f:
+            pir = f.read()
+
+        section = lambda tag: pir.split(f"<{tag}>\n")[1].split(f"\n</{tag}>")[0].splitlines()
+        uid = {line.split("|")[1]: line.split("|")[0] for line in section("units")}
+        pool = {line.split("|")[0]: line.split("|", 1)[1] for line in section("pool")}
+        deps = {line.split("|")[0]: {pool[d] for d in line.split("|")[1].split()} for line in section("deps")}
+
+        assert deps[uid["src/main.rs"]] == {
+            f"mod|{uid['src/mm/mod.rs']}",
+            f"mod|{uid['src/util.rs']}",
+            f"use|{uid['src/mm/alloc.rs']}",
+            f"use|{uid['src/mm/mod.rs']}",
+            "use|[stdlib:rust]",
+        }
+        assert deps[uid["src/mm/mod.rs"]] == {f"mod|{uid['src/mm/alloc.rs']}"}
+        assert deps[uid["src/mm/alloc.rs"]] == {
+            f"use|{uid['src/mm/mod.rs']}",
+            f"use|{uid['src/util.rs']}",
+        }
@@ -0,0 +1,257 @@
+"""Tests for the `air serve` daemon (pirgen.server).
+
+Tests cover:
+- build / query / ping / unknown requests
+- Refreshing after file changes, and not rebuilding when nothing changed
+- The line-delimited JSON protocol over a unix socket
+- The client falling back to a local build when no server runs
+- Private socket directories and sockets owned by other users
+- A daemon in a git checkout building what a local run builds, and
+  clients with other options building locally
+"""
+
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+import pytest
+from pirgen.core.pir_builder import PIRBuilder
+from pirgen.pirgen import main
+from pirgen.server import PIRServer, default_socket_path, send_request
+from pirgen.session import ProjectSession
+
+
+SOURCES = {
+    "main.c": '#include "util.h"\n\nint main(void) {\n    return util();\n}\n',
+    "util.h": "int util(void);\n",
+    "util.c": "int util(void) {\n    return 0;\n}\n",
+}
+
+
+class TestPIRServer:
+    def setup_method(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self._tmp.name, "proj")
+        for rel, text in SOURCES.items():
+            self._write(rel, text)
+
+    def teardown_method(self):
+        self._tmp.cleanup()
+
+    def _write(self, rel, text):
+        path = os.path.join(self.root, rel)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+        # Keep mtimes apart so the stat comparison sees every write
+        time.sleep(0.01)
+
+    def _server(self):
+        session = ProjectSession(self.root, name="proj", use_cache=False)
+        session.build()
+        return PIRServer(session, os.path.join(self._tmp.name, "s.sock"))
+
+    def test_build_and_refresh(self):
+        server = self._server()
+        first = server.handle({"op": "build"})
+        assert first["ok"] and not first["rebuilt"]
+        assert first["units"] == 3
+        assert first["pir"] == PIRBuilder(server.session.model).build()
+
+        self._write("extra.c", "int extra(void) {\n    return 1;\n}\n")
+        second = server.handle({"op": "build", "name": "renamed"})
+        assert second["rebuilt"] and second["units"] == 4
+        assert "extra" in second["pir"]
+        assert "renamed" in second["pir"]
+        assert not server.handle({"op": "build"})["rebuilt"]
+        server.session.close()
+
+    def test_build_to_file(self):
+        server = self._server()
+        output = os.path.join(self._tmp.name, "out.pir")
+        response = server.handle({"op": "build", "output": output})
+        assert response["output"] == output and "pir" not in response
+        with open(output, encoding="utf-8") as f:
+            assert f.read() == PIRBuilder(server.session.model).build()
+        server.session.close()
+
+    def test_queries(self):
+        server = self._server()
+        found = server.handle({"op": "query", "symbol": "util"})
+        assert found["symbols"] == [{"unit": "u1", "path": "util.c", "kind": "func"}]
+        assert server.handle({"op": "query", "symbol": "nope"})["symbols"] == []
+
+        unit = server.handle({"op": "query", "path": "main.c"})
+        assert unit["unit"]["role"] == "entry"
+        assert [s["name"] for s in unit["symbols"]] == ["main"]
+        assert unit["deps"]
+
+        assert not server.handle({"op": "query", "path": "missing.c"})["ok"]
+        assert not server.handle({"op": "query"})["ok"]
+        assert not server.handle({"op": "frobnicate"})["ok"]
+        server.session.close()
+
+    def test_socket_round_trip(self):
+        sock_path = os.path.join(self._tmp.name, "s.sock")
+        ready = threading.Event()
+
+        def run():
+            # SQLite connections stay on the thread that opened them
+            session = ProjectSession(self.root, name="proj")
+            session.build()
+            server = PIRServer(session, sock_path)
+            ready.set()
+            try:
+                server.serve_forever()
+            finally:
+                session.close()
+
+        thread = threading.Thread(target=run)
+        thread.start()
+        ready.wait(5)
+        for _ in range(100):
+            if os.path.exists(sock_path):
+                break
+            time.sleep(0.02)
+
+        try:
+            assert send_request(sock_path, {"op": "ping"})["ok"]
+            assert send_request(sock_path, {"op": "build"})["units"] == 3
+
+            output = os.path.join(self._tmp.name, "client.pir")
+            main([self.root, "--client", "--socket", sock_path, "--name", "proj", "-o", output])
+            local = os.path.join(self._tmp.name, "local.pir")
+            main([self.root, "--name", "proj", "--no-cache", "-o", local])
+            with open(output, encoding="utf-8") as a, open(local, encoding="utf-8") as b:
+                assert a.read() == b.read()
+        finally:
+            assert send_request(sock_path, {"op": "shutdown"}) == {"ok": True}
+            thread.join(5)
+        assert not os.path.exists(sock_path)
+        assert send_request(sock_path, {"op": "ping"}) is None
+
+    def test_client_falls_back_without_server(self, capsys):
+        output = os.path.join(self._tmp.name, "fallback.pir")
+        sock_path = os.path.join(self._tmp.name, "none.sock")
+        main([self.root, "--client", "--socket", sock_path, "--no-cache", "-o", output])
+        assert "building locally" in capsys.readouterr().out
+        assert os.path.exists(output)
+
+    def test_default_socket_path(self, monkeypatch):
+        monkeypatch.setenv("XDG_RUNTIME_DIR", self._tmp.name)
+        path = default_socket_path(self.root)
+        assert os.path.dirname(path) == self._tmp.name
+        assert path == default_socket_path(self.root + "/.")
+        assert path != default_socket_path(self._tmp.name)
+
+    def test_private_socket_dir_in_temp(self, monkeypatch):
+        monkeypatch.delenv("XDG_RUNTIME_DIR", raising=False)
+        monkeypatch.setattr(tempfile, "tempdir", self._tmp.name)
+        path = default_socket_path(self.root)
+        base = os.path.dirname(path)
+        assert base == os.path.join(self._tmp.name, f"air-{os.getuid()}")
+        assert os.stat(base).st_mode & 0o777 == 0o700
+
+        os.chmod(base, 0o755)
+        with pytest.raises(RuntimeError):
+            default_socket_path(self.root)
+        os.chmod(base, 0o700)
+        # Created by someone else first
+        monkeypatch.setattr(os, "getuid", lambda: os.stat(base).st_uid + 1)
+        os.mkdir(os.path.join(self._tmp.name, f"air-{os.getuid()}"), 0o700)
+        with pytest.raises(RuntimeError):
+            default_socket_path(self.root)
+
+    def test_foreign_socket_refused(self, monkeypatch, capsys):
+        sock_path = os.path.join(self._tmp.name, "foreign.sock")
+        with open(sock_path, "w"):
+            pass
+        monkeypatch.setattr(os, "getuid", lambda: os.stat(sock_path).st_uid + 1)
+        with pytest.raises(RuntimeError):
+            send_request(sock_path, {"op": "ping"})
+        # Neither served over nor unlinked
+        server = PIRServer(ProjectSession(self.root, name="proj", use_cache=False), sock_path)
+        with pytest.raises(RuntimeError):
+            server.serve_forever()
+        assert os.path.exists(sock_path)
+
+        output = os.path.join(self._tmp.name, "fallback.pir")
+        main([self.root, "--client", "--socket", sock_path, "--no-cache", "-o", output])
+        assert "owned by another user" in capsys.readouterr().out
+        assert os.path.exists(output)
+
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="git not installed")
+class TestServeGitCheckout:
+    def setup_method(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self._tmp.name, "proj")
+        os.makedirs(self.root)
+        for rel, text in SOURCES.items():
+            self._write(rel, text)
+        subprocess.run(["git", "init", "-q"], cwd=self.root, check=True)
+        subprocess.run(["git", "add", "-A"], cwd=self.root, check=True)
+        # Not added to git: only --untracked builds see it
+        self._write("untracked.c", "int untracked(void) {\n    return 2;\n}\n")
+        self.sock_path = os.path.join(self._tmp.name, "s.sock")
+
+    def teardown_method(self):
+        self._tmp.cleanup()
+
+    def _write(self, rel, text):
+        with open(os.path.join(self.root, rel), "w") as f:
+            f.write(text)
+
+    def _start_server(self):
+        thread = threading.Thread(
+            target=main, args=(["serve", self.root, "--socket", self.sock_path, "--no-cache"],)
+        )
+        thread.start()
+        for _ in range(250):
+            if send_request(self.sock_path, {"op": "ping"}) is not None:
+                break
+            time.sleep(0.02)
+        return thread
+
+    def _pir(self, name, *argv):
+        output = os.path.join(self._tmp.name, name)
+        main([self.root, "--no-cache", "-o", output, *argv])
+        with open(output, encoding="utf-8") as f:
+            return f.read()
+
+    def test_client_matches_local_build(self, capsys):
+        thread = self._start_server()
+        try:
+            served = self._pir("client.pir", "--client", "--socket", self.sock_path)
+            assert "PIR served" in capsys.readouterr().out
+            local = self._pir("local.pir")
+            assert served == local
+            assert "untracked" not in served
+
+            # Other discovery options: the server refuses, the client
+            # builds locally with its own
+            untracked = self._pir(
+                "untracked.pir", "--client", "--socket", self.sock_path, "--untracked"
+            )
+            out = capsys.readouterr().out
+            assert "other options: git_index, untracked" in out
+            assert "building locally" in out
+            assert untracked == self._pir("local_untracked.pir", "--untracked")
+            assert "untracked" in untracked
+        finally:
+            assert send_request(self.sock_path, {"op": "shutdown"}) == {"ok": True}
+            thread.join(5)
+
+    def test_added_file_is_served(self):
+        thread = self._start_server()
+        try:
+            time.sleep(0.02)  # keep the index's mtime apart from the build
+            subprocess.run(["git", "add", "untracked.c"], cwd=self.root, check=True)
+            served = self._pir("client.pir", "--client", "--socket", self.sock_path)
+            assert "untracked" in served
+            assert served == self._pir("local.pir")
+        finally:
+            assert send_request(self.sock_path, {"op": "shutdown"}) == {"ok": True}
+            thread.join(5)
@@ -0,0 +1,298 @@
+"""Tests for incremental rebuilds and watch mode (pirgen.session, pirgen.watch).
+
+Tests cover:
+- Session rebuilds re-analyze only touched files and match a fresh build
+- Added and removed files are picked up by rediscovery
+- Incremental resolution re-resolving only the units a change affects
+- Atomic PIR writes
+- Polling and inotify watchers reporting changes
+- Debounced batches and change filtering
+- Watch discovery matching a one-shot run in a git checkout, and adding
+  a file to the index
+"""
+
+import os
+import shutil
+import stat
+import subprocess
+import tempfile
+import threading
+import time
+import pytest
+import pirgen.pirgen as pirgen_mod
+import pirgen.session as session_mod
+from pirgen.core.pir_builder import PIRBuilder
+from pirgen.pirgen import write_pir
+from pirgen.session import ProjectSession
+from pirgen.watch import (
+    InotifyWatcher,
+    PollingWatcher,
+    collect_batch,
+    is_relevant_change,
+    watch_project,
+    watch_targets,
+)
+
+
+SOURCES = {
+    "main.py": "import util\n\ndef main():\n    helper()\n",
+    "util.py": "def helper():\n    pass\n",
+    "core/mm.c": "int mm_init(void) {\n    return 0;\n}\n",
+}
+
+
+def _inotify_available():
+    try:
+        InotifyWatcher().close()
+    except OSError:
+        return False
+    return True
+
+
+class TestProjectSession:
+    def setup_method(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = self._tmp.name
+        for rel, text in SOURCES.items():
+            self._write(rel, text)
+
+    def teardown_method(self):
+        self._tmp.cleanup()
+
+    def _write(self, rel, text):
+        path = os.path.join(self.root, rel)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+        return path
+
+    def _fresh_pir(self):
+        session = ProjectSession(self.root, use_cache=False)
+        try:
+            return PIRBuilder(session.build()).build()
+        finally:
+            session.close()
+
+    def test_rebuild_only_analyzes_changed_files(self, monkeypatch):
+        session = ProjectSession(self.root, use_cache=False)
+        session.build()
+        assert session.dirs[0] == os.path.abspath(self.root)
+
+        analyzed = []
+        real_analyze = pirgen_mod.analyze_file
+
+        def counting_analyze(file_path, *args):
+            analyzed.append(os.path.relpath(file_path, self.root))
+            return real_analyze(file_path, *args)
+
+        monkeypatch.setattr(pirgen_mod, "analyze_file", counting_analyze)
+        changed = self._write("util.py", "def helper():\n    pass\n\ndef extra():\n    pass\n")
+        model = session.build([changed])
+        session.close()
+
+        assert analyzed == ["util.py"]
+        assert "extra" in PIRBuilder(model).build()
+        assert PIRBuilder(model).build() == self._fresh_pir()
+
+    def test_added_and_removed_files(self):
+        session = ProjectSession(self.root, use_cache=False)
+        session.build()
+
+        added = self._write("pkg/new.py", "def fresh():\n    pass\n")
+        os.remove(os.path.join(self.root, "core", "mm.c"))
+        model = session.build([added])
+        session.close()
+
+        pir = PIRBuilder(model).build()
+        assert "fresh" in pir
+        assert "mm_init" not in pir
+        assert pir == self._fresh_pir()
+        assert sorted(os.path.relpath(p, self.root) for p in session.records) == [
+            "main.py",
+            "pkg/new.py",
+            "util.py",
+        ]
+
+    def test_rebuild_everything(self):
+        session = ProjectSession(self.root)
+        session.build()
+        self._write("main.py", "def other():\n    pass\n")
+        model = session.build(None)
+        session.close()
+        assert PIRBuilder(model).build() == self._fresh_pir()
+
+    def test_incremental_resolution(self, monkeypatch):
+        self._write("boot/start.s", "_start:\n    call kinit\n    call kmain\n")
+        self._write("boot/other.s", "other:\n    call helper\n")
+        self._write("kernel.s", "kinit:\n    ret\n")
+        session = ProjectSession(self.root, use_cache=False)
+        session.build()
+        assert "#kinit" in PIRBuilder(session.model).build()
+
+        resolved_units = []
+        real_resolve = session_mod.resolve_dependencies
+
+        def tracking_resolve(model, symbol_index=None, uids=None, *indexes, **kwargs):
+            resolved_units.append(None if uids is None else list(uids))
+            return real_resolve(model, symbol_index, uids, *indexes, **kwargs)
+
+        monkeypatch.setattr(session_mod, "resolve_dependencies", tracking_resolve)
+
+        # kmain gains a definition: only start.s (which calls it) and the
+        # edited unit are resolved again
+        kernel = self._write("kernel.s", "kinit:\n    ret\nkmain:\n    ret\n")
+        model = session.build([kernel])
+        uid_of = {u.path: u.uid for u in model.units}
+        assert resolved_units[-1] == sorted(
+            [uid_of["kernel.s"], uid_of[os.path.join("boot", "start.s")]],
+            key=lambda uid: int(uid[1:]),
+        )
+        pir = PIRBuilder(model).build()
+        assert "#kmain" in pir
+        assert pir == self._fresh_pir()
+
+        # An edit that changes no owner resolves the edited unit only
+        other = self._write("boot/other.s", "other:\n    call helper\n    call kinit\n")
+        model = session.build([other])
+        assert resolved_units[-1] == [uid_of[os.path.join("boot", "other.s")]]
+        assert PIRBuilder(model).build() == self._fresh_pir()
+
+        # Adding a file renumbers units: everything is resolved
+        added = self._write("a.s", "helper:\n    ret\n")
+        model = session.build([added])
+        session.close()
+        assert resolved_units[-1] is None
+        assert PIRBuilder(model).build() == self._fresh_pir()
+
+    def test_write_pir_is_atomic(self):
+        session = ProjectSession(self.root, use_cache=False)
+        model = session.build()
+        session.close()
+
+        out_dir = tempfile.mkdtemp(dir=self.root)
+        output = os.path.join(out_dir, "p.pir")
+        write_pir(model, output)
+        write_pir(model, output)
+
+        assert os.listdir(out_dir) == ["p.pir"]
+        with open(output, encoding="utf-8") as f:
+            assert f.read() == PIRBuilder(model).build()
+        umask = os.umask(0)
+        os.umask(umask)
+        assert stat.S_IMODE(os.stat(output).st_mode) == 0o666 & ~umask
+
+
+class TestWatchers:
+    def setup_method(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = os.path.realpath(self._tmp.name)
+        self.file = os.path.join(self.root, "a.py")
+        with open(self.file, "w") as f:
+            f.write("x = 1\n")
+
+    def teardown_method(self):
+        self._tmp.cleanup()
+
+    def _check_watcher(self, watcher):
+        try:
+            watcher.update([self.file], [self.root])
+            assert watcher.read(0.05) == set()
+
+            with open(self.file, "w") as f:
+                f.write("x = 22\n")
+            assert self.file in collect_batch(watcher, 2.0, debounce=0.05)
+
+            sub = os.path.join(self.root, "sub")
+            os.mkdir(sub)
+            changed = collect_batch(watcher, 2.0, debounce=0.05)
+            assert sub + os.sep in changed or self.root + os.sep in changed
+        finally:
+            watcher.close()
+
+    def test_polling_watcher(self):
+        self._check_watcher(PollingWatcher(interval=0.01))
+
+    @pytest.mark.skipif(not _inotify_available(), reason="inotify not available")
+    def test_inotify_watcher(self):
+        self._check_watcher(InotifyWatcher())
+
+    def test_relevant_changes(self):
+        assert is_relevant_change("/p/src/x.py")
+        assert is_relevant_change("/p/src/.gitignore")
+        assert is_relevant_change("/p/src/pkg" + os.sep)
+        assert not is_relevant_change("/p/out.pir")
+        assert not is_relevant_change("/p/.x.py.swp")
+        assert not is_relevant_change("/p/__pycache__" + os.sep)
+
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="git not installed")
+class TestWatchGitIndex:
+    def setup_method(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = os.path.realpath(self._tmp.name)
+        for rel, text in SOURCES.items():
+            self._write(rel, text)
+        self._git("init", "-q")
+        self._git("add", "-A")
+        # Not added to git: a one-shot run does not see it
+        self._write("pkg/untracked.py", "def untracked_helper():\n    pass\n")
+        self.output = os.path.join(self.root, "p.pir")
+
+    def teardown_method(self):
+        self._tmp.cleanup()
+
+    def _write(self, rel, text):
+        path = os.path.join(self.root, rel)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+
+    def _git(self, *args):
+        subprocess.run(["git", *args], cwd=self.root, check=True)
+
+    def _one_shot_pir(self):
+        pirgen_mod.main([self.root, "--no-cache", "-o", self.output])
+        with open(self.output, encoding="utf-8") as f:
+            return f.read()
+
+    def test_first_watch_build_matches_one_shot(self):
+        args = pirgen_mod.build_parser().parse_args([self.root, "--no-cache", "--watch"])
+        session = pirgen_mod._open_session(args, self.root)
+        try:
+            pir = PIRBuilder(session.build()).build()
+            files, dirs = watch_targets(session)
+        finally:
+            session.close()
+        assert "untracked_helper" not in pir
+        assert pir == self._one_shot_pir()
+        index_file = os.path.join(self.root, ".git", "index")
+        assert index_file in files
+        assert os.path.join(self.root, "core") in dirs
+        assert is_relevant_change(index_file, index_file=index_file)
+
+    def test_added_file_is_picked_up(self):
+        session = ProjectSession(self.root, use_cache=False, use_git_index=True)
+        session.build()
+        stop = threading.Event()
+        thread = threading.Thread(
+            target=watch_project,
+            args=(session, self.output),
+            kwargs={"debounce": 0.05, "poll": True, "poll_interval": 0.02, "stop": stop},
+        )
+        thread.start()
+        try:
+            time.sleep(0.1)
+            self._git("add", "pkg/untracked.py")
+            deadline = time.monotonic() + 5.0
+            pir = ""
+            while "untracked_helper" not in pir and time.monotonic() < deadline:
+                time.sleep(0.05)
+                if os.path.exists(self.output):
+                    with open(self.output, encoding="utf-8") as f:
+                        pir = f.read()
+        finally:
+            stop.set()
+            thread.join()
+            session.close()
+        assert "untracked_helper" in pir
+        assert pir == self._one_shot_pir()